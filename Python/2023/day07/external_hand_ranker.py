@@ -0,0 +1,159 @@
+from array import array
+from collections.abc import Iterator
+import heapq
+from pathlib import Path
+import tempfile
+
+from hand import HAND_SIZE
+from hand_key_encoder import (
+    RECORD_WORD_COUNT,
+    RECORD_WORD_TYPECODE,
+    HandKeyEncoder,
+    iterRecords,
+    packRecord,
+    recordsToWords,
+    unpackBidPrice,
+)
+from hand_list_parser import HandListParser
+
+
+# 1個のソート済みランに含めるレコード数の既定値。ピーク時のメモリ使用量はおおよそこれに比例する。
+DEFAULT_RUN_SIZE = 1 << 20
+# 一度にマージするランの最大数の既定値。これを超える場合は、何段階かに分けてマージする。
+DEFAULT_MAX_FAN_IN = 64
+# マージ時に、ラン1個あたり一度に読み込むレコード数。
+READ_BLOCK_SIZE = 1 << 14
+
+
+class ExternalHandRanker:
+    """メモリに載り切らない手札一覧を、外部ソートでランク付けするクラス。
+
+    1. 手札一覧をチャンク単位で読み込み、(並び替え用のキー, 読み込み順, 入札額) のレコードを
+       run_size件ずつソートして一時ファイル（ラン）に書き出す。
+    2. ランをk-wayマージしながら順位を数え、賞金の合計をその場で計算する。
+    メモリ使用量は入力のサイズに依らず、run_sizeとmax_fan_inで抑えられる。
+    全く同じ手札が複数ある場合は、HandRankerと同じく読み込み順が早い方を弱いものとして扱う。
+
+    Attributes:
+        hand_key_encoder (HandKeyEncoder): 並び替え用のキーを計算するクラスのオブジェクト。
+        run_size (int): 1個のランに含めるレコード数。
+        max_fan_in (int): 一度にマージするランの最大数。
+        temp_dir_str (str | None): 一時ファイルを置くディレクトリのパス。Noneなら既定の場所。
+    """
+
+    def __init__(
+        self,
+        question: int,
+        run_size: int = DEFAULT_RUN_SIZE,
+        max_fan_in: int = DEFAULT_MAX_FAN_IN,
+        temp_dir_str: str | None = None,
+        cache_dir_str: str | None = None
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            question (int): 問題の番号。
+            run_size (int): 1個のランに含めるレコード数。
+            max_fan_in (int): 一度にマージするランの最大数。2以上。
+            temp_dir_str (str | None): 一時ファイルを置くディレクトリのパス。Noneなら既定の場所。
+            cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+        """
+        if max_fan_in < 2:
+            raise ValueError(f"max_fan_in should be 2 or more: {max_fan_in}")
+        self.hand_key_encoder = HandKeyEncoder(question, cache_dir_str)
+        self.run_size = run_size
+        self.max_fan_in = max_fan_in
+        self.temp_dir_str = temp_dir_str
+
+    def calculate_total_bounty(self, hand_list_text_path_str: str) -> int:
+        """手札一覧をランク付けし、賞金の合計を計算する。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+
+        Returns:
+            int: 賞金の合計。
+        """
+        with tempfile.TemporaryDirectory(dir=self.temp_dir_str) as temp_dir_str:
+            temp_dir = Path(temp_dir_str)
+            run_paths = self._write_sorted_runs(hand_list_text_path_str, temp_dir)
+
+            # ランが多すぎる場合は、一度にマージできる数になるまで段階的にマージしておく。
+            merge_count = 0
+            while len(run_paths) > self.max_fan_in:
+                merged_run_paths = []
+                for i in range(0, len(run_paths), self.max_fan_in):
+                    merged_run_path = temp_dir / f"merged_{merge_count}.bin"
+                    merge_count += 1
+                    self._merge_runs_to_file(run_paths[i:i + self.max_fan_in], merged_run_path)
+                    merged_run_paths.append(merged_run_path)
+                run_paths = merged_run_paths
+
+            total_bounty = 0
+            for rank, record in enumerate(self._merge_runs(run_paths), start=1):
+                total_bounty += unpackBidPrice(record) * rank
+            return total_bounty
+
+    def _write_sorted_runs(self, hand_list_text_path_str: str, temp_dir: Path) -> list[Path]:
+        """手札一覧を読み込みながら、ソート済みのランを一時ファイルに書き出す。
+        """
+        run_paths = []
+        records = []
+        encode = self.hand_key_encoder.encode
+        hand_index = 0
+        for card_codes, bid_prices in HandListParser.iter_parse_batches(hand_list_text_path_str):
+            for i, bid_price in enumerate(bid_prices):
+                sort_key = encode(card_codes[i * HAND_SIZE:(i + 1) * HAND_SIZE])
+                records.append(packRecord(sort_key, hand_index, bid_price))
+                hand_index += 1
+                if len(records) >= self.run_size:
+                    run_paths.append(self._write_run(records, temp_dir / f"run_{len(run_paths)}.bin"))
+                    records = []
+        
+        if records:
+            run_paths.append(self._write_run(records, temp_dir / f"run_{len(run_paths)}.bin"))
+        return run_paths
+
+    @staticmethod
+    def _write_run(records: list[int], run_path: Path) -> Path:
+        """レコードをソートして、ランとして書き出す。
+        """
+        records.sort()
+        with run_path.open(mode="wb") as f:
+            recordsToWords(records).tofile(f)
+        return run_path
+
+    @staticmethod
+    def _iter_run(run_path: Path) -> Iterator[int]:
+        """ランのレコードを、ブロック単位で読み込みながら順に返す。
+        """
+        with run_path.open(mode="rb") as f:
+            while True:
+                block = array(RECORD_WORD_TYPECODE)
+                try:
+                    block.fromfile(f, READ_BLOCK_SIZE * RECORD_WORD_COUNT)
+                except EOFError:
+                    # 末尾のブロックは、読み込めた分だけblockに入っている。
+                    yield from iterRecords(block)
+                    break
+                yield from iterRecords(block)
+
+    def _merge_runs(self, run_paths: list[Path]) -> Iterator[int]:
+        """ランをk-wayマージして、レコードを昇順に返す。
+        """
+        return heapq.merge(*(self._iter_run(run_path) for run_path in run_paths))
+
+    def _merge_runs_to_file(self, run_paths: list[Path], merged_run_path: Path) -> None:
+        """ランをk-wayマージして、1個のランとして書き出す。マージ元のランは削除する。
+        """
+        with merged_run_path.open(mode="wb") as f:
+            block = []
+            for record in self._merge_runs(run_paths):
+                block.append(record)
+                if len(block) >= READ_BLOCK_SIZE:
+                    recordsToWords(block).tofile(f)
+                    block = []
+            recordsToWords(block).tofile(f)
+        
+        for run_path in run_paths:
+            run_path.unlink()
\ No newline at end of file
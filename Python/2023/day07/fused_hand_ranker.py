@@ -0,0 +1,77 @@
+from array import array
+
+from hand import HAND_SIZE
+from hand_key_encoder import HandKeyEncoder
+from hand_list_parser import HandListParser
+
+
+# レコードの下位に詰める、手札の読み込み順のビット数。手札の数は 2^INDEX_BITS 枚まで。
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
+class FusedHandRanker:
+    """問題1と問題2のランク付けを、1回のパースと1回の走査でまとめて行うクラス。
+
+    手札1枚ごとに、手札のエンコード・両ルールの役の表の参照・両ルールの並び替え用のキーの計算を
+    同じループの中で済ませ、最後にそれぞれソートして賞金の合計を計算する。
+    同じ強さの手札の順序は、HandRankerと同じく読み込み順になる。
+
+    Attributes:
+        hand_key_encoder1 (HandKeyEncoder): 問題1のルールの役の表とカードの強さを持つオブジェクト。
+        hand_key_encoder2 (HandKeyEncoder): 問題2のルールの役の表とカードの強さを持つオブジェクト。
+    """
+
+    def __init__(self, cache_dir_str: str | None = None) -> None:
+        """コンストラクタ。
+
+        Args:
+            cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+        """
+        self.hand_key_encoder1 = HandKeyEncoder(1, cache_dir_str)
+        self.hand_key_encoder2 = HandKeyEncoder(2, cache_dir_str)
+
+    def calculate_total_bounties(self, hand_list_text_path_str: str) -> tuple[int, int]:
+        """手札一覧を両方のルールでランク付けし、それぞれの賞金の合計を計算する。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+
+        Returns:
+            tuple[int, int]: (問題1の賞金の合計, 問題2の賞金の合計)
+
+        Raises:
+            ValueError: 手札の数が、読み込み順に割り当てたビット数で表せる数を超えた場合。
+        """
+        encode_pair = self.hand_key_encoder1.encode_pair
+        hand_key_encoder2 = self.hand_key_encoder2
+
+        # レコード: (並び替え用のキー << INDEX_BITS) | 読み込み順
+        records1 = []
+        records2 = []
+        all_bid_prices = array("q")
+        for card_codes, bid_prices in HandListParser.iter_parse_batches(hand_list_text_path_str):
+            first_hand_index = len(all_bid_prices)
+            if first_hand_index + len(bid_prices) > INDEX_MASK + 1:
+                raise ValueError(f"too many hands: at most {INDEX_MASK + 1} hands can be ranked.")
+            for i in range(len(bid_prices)):
+                hand_index = first_hand_index + i
+                sort_key1, sort_key2 = encode_pair(hand_key_encoder2, card_codes[i * HAND_SIZE:(i + 1) * HAND_SIZE])
+                records1.append((sort_key1 << INDEX_BITS) | hand_index)
+                records2.append((sort_key2 << INDEX_BITS) | hand_index)
+            all_bid_prices.extend(bid_prices)
+        
+        return (
+            self._calculate_total_bounty(records1, all_bid_prices),
+            self._calculate_total_bounty(records2, all_bid_prices),
+        )
+
+    @staticmethod
+    def _calculate_total_bounty(records: list[int], bid_prices: array) -> int:
+        """レコードをソートして、賞金の合計を計算する。
+        """
+        records.sort()
+        total_bounty = 0
+        for rank, record in enumerate(records, start=1):
+            total_bounty += bid_prices[record & INDEX_MASK] * rank
+        return total_bounty
\ No newline at end of file
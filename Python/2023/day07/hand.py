@@ -36,6 +36,8 @@ class Card(Enum):
         self.category = category
         self.strength = strength
         self.strength2 = strength2
+        # 手札を整数にエンコードする際の、0始まりのカードの番号。
+        self.code = strength - 1
     
     @classmethod
     def fromName(cls, target_name: str) -> "Card":
@@ -47,6 +49,33 @@ class Card(Enum):
         raise ValueError(f"invalid enum name: {target_name} in {cls.__name__}.")
 
 
+# カードの種類数。手札を13進数の整数としてエンコードする際の基数になる。
+CARD_KIND_COUNT = len(Card)
+# 手札の枚数。
+HAND_SIZE = 5
+# 手札のエンコード結果が取りうる値の個数。(13^5)
+HAND_CODE_COUNT = CARD_KIND_COUNT ** HAND_SIZE
+
+
+# カードの番号からカードを引くためのリスト。
+CARDS_BY_CODE = sorted(Card, key=lambda card: card.code)
+
+
+def encodeCards(cards: list[Card]) -> int:
+    """手札を、各カードの番号を桁とした13進数の整数にエンコードする。
+
+    Args:
+        cards (list[Card]): 手札。5枚分のカードで構成される。
+
+    Returns:
+        int: エンコード結果。0以上HAND_CODE_COUNT未満。
+    """
+    hand_code = 0
+    for card in cards:
+        hand_code = hand_code * CARD_KIND_COUNT + card.code
+    return hand_code
+
+
 class HandRank(Enum):
     """手札の役を表す列挙型。
 
@@ -77,7 +106,9 @@ class Hand:
         cards (list[Card]): 手札。5枚分のカードで構成される。
         bid_price (int): 入札額。
         rank (HandRank): 役。実際に評価する際に初めて、値がセットされる。
+        code (int): 手札を13進数の整数にエンコードした結果。
     """
+    __slots__ = ("cards", "bid_price", "rank", "code")
 
     def __init__(self, cards: list[Card], bid_price: int) -> None:
         """コンストラクタ。
@@ -89,6 +120,17 @@ class Hand:
         self.cards = cards
         self.bid_price = bid_price
         self.rank = None
+        self.code = encodeCards(cards)
+
+    @classmethod
+    def fromCodes(cls, card_codes: bytes, bid_price: int) -> "Hand":
+        """カードの番号の列から手札を生成する。
+
+        Args:
+            card_codes (bytes): 各カードの番号を1バイトずつ並べたもの。
+            bid_price (int): 入札額。
+        """
+        return cls([CARDS_BY_CODE[code] for code in card_codes], bid_price)
     
     def __str__(self) -> str:
         """オブジェクトの文字列表現を定義するメソッド。
@@ -0,0 +1,189 @@
+from array import array
+from collections.abc import Iterator
+from hand import CARDS_BY_CODE, CARD_KIND_COUNT, HAND_SIZE, Card, HandRank
+from hand_evaluator import HAND_RANKS_BY_STRENGTH
+from hand_list_parser import HandListParser
+from common.input_cache import InputCache
+
+
+# 役が未評価であることを表す値。
+UNEVALUATED_RANK_STRENGTH = 0
+
+
+class HandView:
+    """HandBatch内の1手札を、Handと同じインターフェースで参照するための軽量なクラス。
+    データ自体は持たず、参照先のHandBatchの配列を読み書きする。
+
+    Attributes:
+        cards (list[Card]): 手札。5枚分のカードで構成される。
+        bid_price (int): 入札額。
+        rank (HandRank): 役。実際に評価する際に初めて、値がセットされる。
+        code (int): 手札を13進数の整数にエンコードした結果。
+    """
+    __slots__ = ("_hand_batch", "_index")
+
+    def __init__(self, hand_batch: "HandBatch", index: int) -> None:
+        """コンストラクタ。
+
+        Args:
+            hand_batch (HandBatch): 参照先のHandBatch。
+            index (int): HandBatch内での手札の位置。
+        """
+        self._hand_batch = hand_batch
+        self._index = index
+
+    @property
+    def card_codes(self) -> bytearray | memoryview:
+        """各カードの番号を1バイトずつ並べたもの。参照先の配列の該当範囲をコピーして返す。
+        """
+        start = self._index * HAND_SIZE
+        return self._hand_batch.card_codes[start:start + HAND_SIZE]
+
+    @property
+    def cards(self) -> list[Card]:
+        """手札。5枚分のカードで構成される。
+        """
+        return [CARDS_BY_CODE[card_code] for card_code in self.card_codes]
+
+    @property
+    def bid_price(self) -> int:
+        """入札額。
+        """
+        return self._hand_batch.bid_prices[self._index]
+
+    @property
+    def rank(self) -> HandRank | None:
+        """役。未評価ならNone。値をセットすると、参照先の配列に役の強さを書き込む。
+        """
+        rank_strength = self._hand_batch.rank_strengths[self._index]
+        if rank_strength == UNEVALUATED_RANK_STRENGTH:
+            return None
+        return HAND_RANKS_BY_STRENGTH[rank_strength]
+
+    @rank.setter
+    def rank(self, rank: HandRank | None) -> None:
+        self._hand_batch.rank_strengths[self._index] = UNEVALUATED_RANK_STRENGTH if rank is None else rank.strength
+
+    @property
+    def code(self) -> int:
+        """手札を13進数の整数にエンコードした結果。
+        """
+        hand_code = 0
+        for card_code in self.card_codes:
+            hand_code = hand_code * CARD_KIND_COUNT + card_code
+        return hand_code
+
+    def __str__(self) -> str:
+        """オブジェクトの文字列表現を定義するメソッド。
+
+        Returns:
+            str: オブジェクトの文字列表現。オブジェクトをそのままprintすると出力される。
+        """
+        return f"{''.join([hand_card.category for hand_card in self.cards])}"
+
+
+class HandBatch:
+    """大量の手札を、連続した配列にまとめて保持するクラス。
+    手札1枚ごとにHandオブジェクトを作らないので、オブジェクト単位のメモリのオーバーヘッドが掛からない。
+    各手札にはHandViewを介して、Handと同じインターフェースでアクセスできる。
+
+    キャッシュから読み込んだ場合、カードの番号と入札額はメモリマップしたファイルをコピーせずに参照し、
+    手札を追加する際に初めて書き換えられる配列にコピーする。
+
+    Attributes:
+        card_codes (bytearray | memoryview): 全手札のカードの番号を連結したもの。i番目の手札は [i * 5:(i + 1) * 5] の範囲。
+        bid_prices (array | memoryview): 入札額の配列。64ビット符号付き整数。
+        rank_strengths (bytearray): 役の強さの配列。未評価の手札は0。
+    """
+
+    def __init__(self) -> None:
+        """コンストラクタ。
+        """
+        self.card_codes = bytearray()
+        self.bid_prices = array("q")
+        self.rank_strengths = bytearray()
+
+    @classmethod
+    def fromFile(cls, hand_list_text_path_str: str, input_cache: InputCache | None = None) -> "HandBatch":
+        """手札一覧のテキストファイルを読み込んで、HandBatchを生成する。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+            input_cache (InputCache | None): パース結果のキャッシュ。Noneならキャッシュを使わずにパースする。
+        """
+        if input_cache is not None:
+            card_codes, bid_prices = HandListParser.load_packed(hand_list_text_path_str, input_cache)
+            return cls.fromBuffers(card_codes, bid_prices)
+
+        hand_batch = cls()
+        for card_codes, bid_prices in HandListParser.iter_parse_batches(hand_list_text_path_str):
+            hand_batch.extend(card_codes, bid_prices)
+        return hand_batch
+
+    @classmethod
+    def fromBuffers(cls, card_codes: bytes | memoryview, bid_prices: array | memoryview) -> "HandBatch":
+        """カードの番号と入札額の配列を、コピーせずに参照するHandBatchを生成する。
+
+        Args:
+            card_codes (bytes | memoryview): 全手札のカードの番号を連結したもの。
+            bid_prices (array | memoryview): 入札額の配列。64ビット符号付き整数。
+        """
+        if len(card_codes) != len(bid_prices) * HAND_SIZE:
+            raise ValueError(f"card codes and bid prices are not equal in size. ({len(card_codes)}, {len(bid_prices)})")
+        hand_batch = cls()
+        hand_batch.card_codes = card_codes
+        hand_batch.bid_prices = bid_prices
+        hand_batch.rank_strengths = bytearray(len(bid_prices))
+        return hand_batch
+
+    def append(self, card_codes: bytes, bid_price: int) -> None:
+        """手札を1枚追加する。
+
+        Args:
+            card_codes (bytes): 各カードの番号を1バイトずつ並べたもの。
+            bid_price (int): 入札額。
+        """
+        if len(card_codes) != HAND_SIZE:
+            raise ValueError(f"invalid card codes: {card_codes!r}")
+        self._make_writable()
+        self.card_codes += card_codes
+        self.bid_prices.append(bid_price)
+        self.rank_strengths.append(UNEVALUATED_RANK_STRENGTH)
+
+    def extend(self, card_codes: bytes, bid_prices: array | memoryview) -> None:
+        """複数の手札をまとめて追加する。
+
+        Args:
+            card_codes (bytes): 全手札のカードの番号を連結したもの。
+            bid_prices (array | memoryview): 入札額の配列。64ビット符号付き整数。
+        """
+        if len(card_codes) != len(bid_prices) * HAND_SIZE:
+            raise ValueError(f"card codes and bid prices are not equal in size. ({len(card_codes)}, {len(bid_prices)})")
+        self._make_writable()
+        self.card_codes += card_codes
+        self.bid_prices.frombytes(memoryview(bid_prices).cast("B"))
+        self.rank_strengths += bytes(len(bid_prices))
+
+    def _make_writable(self) -> None:
+        """コピーせずに参照している配列を、手札を追加できる配列にコピーする。
+        """
+        if not isinstance(self.card_codes, bytearray):
+            self.card_codes = bytearray(self.card_codes)
+        if not isinstance(self.bid_prices, array):
+            bid_prices = array("q")
+            bid_prices.frombytes(memoryview(self.bid_prices).cast("B"))
+            self.bid_prices = bid_prices
+
+    def __len__(self) -> int:
+        return len(self.bid_prices)
+
+    def __getitem__(self, index: int) -> HandView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"hand index out of range: {index}")
+        return HandView(self, index)
+
+    def __iter__(self) -> Iterator[HandView]:
+        for index in range(len(self)):
+            yield HandView(self, index)
\ No newline at end of file
@@ -1,39 +1,120 @@
 from abc import ABC, abstractmethod
 from collections import Counter
-from hand import Card, Hand, HandRank
+from itertools import combinations_with_replacement, product
+import os
+from pathlib import Path
+from hand import Card, Hand, HandRank, HAND_CODE_COUNT, HAND_SIZE
+
+
+# 役の強さから役を逆引きするためのリスト。(強さは1始まり)
+HAND_RANKS_BY_STRENGTH = [None] + sorted(HandRank, key=lambda rank: rank.strength)
+# 役の表の形式のバージョン。役の評価のロジックを変更した場合は更新して、古いキャッシュを使わないようにする。
+RANK_TABLE_VERSION = 1
 
 
 class HandEvaluator(ABC):
     """手札の役を評価するクラス。
+
+    手札のエンコード結果（13進数の整数）をインデックスとして、
+    役の強さを引ける表を全13^5通り分だけ事前に計算しておき、評価時は表を引くだけにする。
+
+    Attributes:
+        rank_table (bytes): 手札のエンコード結果から役の強さを引く表。
     """
 
-    @abstractmethod
+    # ルールごとに一度だけ表を作るためのキャッシュ。{ クラス名: 表 }
+    _rank_tables: dict[str, bytes] = {}
+
+    def __init__(self, cache_dir_str: str | None = None) -> None:
+        """コンストラクタ。
+
+        Args:
+            cache_dir_str (str | None): 表をファイルとしてキャッシュするディレクトリのパス。
+                Noneならディスクにはキャッシュしない。
+        """
+        self.rank_table = self._load_rank_table(cache_dir_str)
+
     def evaluate(self, hand: Hand) -> HandRank:
         """手札の情報から役を評価する。
 
         Args:
             hand (Hand): 手札。5枚分のカードで構成される。
         
+        Returns:
+            HandRank: 手札の役。
+        """
+        return HAND_RANKS_BY_STRENGTH[self.rank_table[hand.code]]
+
+    @abstractmethod
+    def _evaluate_cards(self, cards: list[Card]) -> HandRank:
+        """カードの組み合わせから役を評価する。表を作る際に利用する。
+
+        Args:
+            cards (list[Card]): 手札。5枚分のカードで構成される。
+        
         Returns:
             HandRank: 手札の役。
         """
         pass
 
+    def _load_rank_table(self, cache_dir_str: str | None) -> bytes:
+        """役の表を読み込む。メモリ上・ディスク上のキャッシュが無ければ作る。
+        """
+        table_name = type(self).__name__
+        rank_table = HandEvaluator._rank_tables.get(table_name)
+
+        if cache_dir_str is not None:
+            cache_path = Path(cache_dir_str) / f"{table_name}-v{RANK_TABLE_VERSION}.bin"
+            # サイズが合わない壊れたキャッシュは作り直す
+            is_cache_valid = cache_path.is_file() and cache_path.stat().st_size == HAND_CODE_COUNT
+            if rank_table is None and is_cache_valid:
+                rank_table = cache_path.read_bytes()
+            if rank_table is None:
+                rank_table = self._build_rank_table()
+            if not is_cache_valid:
+                # メモリ上にある表でも、このディレクトリにまだ無ければ保存する。（ワーカープロセスが読み込む）
+                # 複数のプロセスが同時に書き込んでも壊れないように、一時ファイルに書いてから置き換える。
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+                temp_path.write_bytes(rank_table)
+                os.replace(temp_path, cache_path)
+        elif rank_table is None:
+            rank_table = self._build_rank_table()
+
+        HandEvaluator._rank_tables[table_name] = rank_table
+        return rank_table
+
+    def _build_rank_table(self) -> bytes:
+        """全13^5通りの手札について役を評価し、表を作る。
+        役はカードの並び順に依らないので、カードの組み合わせ（重複組合せ）ごとに一度だけ評価する。
+        """
+        cards_by_code = sorted(Card, key=lambda card: card.code)
+        card_codes = range(len(cards_by_code))
+        rank_strengths_by_combination = {
+            codes: self._evaluate_cards([cards_by_code[code] for code in codes]).strength
+            for codes in combinations_with_replacement(card_codes, HAND_SIZE)
+        }
+        # productは末尾の桁から変化するので、列挙順がそのまま13進数のエンコード順になる。
+        return bytes(
+            rank_strengths_by_combination[tuple(sorted(codes))]
+            for codes in product(card_codes, repeat=HAND_SIZE)
+        )
+
 
 class HandEvaluatorImpl(HandEvaluator):
     """手札の役を評価するクラスの、実装クラス。
     """
 
-    def evaluate(self, hand: Hand) -> HandRank:
-        """手札の情報から役を評価する。
+    def _evaluate_cards(self, cards: list[Card]) -> HandRank:
+        """カードの組み合わせから役を評価する。
 
         Args:
-            hand (Hand): 手札。5枚分のカードで構成される。
+            cards (list[Card]): 手札。5枚分のカードで構成される。
         
         Returns:
             HandRank: 手札の役。
         """
-        counter = Counter(hand.cards)
+        counter = Counter(cards)
         matching_count_list = counter.values()
         max_matching_count = max(matching_count_list)
 
@@ -55,23 +136,23 @@ class HandEvaluatorImpl(HandEvaluator):
         elif max_matching_count == 1:
             return HandRank.HIGH_CARD
         else:
-            raise Exception(f"invalid hand. ({hand})")
+            raise Exception(f"invalid hand. ({''.join(card.category for card in cards)})")
 
 
 class HandEvaluatorImpl2(HandEvaluator):
     """手札の役を評価するクラスの、問題2用の実装クラス。
     """
 
-    def evaluate(self, hand: Hand) -> HandRank:
-        """手札の情報から役を評価する。
+    def _evaluate_cards(self, cards: list[Card]) -> HandRank:
+        """カードの組み合わせから役を評価する。
 
         Args:
-            hand (Hand): 手札。5枚分のカードで構成される。
+            cards (list[Card]): 手札。5枚分のカードで構成される。
         
         Returns:
             HandRank: 手札の役。
         """
-        counter = Counter(hand.cards)
+        counter = Counter(cards)
         matching_count_list = counter.values()
         max_matching_count = max(matching_count_list)
         pair_count = list(matching_count_list).count(2) # 1ならワンペア、2ならツーペア
@@ -123,4 +204,4 @@ class HandEvaluatorImpl2(HandEvaluator):
             else:
                 return HandRank.HIGH_CARD
         else:
-            raise Exception(f"invalid hand. ({hand})")
\ No newline at end of file
+            raise Exception(f"invalid hand. ({''.join(card.category for card in cards)})")
\ No newline at end of file
@@ -0,0 +1,139 @@
+from array import array
+from collections.abc import Iterator
+
+from hand import CARDS_BY_CODE, CARD_KIND_COUNT
+from hand_evaluator import HandEvaluator, HandEvaluatorImpl, HandEvaluatorImpl2
+from hand_ranker import CARD_STRENGTH_BITS
+
+
+# レコードの中で、読み込み順に割り当てるビット数。同じ強さの手札は、読み込み順が早い方を弱いものとして扱う。
+ORDER_BITS = 40
+ORDER_MASK = (1 << ORDER_BITS) - 1
+# レコードの中で、並び替え用のキーに割り当てるビット数。(役の強さ + カード5枚分の強さ)
+SORT_KEY_BITS = 64 - ORDER_BITS
+# レコードの中で、入札額に割り当てるビット数。
+BID_PRICE_BITS = 64
+BID_PRICE_MASK = (1 << BID_PRICE_BITS) - 1
+# レコードをファイルやプロセス間でやり取りする際の型と、1レコードあたりの語数。
+# 1語目に (並び替え用のキー, 読み込み順)、2語目に入札額を入れる。(64ビット符号無し整数)
+RECORD_WORD_TYPECODE = "Q"
+RECORD_WORD_COUNT = 2
+
+
+def packRecord(sort_key: int, order: int, bid_price: int) -> int:
+    """並び替え用のキーと読み込み順と入札額を、1個の整数のレコードにまとめる。
+    レコードの大小関係は、(並び替え用のキー, 読み込み順) の大小関係と一致する。
+    HandRankerの安定ソートと同じく、同じ手札は読み込み順で並ぶ。
+
+    Args:
+        sort_key (int): 並び替え用のキー。
+        order (int): 手札の読み込み順。手札ごとに異なり、後に読み込んだ手札ほど大きい値。
+        bid_price (int): 入札額。
+
+    Returns:
+        int: レコード。
+    """
+    if not 0 <= sort_key < 1 << SORT_KEY_BITS:
+        raise ValueError(f"sort_key is out of range: {sort_key}")
+    if not 0 <= order <= ORDER_MASK:
+        raise ValueError(f"order is out of range: {order}")
+    if not 0 <= bid_price <= BID_PRICE_MASK:
+        raise ValueError(f"bid_price is out of range: {bid_price}")
+    return (((sort_key << ORDER_BITS) | order) << BID_PRICE_BITS) | bid_price
+
+
+def unpackBidPrice(record: int) -> int:
+    """レコードから入札額を取り出す。
+    """
+    return record & BID_PRICE_MASK
+
+
+def recordsToWords(records: list[int]) -> array:
+    """レコードの列を、ファイルやプロセス間でやり取りするための語の配列に変換する。
+
+    Returns:
+        array: 1レコードあたりRECORD_WORD_COUNT語の配列。
+    """
+    words = array(RECORD_WORD_TYPECODE)
+    words.frombytes(bytes(words.itemsize * RECORD_WORD_COUNT * len(records)))
+    words[0::2] = array(RECORD_WORD_TYPECODE, [record >> BID_PRICE_BITS for record in records])
+    words[1::2] = array(RECORD_WORD_TYPECODE, [record & BID_PRICE_MASK for record in records])
+    return words
+
+
+def iterRecords(words: array) -> Iterator[int]:
+    """recordsToWordsで変換した語の配列から、レコードを順に取り出す。
+    """
+    for high_word, bid_price in zip(words[0::2], words[1::2]):
+        yield (high_word << BID_PRICE_BITS) | bid_price
+
+
+class HandKeyEncoder:
+    """カードの番号の列から、HandRankerと同じ形式の並び替え用のキーを計算するクラス。
+    Handオブジェクトを作らずに、パース結果から直接キーを求めるために使う。
+
+    Attributes:
+        question (int): 問題の番号。1ならHandEvaluatorImpl、2ならHandEvaluatorImpl2のルールを使う。
+        hand_evaluator (HandEvaluator): 役の表を持つ評価クラスのオブジェクト。
+        card_strengths (list[int]): カードの番号から、並び替えに使うカードの強さを引くリスト。
+    """
+
+    def __init__(self, question: int, cache_dir_str: str | None = None) -> None:
+        """コンストラクタ。
+
+        Args:
+            question (int): 問題の番号。
+            cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+        """
+        self.question = question
+        if question == 1:
+            self.hand_evaluator: HandEvaluator = HandEvaluatorImpl(cache_dir_str)
+            self.card_strengths = [card.strength for card in CARDS_BY_CODE]
+        elif question == 2:
+            self.hand_evaluator = HandEvaluatorImpl2(cache_dir_str)
+            self.card_strengths = [card.strength2 for card in CARDS_BY_CODE]
+        else:
+            raise ValueError(f"Unsupported question: {question}")
+
+    def encode(self, card_codes: bytes) -> int:
+        """1手札分のカードの番号の列から、並び替え用のキーを計算する。
+
+        Args:
+            card_codes (bytes): 各カードの番号を1バイトずつ並べたもの。
+
+        Returns:
+            int: 並び替え用のキー。hand_ranker.packSortKeyと同じ形式。
+        """
+        hand_code = 0
+        card_strength_key = 0
+        for card_code in card_codes:
+            hand_code = hand_code * CARD_KIND_COUNT + card_code
+            card_strength_key = (card_strength_key << CARD_STRENGTH_BITS) | self.card_strengths[card_code]
+        rank_strength = self.hand_evaluator.rank_table[hand_code]
+        return (rank_strength << (CARD_STRENGTH_BITS * len(card_codes))) | card_strength_key
+
+    def encode_pair(self, other: "HandKeyEncoder", card_codes: bytes) -> tuple[int, int]:
+        """1手札分のカードの番号の列から、このオブジェクトのルールとotherのルールの並び替え用のキーを、
+        カードの列を1回走査するだけでまとめて計算する。
+
+        Args:
+            other (HandKeyEncoder): もう一方のルールのオブジェクト。
+            card_codes (bytes): 各カードの番号を1バイトずつ並べたもの。
+
+        Returns:
+            tuple[int, int]: (このオブジェクトのルールのキー, otherのルールのキー)
+        """
+        card_strengths = self.card_strengths
+        other_card_strengths = other.card_strengths
+        hand_code = 0
+        card_strength_key = 0
+        other_card_strength_key = 0
+        for card_code in card_codes:
+            hand_code = hand_code * CARD_KIND_COUNT + card_code
+            card_strength_key = (card_strength_key << CARD_STRENGTH_BITS) | card_strengths[card_code]
+            other_card_strength_key = (other_card_strength_key << CARD_STRENGTH_BITS) | other_card_strengths[card_code]
+        rank_shift = CARD_STRENGTH_BITS * len(card_codes)
+        return (
+            (self.hand_evaluator.rank_table[hand_code] << rank_shift) | card_strength_key,
+            (other.hand_evaluator.rank_table[hand_code] << rank_shift) | other_card_strength_key,
+        )
\ No newline at end of file
@@ -0,0 +1,192 @@
+from array import array
+
+from hand import CARD_KIND_COUNT, HAND_CODE_COUNT, HAND_SIZE, HandRank
+from hand_key_encoder import HandKeyEncoder
+from hand_list_parser import CARD_CODE_TRANSLATION, INVALID_CARD_CODE
+
+
+class FenwickTree:
+    """要素の加算と、先頭からの累積和をO(log n)で計算するための木。(Binary Indexed Tree)
+
+    Attributes:
+        size (int): 要素数。
+        tree (array): 木の各ノードの値。1始まりで管理する。
+    """
+
+    def __init__(self, size: int) -> None:
+        """コンストラクタ。
+
+        Args:
+            size (int): 要素数。
+        """
+        self.size = size
+        self.tree = array("q", bytes(8 * (size + 1)))
+
+    def add(self, index: int, value: int) -> None:
+        """指定した位置の要素に値を加算する。
+
+        Args:
+            index (int): 要素の位置。0始まり。
+            value (int): 加算する値。
+        """
+        index += 1
+        while index <= self.size:
+            self.tree[index] += value
+            index += index & -index
+
+    def prefix_sum(self, end: int) -> int:
+        """先頭から指定した位置の直前までの要素の和を計算する。
+
+        Args:
+            end (int): 和を取る範囲の終端。この位置の要素は含まない。
+
+        Returns:
+            int: [0, end) の範囲の要素の和。
+        """
+        total = 0
+        while end > 0:
+            total += self.tree[end]
+            end -= end & -end
+        return total
+
+
+class HandLeaderboard:
+    """手札を1枚ずつ追加・削除しながら、順位と賞金の合計を逐次管理するクラス。
+
+    手札の強さの順に並べたインデックス（キー空間）上に、
+    手札の枚数と入札額の合計をそれぞれFenwickTreeで持つことで、
+    追加・削除・順位の問い合わせをO(log n)で行う。
+    手札を1枚追加すると、それより強い手札の順位が全て1つずつ上がるので、
+    賞金の合計は「追加した手札の賞金 + それより強い手札の入札額の合計」だけ増える。
+    全く同じ手札が複数ある場合は、HandRankerと同じく先に追加した方を弱いものとして扱う。
+
+    Attributes:
+        hand_key_encoder (HandKeyEncoder): 役の表とカードの強さを持つクラスのオブジェクト。
+        hand_counts (FenwickTree): キー空間上の各位置の手札の枚数。
+        bid_price_sums (FenwickTree): キー空間上の各位置の手札の入札額の合計。
+        bid_prices_by_index (dict[int, list[int]]): キー空間上の各位置にある手札の入札額。追加した順。
+        hand_count (int): 手札の枚数。
+        bid_price_total (int): 全手札の入札額の合計。
+        total_bounty (int): 現在の賞金の合計。
+    """
+
+    def __init__(self, question: int, cache_dir_str: str | None = None) -> None:
+        """コンストラクタ。
+
+        Args:
+            question (int): 問題の番号。
+            cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+        """
+        self.hand_key_encoder = HandKeyEncoder(question, cache_dir_str)
+        key_space_size = len(HandRank) * HAND_CODE_COUNT
+        self.hand_counts = FenwickTree(key_space_size)
+        self.bid_price_sums = FenwickTree(key_space_size)
+        self.bid_prices_by_index = {}
+        self.hand_count = 0
+        self.bid_price_total = 0
+        self.total_bounty = 0
+
+    def __len__(self) -> int:
+        return self.hand_count
+
+    def insert(self, cards: str | bytes, bid_price: int) -> int:
+        """手札を追加する。
+
+        Args:
+            cards (str | bytes): 手札。"32T3K"のような文字列か、各カードの番号を1バイトずつ並べたもの。
+            bid_price (int): 入札額。
+
+        Returns:
+            int: 追加した手札の順位。弱い方から1始まり。
+        """
+        index = self._to_index(cards)
+        bid_prices = self.bid_prices_by_index.setdefault(index, [])
+        # 同じ手札の中では最も強い（最後に追加した）ものになる。
+        position = len(bid_prices)
+        rank = self.hand_counts.prefix_sum(index) + position + 1
+
+        stronger_bid_price_sum = self._sum_stronger_bid_prices(index, bid_prices, position)
+        self.total_bounty += bid_price * rank + stronger_bid_price_sum
+
+        bid_prices.append(bid_price)
+        self.hand_counts.add(index, 1)
+        self.bid_price_sums.add(index, bid_price)
+        self.hand_count += 1
+        self.bid_price_total += bid_price
+        return rank
+
+    def remove(self, cards: str | bytes, bid_price: int) -> int:
+        """手札を削除する。同じ手札と入札額の組が複数ある場合は、最も先に追加したものを削除する。
+
+        Args:
+            cards (str | bytes): 手札。"32T3K"のような文字列か、各カードの番号を1バイトずつ並べたもの。
+            bid_price (int): 入札額。
+
+        Returns:
+            int: 削除した手札の、削除前の順位。弱い方から1始まり。
+        """
+        index = self._to_index(cards)
+        bid_prices = self.bid_prices_by_index.get(index, [])
+        position = self._find_position(cards, bid_prices, bid_price)
+        rank = self.hand_counts.prefix_sum(index) + position + 1
+
+        del bid_prices[position]
+        if not bid_prices:
+            del self.bid_prices_by_index[index]
+        self.hand_counts.add(index, -1)
+        self.bid_price_sums.add(index, -bid_price)
+        self.hand_count -= 1
+        self.bid_price_total -= bid_price
+
+        stronger_bid_price_sum = self._sum_stronger_bid_prices(index, bid_prices, position)
+        self.total_bounty -= bid_price * rank + stronger_bid_price_sum
+        return rank
+
+    def rank_of(self, cards: str | bytes, bid_price: int) -> int:
+        """追加済みの手札の順位を調べる。同じ手札と入札額の組が複数ある場合は、最も先に追加したものの順位。
+
+        Args:
+            cards (str | bytes): 手札。"32T3K"のような文字列か、各カードの番号を1バイトずつ並べたもの。
+            bid_price (int): 入札額。
+
+        Returns:
+            int: 手札の順位。弱い方から1始まり。
+        """
+        index = self._to_index(cards)
+        bid_prices = self.bid_prices_by_index.get(index, [])
+        position = self._find_position(cards, bid_prices, bid_price)
+        return self.hand_counts.prefix_sum(index) + position + 1
+
+    @staticmethod
+    def _find_position(cards: str | bytes, bid_prices: list[int], bid_price: int) -> int:
+        """同じ位置にある手札の入札額の一覧から、指定した入札額の手札のうち最も先に追加したものの位置を探す。
+        """
+        try:
+            return bid_prices.index(bid_price)
+        except ValueError:
+            raise KeyError(f"hand is not in leaderboard: ({cards!r}, {bid_price})") from None
+
+    def _sum_stronger_bid_prices(self, index: int, bid_prices: list[int], position: int) -> int:
+        """キー空間上の位置indexの、入札額の一覧のposition番目の手札より強い手札の入札額の合計を計算する。
+        """
+        # より強いキーの手札と、同じキーで後から追加した手札
+        return self.bid_price_total - self.bid_price_sums.prefix_sum(index + 1) + sum(bid_prices[position:])
+
+    def _to_index(self, cards: str | bytes) -> int:
+        """手札を、キー空間上の位置に変換する。
+        キー空間は (役の強さ, 1枚目の強さ, ..., 5枚目の強さ) の辞書順に、隙間無く並べたもの。
+        """
+        if isinstance(cards, str):
+            cards = cards.encode().translate(CARD_CODE_TRANSLATION)
+        if len(cards) != HAND_SIZE or INVALID_CARD_CODE in cards:
+            raise ValueError(f"invalid hand: {cards!r}")
+
+        hand_code = 0
+        strength_index = 0
+        card_strengths = self.hand_key_encoder.card_strengths
+        for card_code in cards:
+            hand_code = hand_code * CARD_KIND_COUNT + card_code
+            # カードの強さは1〜13
+            strength_index = strength_index * CARD_KIND_COUNT + (card_strengths[card_code] - 1)
+        rank_strength = self.hand_key_encoder.hand_evaluator.rank_table[hand_code]
+        return (rank_strength - 1) * HAND_CODE_COUNT + strength_index
\ No newline at end of file
@@ -1,5 +1,28 @@
+from array import array
+from collections.abc import Iterator
 from pathlib import Path
-from hand import Card, Hand
+from hand import CARDS_BY_CODE, HAND_SIZE, Hand
+from common.input_cache import InputCache
+from common.output import OutputLevel, getDefaultOutput
+
+
+# 一度に読み込むバイト数の既定値。
+DEFAULT_CHUNK_SIZE = 1 << 20
+# 不正な文字を変換した結果。
+INVALID_CARD_CODE = 0xFF
+
+
+def _buildCardCodeTranslation() -> bytes:
+    """カードの文字をカードの番号へ変換する、bytes.translate用の変換表を作る。
+    カード以外の文字はINVALID_CARD_CODEに変換する。
+    """
+    translation = bytearray([INVALID_CARD_CODE] * 256)
+    for card in CARDS_BY_CODE:
+        translation[ord(card.category)] = card.code
+    return bytes(translation)
+
+
+CARD_CODE_TRANSLATION = _buildCardCodeTranslation()
 
 
 class HandListParser:
@@ -16,16 +39,137 @@ class HandListParser:
         Returns:
             list[Hand]: 手札一覧をパースした結果。
         """
-        hand_list = []
-        with Path(hand_list_text_path_str).open(mode="r") as f:
-            for line in f.readlines():
-                cards, prize_money = line.split()
-                hand = Hand([Card.fromName(card_str) for card_str in cards], int(prize_money))
-                print(f"hand: {hand}")
-                hand_list.append(hand)
+        hand_list = [
+            Hand.fromCodes(card_codes, bid_price)
+            for card_codes, bid_price in HandListParser.iter_parse(hand_list_text_path_str)
+        ]
+        # 手札1枚ずつの内容は、詳細に出力する時だけ整形する。
+        output = getDefaultOutput()
+        if output.is_enabled(OutputLevel.VERBOSE):
+            for hand in hand_list:
+                output.verbose(f"hand: {hand}")
         
         return hand_list
 
+    @staticmethod
+    def iter_parse(hand_list_text_path_str: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[bytes, int]]:
+        """手札一覧を1手札ずつ遅延して読み込む。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+            chunk_size (int): 一度に読み込むバイト数。
+
+        Yields:
+            tuple[bytes, int]: (各カードの番号を1バイトずつ並べたもの, 入札額)
+        """
+        for card_codes, bid_prices in HandListParser.iter_parse_batches(hand_list_text_path_str, chunk_size):
+            for i, bid_price in enumerate(bid_prices):
+                yield card_codes[i * HAND_SIZE:(i + 1) * HAND_SIZE], bid_price
+
+    @staticmethod
+    def iter_parse_batches(hand_list_text_path_str: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[bytes, array]]:
+        """手札一覧を、チャンク単位でまとめて遅延して読み込む。
+        ファイル全体をメモリに載せず、chunk_sizeバイトずつ読み込んでまとめて変換する。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+            chunk_size (int): 一度に読み込むバイト数。
+
+        Yields:
+            tuple[bytes, array]: (チャンク内の全手札のカードの番号を連結したもの, 入札額の配列)
+                i番目の手札のカードの番号は [i * 5:(i + 1) * 5] の範囲に入る。
+        """
+        remainder = b""
+        with Path(hand_list_text_path_str).open(mode="rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                lines = (remainder + chunk).split(b"\n")
+                # 最後の行は途中で切れている可能性があるので、次のチャンクへ持ち越す
+                remainder = lines.pop()
+                batch = HandListParser._parse_lines(lines)
+                if batch[1]:
+                    yield batch
+        
+        batch = HandListParser._parse_lines([remainder])
+        if batch[1]:
+            yield batch
+
+    @staticmethod
+    def read_byte_range(hand_list_text_path_str: str, start: int, end: int) -> tuple[int, bytes, array]:
+        """手札一覧のうち、行の先頭がバイト位置[start, end)の範囲にある行だけを読み込む。
+        ファイルを重ならない範囲に分けて呼び出すと、各行はちょうど1回ずつ読み込まれる。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+            start (int): 範囲の先頭のバイト位置。
+            end (int): 範囲の末尾のバイト位置。（この位置は含まない）
+
+        Returns:
+            tuple[int, bytes, array]: (範囲内の最初の行の先頭のバイト位置, 全手札のカードの番号を連結したもの, 入札額の配列)
+        """
+        with Path(hand_list_text_path_str).open(mode="rb") as f:
+            if start > 0:
+                # 直前の位置から1行読み飛ばし、途中から始まる行を前の範囲に任せる。
+                f.seek(start - 1)
+                f.readline()
+            first_line_start = f.tell()
+            if first_line_start >= end:
+                return first_line_start, b"", array("q")
+            data = f.read(end - first_line_start)
+            # 範囲の末尾で途中まで読んだ行は、最後まで読み込む。
+            if not data.endswith(b"\n"):
+                data += f.readline()
+        
+        card_codes, bid_prices = HandListParser._parse_lines(data.split(b"\n"))
+        return first_line_start, card_codes, bid_prices
+
+    @staticmethod
+    def load_packed(hand_list_text_path_str: str, input_cache: InputCache) -> tuple[memoryview, memoryview]:
+        """手札一覧を、カードの番号と入札額の配列に変換した形で読み込む。
+        変換結果はキャッシュに保存され、以降はキャッシュをメモリマップして使う。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+            input_cache (InputCache): パース結果のキャッシュ。
+
+        Returns:
+            tuple[memoryview, memoryview]: (全手札のカードの番号を連結したもの, 入札額の配列（64ビット符号付き整数）)
+        """
+        cached_hands = input_cache.load(hand_list_text_path_str, "day07_packed_hands", HandListParser._build_packed)
+        card_codes = cached_hands.sections["card_codes"]
+        bid_prices = cached_hands.sections["bid_prices"].cast("q")
+        return card_codes, bid_prices
+
+    @staticmethod
+    def _build_packed(hand_list_bytes: bytes) -> tuple[dict, dict[str, bytes]]:
+        """手札一覧のテキストを、カードの番号と入札額の配列に変換する。InputCache.loadのbuildとして使う。
+        """
+        card_codes, bid_prices = HandListParser._parse_lines(hand_list_bytes.split(b"\n"))
+        return {"hand_count": len(bid_prices)}, {"card_codes": card_codes, "bid_prices": bid_prices.tobytes()}
+
+    @staticmethod
+    def _parse_lines(lines: list[bytes]) -> tuple[bytes, array]:
+        """手札一覧の各行をまとめてパースする。
+        """
+        cards_list = []
+        bid_prices = array("q")
+        for line in lines:
+            if not line.strip():
+                continue
+            cards, bid_price = line.split()
+            if len(cards) != HAND_SIZE:
+                raise ValueError(f"invalid hand: {cards.decode()}")
+            cards_list.append(cards)
+            bid_prices.append(int(bid_price))
+        
+        card_codes = b"".join(cards_list).translate(CARD_CODE_TRANSLATION)
+        if INVALID_CARD_CODE in card_codes:
+            invalid_index = card_codes.index(INVALID_CARD_CODE) // HAND_SIZE
+            raise ValueError(f"invalid hand: {cards_list[invalid_index].decode()}")
+        return card_codes, bid_prices
+
 
 if __name__ == "__main__":
     hand_list = HandListParser.parse("./hand_list_example.txt")
@@ -1,8 +1,30 @@
 from abc import ABC, abstractmethod
-from hand import Hand
+from hand import Hand, HandRank
 from hand_evaluator import HandEvaluator
 
 
+# 並び替え用のキーで、カード1枚分の強さに割り当てるビット数。（強さは1〜13）
+CARD_STRENGTH_BITS = 4
+
+
+def packSortKey(rank: HandRank, card_strengths: list[int]) -> int:
+    """役の強さと各カードの強さを、1個の整数の並び替え用キーにまとめる。
+    上位ビットから順に、役の強さ・1枚目のカードの強さ・…・5枚目のカードの強さを詰める。
+    整数の大小関係が、(役の強さ, 1枚目の強さ, ..., 5枚目の強さ) のタプルの大小関係と一致する。
+
+    Args:
+        rank (HandRank): 手札の役。
+        card_strengths (list[int]): 手札の各カードの強さ。
+
+    Returns:
+        int: 並び替え用のキー。
+    """
+    sort_key = rank.strength
+    for card_strength in card_strengths:
+        sort_key = (sort_key << CARD_STRENGTH_BITS) | card_strength
+    return sort_key
+
+
 class HandRanker(ABC):
     """手札間の役の強さでランク付けを行うクラス。
     """
@@ -21,6 +43,14 @@ class HandRanker(ABC):
         """
         pass
 
+    @staticmethod
+    def _sort_hands_by_keys(hands: list[Hand], sort_keys: list[int]) -> list[Hand]:
+        """事前に計算しておいた並び替え用のキーで、手札をソートする。
+        キーは手札1枚につき1回だけ計算し、比較は整数同士だけで済ませる。
+        """
+        sorted_indices = sorted(range(len(hands)), key=sort_keys.__getitem__)
+        return [hands[i] for i in sorted_indices]
+
 
 class HandRankerImpl(HandRanker):
     """手札間の役の強さでランク付けを行うクラスの、実装クラス。
@@ -29,10 +59,12 @@ class HandRankerImpl(HandRanker):
     def rank_hands(self, hands: list[Hand]) -> list[Hand]:
         """各手札間の役の強さでランク付けを行い、ソートする。
         """
+        sort_keys = []
         for hand in hands:
             hand.rank = self.hand_evaluator.evaluate(hand)
+            sort_keys.append(packSortKey(hand.rank, [card.strength for card in hand.cards]))
         
-        return sorted(hands, key=lambda hand: (hand.rank.strength, *(card.strength for card in hand.cards)))
+        return self._sort_hands_by_keys(hands, sort_keys)
 
 
 class HandRankerImpl2(HandRanker):
@@ -43,8 +75,10 @@ class HandRankerImpl2(HandRanker):
         """各手札間の役の強さでランク付けを行い、ソートする。
         カード自体の強さのルールが変わる。
         """
+        sort_keys = []
         for hand in hands:
             hand.rank = self.hand_evaluator.evaluate(hand)
             # print(f"{hand} -> {hand.rank}")
+            sort_keys.append(packSortKey(hand.rank, [card.strength2 for card in hand.cards]))
         
-        return sorted(hands, key=lambda hand: (hand.rank.strength, *(card.strength2 for card in hand.cards)))
\ No newline at end of file
+        return self._sort_hands_by_keys(hands, sort_keys)
\ No newline at end of file
@@ -1,67 +1,245 @@
 import sys
-import time
 
+from hand_batch import HandBatch
 from hand_list_parser import HandListParser
 from hand_evaluator import *
 from hand_ranker import *
+from external_hand_ranker import DEFAULT_RUN_SIZE, ExternalHandRanker
+from fused_hand_ranker import FusedHandRanker
+from parallel_hand_ranker import ParallelHandRanker
+from common.input_cache import InputCache
+from common.output import OutputLevel, getDefaultOutput
+from common.profiler import getDefaultProfiler
+from common.result_cache import DEFAULT_CACHE_DIR
 from common.time_util import getFormattedElapsedTimeInfo
 
 
-def execute(hand_list_text_path_str: str, question: int) -> None:
-    start_time = time.perf_counter()
+# 役の表のキャッシュを置くディレクトリの名前。キャッシュ全体のディレクトリの下に作る。
+RANK_TABLE_CACHE_DIR_NAME = "rank_tables"
+# 役の表のキャッシュを置く既定のディレクトリ。
+DEFAULT_RANK_TABLE_CACHE_DIR = DEFAULT_CACHE_DIR / RANK_TABLE_CACHE_DIR_NAME
 
-    hand_list = HandListParser.parse(hand_list_text_path_str)
-    print()
 
-    if question == 1:
-        hand_evaluator = HandEvaluatorImpl()
-        hand_ranker = HandRankerImpl(hand_evaluator)
-    elif question == 2:
-        hand_evaluator = HandEvaluatorImpl2()
-        hand_ranker = HandRankerImpl2(hand_evaluator)
+def getRankTableCacheDir(input_cache: InputCache | None) -> str | None:
+    """入力のキャッシュと同じ場所から、役の表のキャッシュを置くディレクトリを求める。
+
+    Args:
+        input_cache (InputCache | None): 入力のパース結果のキャッシュ。
+
+    Returns:
+        str | None: 役の表のキャッシュを置くディレクトリのパス。入力のキャッシュを使わない場合はNone。
+    """
+    if input_cache is None:
+        return None
+    return str(input_cache.base_dir / RANK_TABLE_CACHE_DIR_NAME)
+
+
+def solve(hand_list_text_path_str: str, question: int, engine: str = "batch", input_cache: InputCache | None = None) -> int:
+    """問題の答えを計算する。手札一覧の出力は行わない。
+
+    Args:
+        hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+        question (int): 問題の番号。
+        engine (str): ランク付けの方式。
+            "batch"（HandBatchに読み込んでHandRankerでソート）、"vectorized"（NumPyの配列演算。numpyが必要）、
+            "external"（外部ソート）、"parallel"（プロセスプールで並列）、
+            "fused"（問題1と問題2を1回の走査でまとめて計算し、指定した問題の答えを返す）。
+        input_cache (InputCache | None): 入力のパース結果のキャッシュ。Noneならキャッシュを使わない。
+            使う場合は、役の表も同じ場所にキャッシュする。
+
+    Returns:
+        int: 賞金の合計。
+    """
+    if question not in (1, 2):
+        raise ValueError(f"Unsupported question: {question}")
+    cache_dir_str = getRankTableCacheDir(input_cache)
+
+    if engine == "batch":
+        hand_batch = HandBatch.fromFile(hand_list_text_path_str, input_cache)
+        if question == 1:
+            hand_ranker = HandRankerImpl(HandEvaluatorImpl(cache_dir_str))
+        else:
+            hand_ranker = HandRankerImpl2(HandEvaluatorImpl2(cache_dir_str))
+        sorted_hand_list = hand_ranker.rank_hands(hand_batch)
+        return sum(fix_hand.bid_price * (i + 1) for i, fix_hand in enumerate(sorted_hand_list))
+    elif engine == "vectorized":
+        # numpyは任意の依存なので、この方式を使う時だけ読み込む。
+        from vectorized_hand_ranker import VectorizedHandRanker, loadHandArray
+        cards, bids = loadHandArray(hand_list_text_path_str)
+        return VectorizedHandRanker(joker_rule=(question == 2)).calculate_total_bounty(cards, bids)
+    elif engine == "external":
+        return ExternalHandRanker(question, cache_dir_str=cache_dir_str).calculate_total_bounty(hand_list_text_path_str)
+    elif engine == "parallel":
+        return ParallelHandRanker(question, cache_dir_str=cache_dir_str).calculate_total_bounty(hand_list_text_path_str)
+    elif engine == "fused":
+        return solve_both(hand_list_text_path_str, input_cache)[question - 1]
     else:
-        print(f"Unsupported question: {question}")
-        sys.exit()
-    
-    sorted_hand_list = hand_ranker.rank_hands(hand_list)
-    total_bounty = 0
-    for i, fix_hand in enumerate(sorted_hand_list):
-        print(f"{i + 1} {fix_hand}: {fix_hand.bid_price} * {i + 1}")
-        total_bounty += fix_hand.bid_price * (i + 1)
-    
-    print()
-    print(f"total_bounty: {total_bounty}")
+        raise ValueError(f"Unsupported engine: {engine}")
+
+
+def solve_both(hand_list_text_path_str: str, input_cache: InputCache | None = None) -> tuple[int, int]:
+    """問題1と問題2の答えを、手札一覧の1回のパースと1回の走査でまとめて計算する。
+
+    Args:
+        hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+        input_cache (InputCache | None): 役の表のキャッシュの場所として使う。Noneならキャッシュを使わない。
+
+    Returns:
+        tuple[int, int]: (問題1の賞金の合計, 問題2の賞金の合計)
+    """
+    return FusedHandRanker(getRankTableCacheDir(input_cache)).calculate_total_bounties(hand_list_text_path_str)
+
+
+def execute(hand_list_text_path_str: str, question: int, cache_dir_str: str | None = None) -> None:
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day07 question {question}") as execute_span:
+        with profiler.span("parse"):
+            hand_list = HandListParser.parse(hand_list_text_path_str)
+            output.verbose()
+
+        with profiler.span("build_rank_table"):
+            if question == 1:
+                hand_evaluator = HandEvaluatorImpl(cache_dir_str)
+                hand_ranker = HandRankerImpl(hand_evaluator)
+            elif question == 2:
+                hand_evaluator = HandEvaluatorImpl2(cache_dir_str)
+                hand_ranker = HandRankerImpl2(hand_evaluator)
+            else:
+                output.summary(f"Unsupported question: {question}")
+                sys.exit()
+        
+        with profiler.span("rank"):
+            sorted_hand_list = hand_ranker.rank_hands(hand_list)
+        with profiler.span("render"):
+            # 手札1枚ずつの順位は、詳細に出力する時だけ整形する。
+            if output.is_enabled(OutputLevel.VERBOSE):
+                for i, fix_hand in enumerate(sorted_hand_list):
+                    output.verbose(f"{i + 1} {fix_hand}: {fix_hand.bid_price} * {i + 1}")
+                output.verbose()
+            total_bounty = sum(fix_hand.bid_price * (i + 1) for i, fix_hand in enumerate(sorted_hand_list))
+            output.result("total_bounty", total_bounty, question=question, input=hand_list_text_path_str)
 
-    end_time = time.perf_counter()
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
 
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
+
+def execute_vectorized(hand_list_text_path_str: str, question: int) -> None:
+    # numpyは任意の依存なので、この関数を使う時だけ読み込む。
+    from vectorized_hand_ranker import VectorizedHandRanker, loadHandArray
+
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day07 vectorized question {question}") as execute_span:
+        if question not in (1, 2):
+            output.summary(f"Unsupported question: {question}")
+            sys.exit()
+        with profiler.span("parse"):
+            cards, bids = loadHandArray(hand_list_text_path_str)
+        with profiler.span("rank"):
+            hand_ranker = VectorizedHandRanker(joker_rule=(question == 2))
+            total_bounty = hand_ranker.calculate_total_bounty(cards, bids)
+        output.result("total_bounty", total_bounty, question=question, input=hand_list_text_path_str)
+
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
+
+
+def execute_external(
+    hand_list_text_path_str: str,
+    question: int,
+    run_size: int = DEFAULT_RUN_SIZE,
+    cache_dir_str: str | None = None
+) -> None:
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day07 external question {question}") as execute_span:
+        hand_ranker = ExternalHandRanker(question, run_size=run_size, cache_dir_str=cache_dir_str)
+        total_bounty = hand_ranker.calculate_total_bounty(hand_list_text_path_str)
+        output.result("total_bounty", total_bounty, question=question, input=hand_list_text_path_str)
+
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
+
+
+def execute_parallel(
+    hand_list_text_path_str: str,
+    question: int,
+    max_workers: int | None = None,
+    cache_dir_str: str | None = None
+) -> None:
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day07 parallel question {question}") as execute_span:
+        hand_ranker = ParallelHandRanker(question, max_workers=max_workers, cache_dir_str=cache_dir_str)
+        total_bounty = hand_ranker.calculate_total_bounty(hand_list_text_path_str)
+        output.result("total_bounty", total_bounty, question=question, input=hand_list_text_path_str)
+
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
+
+
+def execute_fused(hand_list_text_path_str: str, cache_dir_str: str | None = None) -> None:
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span("day07 fused questions 1 and 2") as execute_span:
+        hand_ranker = FusedHandRanker(cache_dir_str)
+        total_bounty1, total_bounty2 = hand_ranker.calculate_total_bounties(hand_list_text_path_str)
+        output.result("total_bounty (question 1)", total_bounty1, question=1, input=hand_list_text_path_str)
+        output.result("total_bounty (question 2)", total_bounty2, question=2, input=hand_list_text_path_str)
+
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
 
 
 if __name__ == "__main__":
+    output = getDefaultOutput()
     HAND_LIST_EXAMPLE_TEXT_PATH = "./hand_list_example.txt"
     HAND_LIST_QUESTION_TEXT_PATH = "./hand_list_question.txt"
+    # 役の表は実行のたびに作り直さず、ディスクにキャッシュしたものを使う。
+    RANK_TABLE_CACHE_DIR = str(DEFAULT_RANK_TABLE_CACHE_DIR)
+    # 引数でランク付けの方式を指定できる。（例: python main.py vectorized）
+    # 既定のfusedは、入力ごとに問題1と問題2をまとめて計算する。
+    EXECUTE_FUNCTIONS = {
+        "batch": lambda path, question: execute(path, question, RANK_TABLE_CACHE_DIR),
+        "vectorized": execute_vectorized,
+        "external": lambda path, question: execute_external(path, question, cache_dir_str=RANK_TABLE_CACHE_DIR),
+        "parallel": lambda path, question: execute_parallel(path, question, cache_dir_str=RANK_TABLE_CACHE_DIR),
+    }
+    engine = sys.argv[1] if len(sys.argv) > 1 else "fused"
+    if engine == "fused":
+        # 例題
+        output.summary("[Part 1 & 2 - example]")
+        execute_fused(HAND_LIST_EXAMPLE_TEXT_PATH, RANK_TABLE_CACHE_DIR)
+        output.summary()
+        output.summary("====================================================================================================")
+        output.summary()
+
+        # 問題
+        output.summary("[Part 1 & 2 - question]")
+        execute_fused(HAND_LIST_QUESTION_TEXT_PATH, RANK_TABLE_CACHE_DIR)
+        sys.exit()
+    if engine not in EXECUTE_FUNCTIONS:
+        output.summary(f"Unsupported engine: {engine}")
+        sys.exit()
+    execute_engine = EXECUTE_FUNCTIONS[engine]
 
     # 問題1の例題
-    print("[Part 1 - example]")
-    execute(HAND_LIST_EXAMPLE_TEXT_PATH, 1)
-    print()
-    print("====================================================================================================")
-    print()
+    output.summary("[Part 1 - example]")
+    execute_engine(HAND_LIST_EXAMPLE_TEXT_PATH, 1)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題1の問題
-    print("[Part 1 - question]")
-    execute(HAND_LIST_QUESTION_TEXT_PATH, 1)
-    print()
-    print("====================================================================================================")
-    print()
+    output.summary("[Part 1 - question]")
+    execute_engine(HAND_LIST_QUESTION_TEXT_PATH, 1)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題2の例題
-    print("[Part 2 - example]")
-    execute(HAND_LIST_EXAMPLE_TEXT_PATH, 2)
-    print()
-    print("====================================================================================================")
-    print()
+    output.summary("[Part 2 - example]")
+    execute_engine(HAND_LIST_EXAMPLE_TEXT_PATH, 2)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題2の問題
-    print("[Part 2 - question]")
-    execute(HAND_LIST_QUESTION_TEXT_PATH, 2)
\ No newline at end of file
+    output.summary("[Part 2 - question]")
+    execute_engine(HAND_LIST_QUESTION_TEXT_PATH, 2)
\ No newline at end of file
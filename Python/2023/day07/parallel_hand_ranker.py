@@ -0,0 +1,171 @@
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+import os
+
+from hand import HAND_SIZE
+from hand_key_encoder import RECORD_WORD_TYPECODE, HandKeyEncoder, iterRecords, packRecord, recordsToWords, unpackBidPrice
+from hand_list_parser import HandListParser
+from hand_ranker import CARD_STRENGTH_BITS
+
+
+# 1個のワーカーに渡すチャンクのバイト数の既定値。
+DEFAULT_CHUNK_SIZE = 1 << 20
+# ワーカー1個あたり、同時に投入しておくタスクの数。
+IN_FLIGHT_TASKS_PER_WORKER = 2
+# レコードを振り分けるバケットの番号を、並び替え用のキーから求める際に捨てる下位ビット数。
+# 役の強さと1枚目のカードの強さが同じ手札が、同じバケットに入る。
+BUCKET_SHIFT = CARD_STRENGTH_BITS * (HAND_SIZE - 1)
+
+# ワーカープロセスごとに1個だけ作る、並び替え用のキーの計算クラスのオブジェクト。
+_worker_hand_key_encoder = None
+
+
+def _initializeWorker(question: int, cache_dir_str: str | None) -> None:
+    """ワーカープロセスの初期化処理。役の表の読み込みをプロセスごとに1回で済ませる。
+    役の表は親プロセスがディスクにキャッシュしておくので、ワーカーはそれを読み込むだけで済む。
+    """
+    global _worker_hand_key_encoder
+    _worker_hand_key_encoder = HandKeyEncoder(question, cache_dir_str)
+
+
+def _rankByteRange(hand_list_text_path_str: str, start: int, end: int) -> dict[int, bytes]:
+    """手札一覧のバイト位置[start, end)の範囲を読み込んで評価し、
+    (並び替え用のキー, 読み込み順, 入札額) のレコードをバケットごとにソートして返す。
+    Handオブジェクトではなく、レコードの配列のバイト列を返してプロセス間の転送量を抑える。
+
+    読み込み順には、範囲内の最初の行の先頭のバイト位置に範囲内の手札の番号を足したものを使う。
+    1行は1バイト以上あるので、この値は実際の行の先頭のバイト位置以下になり、次の範囲の値より必ず小さい。
+    """
+    first_line_start, card_codes, bid_prices = HandListParser.read_byte_range(hand_list_text_path_str, start, end)
+    encode = _worker_hand_key_encoder.encode
+    records_by_bucket: dict[int, list[int]] = {}
+    for i, bid_price in enumerate(bid_prices):
+        sort_key = encode(card_codes[i * HAND_SIZE:(i + 1) * HAND_SIZE])
+        records_by_bucket.setdefault(sort_key >> BUCKET_SHIFT, []).append(packRecord(sort_key, first_line_start + i, bid_price))
+
+    sorted_runs = {}
+    for bucket, records in records_by_bucket.items():
+        records.sort()
+        sorted_runs[bucket] = recordsToWords(records).tobytes()
+    return sorted_runs
+
+
+def _sumBucket(sorted_runs: list[bytes]) -> tuple[int, int, int]:
+    """1個のバケットのソート済みのランをまとめてソートし、バケット内の順位で賞金の合計を計算する。
+
+    Returns:
+        tuple[int, int, int]: (手札の数, バケット内の順位で計算した賞金の合計, 入札額の合計)
+    """
+    records = []
+    for sorted_run in sorted_runs:
+        words = array(RECORD_WORD_TYPECODE)
+        words.frombytes(sorted_run)
+        records.extend(iterRecords(words))
+    # ソート済みの列を連結したものは、Timsortがランのマージとして処理する。
+    records.sort()
+
+    total_bounty = 0
+    total_bid_price = 0
+    for rank, record in enumerate(records, start=1):
+        bid_price = unpackBidPrice(record)
+        total_bounty += bid_price * rank
+        total_bid_price += bid_price
+    return len(records), total_bounty, total_bid_price
+
+
+def _iterResults(executor: Executor, function: Callable, args_iterable: Iterable[tuple], max_in_flight: int) -> Iterator:
+    """タスクを投入した順に結果を返す。未完了のタスクはmax_in_flight個までしか投入しない。
+    """
+    futures: deque[Future] = deque()
+    for args in args_iterable:
+        if len(futures) >= max_in_flight:
+            yield futures.popleft().result()
+        futures.append(executor.submit(function, *args))
+    while futures:
+        yield futures.popleft().result()
+
+
+class ParallelHandRanker:
+    """手札一覧をバイト位置で範囲に分け、複数のプロセスで並列にランク付けするクラス。
+
+    1. 各ワーカーは自分の範囲の読み込み・評価を行い、役の強さと1枚目のカードの強さで
+       レコードをバケットに振り分けて、バケットごとにソートする。
+    2. 各ワーカーはバケット1個分のランをまとめてソートし、バケット内の順位で賞金の合計を計算する。
+    3. 親プロセスは、弱いバケットから順に手札の数を足していき、
+       バケット内の順位を全体の順位に直した分（手前の手札の数 * 入札額の合計）を加える。
+    親プロセスは手札1枚ごとの処理を行わないので、ワーカーの数に応じて処理時間が短くなる。
+    全く同じ手札が複数ある場合は、HandRankerと同じく読み込み順が早い方を弱いものとして扱う。
+
+    Attributes:
+        question (int): 問題の番号。
+        max_workers (int | None): ワーカープロセスの数。Noneなら CPU のコア数。
+        chunk_size (int): 1個のワーカーに渡すチャンクのバイト数。
+        cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+    """
+
+    def __init__(
+        self,
+        question: int,
+        max_workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache_dir_str: str | None = None
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            question (int): 問題の番号。
+            max_workers (int | None): ワーカープロセスの数。Noneなら CPU のコア数。
+            chunk_size (int): 1個のワーカーに渡すチャンクのバイト数。
+            cache_dir_str (str | None): 役の表をファイルとしてキャッシュするディレクトリのパス。
+                指定した場合、親プロセスで表を作って保存しておき、各ワーカーはそれを読み込む。
+        """
+        if question not in (1, 2):
+            raise ValueError(f"Unsupported question: {question}")
+        self.question = question
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.cache_dir_str = cache_dir_str
+
+    def calculate_total_bounty(self, hand_list_text_path_str: str) -> int:
+        """手札一覧をランク付けし、賞金の合計を計算する。
+
+        Args:
+            hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+
+        Returns:
+            int: 賞金の合計。
+        """
+        # ワーカーが表を作り直さないように、先に親プロセスで表を作ってディスクに保存しておく。
+        HandKeyEncoder(self.question, self.cache_dir_str)
+        max_workers = self.max_workers or os.cpu_count() or 1
+        max_in_flight = max_workers * IN_FLIGHT_TASKS_PER_WORKER
+        file_size = os.path.getsize(hand_list_text_path_str)
+        byte_ranges = (
+            (hand_list_text_path_str, start, min(start + self.chunk_size, file_size))
+            for start in range(0, file_size, self.chunk_size)
+        )
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initializeWorker,
+            initargs=(self.question, self.cache_dir_str)
+        ) as executor:
+            sorted_runs_by_bucket: dict[int, list[bytes]] = {}
+            for sorted_runs in _iterResults(executor, _rankByteRange, byte_ranges, max_in_flight):
+                for bucket, sorted_run in sorted_runs.items():
+                    sorted_runs_by_bucket.setdefault(bucket, []).append(sorted_run)
+
+            buckets = sorted(sorted_runs_by_bucket)
+            bucket_sums = _iterResults(
+                executor,
+                _sumBucket,
+                ((sorted_runs_by_bucket.pop(bucket),) for bucket in buckets),
+                max_in_flight
+            )
+            total_bounty = 0
+            weaker_hand_count = 0
+            for hand_count, bucket_total_bounty, total_bid_price in bucket_sums:
+                total_bounty += bucket_total_bounty + weaker_hand_count * total_bid_price
+                weaker_hand_count += hand_count
+        return total_bounty
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from adventofcode.generate import generateHandList
+from external_hand_ranker import ExternalHandRanker
+import fused_hand_ranker
+from fused_hand_ranker import FusedHandRanker
+from hand_leaderboard import HandLeaderboard
+from hand_list_parser import HandListParser
+from main import solve
+from parallel_hand_ranker import ParallelHandRanker
+
+
+# 全く同じ手札が、入札額の大小を入れ替えて何度も現れる手札一覧。
+DUPLICATE_HAND_LIST_TEXT = "\n".join([
+    "KK677 28",
+    "32T3K 765",
+    "KK677 5",
+    "T55J5 684",
+    "32T3K 1",
+    "KTJJT 220",
+    "KK677 999",
+    "QQQJA 483",
+    "T55J5 2",
+    "32T3K 765",
+])
+
+
+@pytest.fixture(params=["handcrafted", "generated"])
+def duplicate_hand_list_path(request, tmp_path: Path) -> str:
+    """全く同じ手札を含む手札一覧のファイルを作る。
+    """
+    hand_list_path = tmp_path / f"hand_list_{request.param}.txt"
+    if request.param == "handcrafted":
+        hand_list_path.write_text(DUPLICATE_HAND_LIST_TEXT)
+    else:
+        # 2万枚なら、同じ手札が何組も含まれる。
+        generateHandList(str(hand_list_path), 20000, seed=1)
+    return str(hand_list_path)
+
+
+@pytest.mark.parametrize("question", [1, 2])
+def test_external_hand_ranker_orders_duplicates_like_solve(duplicate_hand_list_path: str, question: int, tmp_path: Path) -> None:
+    # 小さいランと小さいファンインで、段階的なマージも通す。
+    hand_ranker = ExternalHandRanker(question, run_size=3, max_fan_in=2, temp_dir_str=str(tmp_path))
+    assert hand_ranker.calculate_total_bounty(duplicate_hand_list_path) == solve(duplicate_hand_list_path, question)
+
+
+@pytest.mark.parametrize("question", [1, 2])
+def test_parallel_hand_ranker_orders_duplicates_like_solve(duplicate_hand_list_path: str, question: int) -> None:
+    # 小さいチャンクで、手札一覧を複数のワーカーに分ける。
+    hand_ranker = ParallelHandRanker(question, max_workers=2, chunk_size=64)
+    assert hand_ranker.calculate_total_bounty(duplicate_hand_list_path) == solve(duplicate_hand_list_path, question)
+
+
+def test_fused_hand_ranker_orders_duplicates_like_solve(duplicate_hand_list_path: str) -> None:
+    hand_ranker = FusedHandRanker()
+    assert hand_ranker.calculate_total_bounties(duplicate_hand_list_path) == (
+        solve(duplicate_hand_list_path, 1),
+        solve(duplicate_hand_list_path, 2),
+    )
+
+
+def test_fused_hand_ranker_rejects_too_many_hands(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # 読み込み順のビット数を小さくして、手札の数の上限を超えさせる。
+    monkeypatch.setattr(fused_hand_ranker, "INDEX_MASK", 7)
+    hand_list_path = tmp_path / "hand_list.txt"
+    hand_list_path.write_text(DUPLICATE_HAND_LIST_TEXT)
+    with pytest.raises(ValueError):
+        FusedHandRanker().calculate_total_bounties(str(hand_list_path))
+
+
+@pytest.mark.parametrize("question", [1, 2])
+def test_hand_leaderboard_orders_duplicates_like_solve(duplicate_hand_list_path: str, question: int) -> None:
+    hand_leaderboard = HandLeaderboard(question)
+    hand_list = list(HandListParser.iter_parse(duplicate_hand_list_path))
+    for card_codes, bid_price in hand_list:
+        hand_leaderboard.insert(card_codes, bid_price)
+    assert hand_leaderboard.total_bounty == solve(duplicate_hand_list_path, question)
+
+    # 全て削除すると、賞金の合計は0に戻る。
+    for card_codes, bid_price in hand_list:
+        hand_leaderboard.remove(card_codes, bid_price)
+    assert hand_leaderboard.total_bounty == 0
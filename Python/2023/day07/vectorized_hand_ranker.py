@@ -0,0 +1,178 @@
+import numpy as np
+
+from hand import CARDS_BY_CODE, HAND_SIZE, Card, HandRank
+from hand_list_parser import HandListParser
+from hand_ranker import CARD_STRENGTH_BITS
+
+
+# 一度にまとめて評価する手札の枚数。作業用の配列のサイズを抑えるために分割する。
+EVALUATION_BLOCK_SIZE = 1 << 20
+
+
+def loadHandArray(hand_list_text_path_str: str) -> tuple[np.ndarray, np.ndarray]:
+    """手札一覧を読み込み、配列にまとめる。
+
+    Args:
+        hand_list_text_path_str (str): 手札一覧のテキストファイルのパス。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (各カードの番号の(N, 5)のuint8配列, 入札額の(N,)のint64配列)
+    """
+    card_codes_list = []
+    bid_prices_list = []
+    for card_codes, bid_prices in HandListParser.iter_parse_batches(hand_list_text_path_str):
+        card_codes_list.append(np.frombuffer(card_codes, dtype=np.uint8))
+        bid_prices_list.append(np.frombuffer(bid_prices, dtype=np.int64))
+    
+    if not card_codes_list:
+        return np.empty((0, HAND_SIZE), dtype=np.uint8), np.empty(0, dtype=np.int64)
+    cards = np.concatenate(card_codes_list).reshape(-1, HAND_SIZE)
+    bids = np.concatenate(bid_prices_list)
+    return cards, bids
+
+
+def _buildRankStrengthsByPattern() -> np.ndarray:
+    """(カードの枚数の2乗和, ジョーカーの枚数) から役の強さを引く表を作る。
+    インデックスは 2乗和 * 6 + ジョーカーの枚数。
+    """
+    def iter_partitions(total: int, max_part: int):
+        """totalを、max_part以下の正の整数の和に分割するパターンを大きい順に列挙する。"""
+        if total == 0:
+            yield []
+            return
+        for part in range(min(total, max_part), 0, -1):
+            for rest in iter_partitions(total - part, part):
+                yield [part] + rest
+
+    rank_strengths = np.zeros((HAND_SIZE ** 2 + 1) * (HAND_SIZE + 1), dtype=np.uint8)
+    for joker_count in range(HAND_SIZE + 1):
+        for counts in iter_partitions(HAND_SIZE - joker_count, HAND_SIZE):
+            # ジョーカーは最も枚数の多いカードに加えるのが最善。
+            max_count = (counts[0] if counts else 0) + joker_count
+            second_count = counts[1] if len(counts) > 1 else 0
+            if max_count == 5:
+                rank = HandRank.FIVE_CARD
+            elif max_count == 4:
+                rank = HandRank.FOUR_CARD
+            elif max_count == 3:
+                rank = HandRank.FULL_HOUSE if second_count == 2 else HandRank.THREE_CARD
+            elif max_count == 2:
+                rank = HandRank.TWO_PAIR if second_count == 2 else HandRank.ONE_PAIR
+            else:
+                rank = HandRank.HIGH_CARD
+            square_sum = sum(count ** 2 for count in counts)
+            rank_strengths[square_sum * (HAND_SIZE + 1) + joker_count] = rank.strength
+    return rank_strengths
+
+
+_RANK_STRENGTHS_BY_PATTERN = _buildRankStrengthsByPattern()
+
+
+class VectorizedHandRanker:
+    """手札一覧をまとめて配列演算で評価・ランク付けするクラス。
+    HandEvaluatorImpl/HandRankerImpl（joker_rule=False）、
+    HandEvaluatorImpl2/HandRankerImpl2（joker_rule=True）と同じ結果になる。
+
+    Attributes:
+        joker_rule (bool): Jをジョーカーとして扱うかどうか。（問題2のルール）
+        card_strengths (np.ndarray): カードの番号から、並び替えに使うカードの強さを引く配列。
+    """
+
+    def __init__(self, joker_rule: bool) -> None:
+        """コンストラクタ。
+
+        Args:
+            joker_rule (bool): Jをジョーカーとして扱うかどうか。（問題2のルール）
+        """
+        self.joker_rule = joker_rule
+        self.card_strengths = np.array(
+            [card.strength2 if joker_rule else card.strength for card in CARDS_BY_CODE],
+            dtype=np.uint32
+        )
+
+    def evaluate(self, cards: np.ndarray) -> np.ndarray:
+        """各手札の役の強さを計算する。
+
+        役はカードの枚数の構成（とジョーカーの枚数）だけで決まる。
+        各カードの枚数の2乗和は構成ごとに異なる値になり、かつ
+        「手札の2枚の組 (i, k) のうち同じカードである組の数」と一致するので、
+        カード同士の比較だけで構成を特定して、構成ごとの役の表を引く。
+
+        Args:
+            cards (np.ndarray): 各カードの番号の(N, 5)の配列。
+
+        Returns:
+            np.ndarray: 各手札の役の強さ（HandRank.strength）の(N,)のuint8配列。
+        """
+        rank_strengths = np.empty(len(cards), dtype=np.uint8)
+        for start in range(0, len(cards), EVALUATION_BLOCK_SIZE):
+            block = cards[start:start + EVALUATION_BLOCK_SIZE]
+            rank_strengths[start:start + len(block)] = self._evaluate_block(block)
+        return rank_strengths
+
+    def _evaluate_block(self, cards: np.ndarray) -> np.ndarray:
+        """evaluateの処理を、作業用の配列が大きくなりすぎない範囲の手札に対して行う。
+        """
+        columns = [cards[:, i] for i in range(HAND_SIZE)]
+        if self.joker_rule:
+            is_jokers = [column == Card.JACK.code for column in columns]
+        else:
+            is_jokers = [np.zeros(len(cards), dtype=bool)] * HAND_SIZE
+        
+        # ジョーカー以外のカードの枚数の2乗和
+        square_sums = np.zeros(len(cards), dtype=np.uint8)
+        joker_counts = np.zeros(len(cards), dtype=np.uint8)
+        for i in range(HAND_SIZE):
+            is_not_joker = ~is_jokers[i]
+            square_sums += is_not_joker
+            joker_counts += is_jokers[i]
+            for k in range(i + 1, HAND_SIZE):
+                # (i, k)と(k, i)の2組分
+                is_same_card = (columns[i] == columns[k]) & is_not_joker
+                square_sums += is_same_card
+                square_sums += is_same_card
+        
+        return _RANK_STRENGTHS_BY_PATTERN[square_sums.astype(np.intp) * (HAND_SIZE + 1) + joker_counts]
+
+    def calculate_sort_keys(self, cards: np.ndarray, rank_strengths: np.ndarray) -> np.ndarray:
+        """各手札の並び替え用のキーを計算する。hand_ranker.packSortKeyと同じ形式。
+
+        Args:
+            cards (np.ndarray): 各カードの番号の(N, 5)の配列。
+            rank_strengths (np.ndarray): 各手札の役の強さの(N,)の配列。
+
+        Returns:
+            np.ndarray: 並び替え用のキーの(N,)のuint32配列。
+        """
+        sort_keys = rank_strengths.astype(np.uint32)
+        card_strengths = self.card_strengths[cards]
+        for i in range(HAND_SIZE):
+            sort_keys = (sort_keys << CARD_STRENGTH_BITS) | card_strengths[:, i]
+        return sort_keys
+
+    def rank_hands(self, cards: np.ndarray) -> np.ndarray:
+        """各手札間の役の強さでランク付けを行う。
+
+        Args:
+            cards (np.ndarray): 各カードの番号の(N, 5)の配列。
+
+        Returns:
+            np.ndarray: 各手札の順位（弱い方から1始まり）の(N,)のint64配列。
+        """
+        sort_keys = self.calculate_sort_keys(cards, self.evaluate(cards))
+        sorted_indices = np.argsort(sort_keys, kind="stable")
+        ranks = np.empty(len(cards), dtype=np.int64)
+        ranks[sorted_indices] = np.arange(1, len(cards) + 1, dtype=np.int64)
+        return ranks
+
+    def calculate_total_bounty(self, cards: np.ndarray, bids: np.ndarray) -> int:
+        """全手札の賞金の合計を計算する。
+
+        Args:
+            cards (np.ndarray): 各カードの番号の(N, 5)の配列。
+            bids (np.ndarray): 入札額の(N,)の配列。
+
+        Returns:
+            int: 賞金の合計。
+        """
+        return int(bids @ self.rank_hands(cards))
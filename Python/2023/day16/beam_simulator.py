@@ -1,10 +1,19 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 import sys
-from tqdm import tqdm
+import threading
+import time
+from typing import Any
 
-from map import Map, MapElement, Direction
+from map import Map, Direction, BEAM_TRANSITIONS, DIRECTION_COUNT
+from simulation_stats import LaunchRecord, SimulationStats
+from common.input_cache import InputCache
 
-sys.setrecursionlimit(5000)
+
+# 再帰でシミュレートする際に、再帰1段あたりに確保するスタックのバイト数の目安。
+RECURSION_STACK_BYTES_PER_DEPTH = 1024
+# 再帰の深さ以外に必要な、呼び出し元の分の余裕。
+RECURSION_DEPTH_MARGIN = 1000
 
 
 class Simulator(ABC):
@@ -13,16 +22,26 @@ class Simulator(ABC):
     ※ビームは他のビームとぶつかっても相互作用しない
     ※タイルは同時に複数のビームを通過可能
 
+    collect_stats=Trueを指定すると、発射ごとにビームが進んだ回数や経過時間などを計測する。
+    計測用の処理は別のメソッドに分けてあるので、指定しない場合のシミュレーションは遅くならない。
+
     Attributes:
+        engine (str): シミュレーションの方式の名前。
         map_obj (Map): マップ情報のインスタンス。
+        stats (SimulationStats | None): 計測結果。計測しない場合はNone。
     """
 
-    def __init__(self, map_info_path_str: str) -> None:
+    engine = ""
+
+    def __init__(self, map_info_path_str: str, input_cache: InputCache | None = None, collect_stats: bool = False) -> None:
         """
         Args:
             map_info_path_str (str): マップ情報のテキストファイルのパス。
+            input_cache (InputCache | None): マップのパース結果のキャッシュ。Noneならキャッシュを使わない。
+            collect_stats (bool): シミュレーションの計測を行うかどうか。
         """
-        self.map_obj = Map(map_info_path_str)
+        self.map_obj = Map(map_info_path_str, input_cache)
+        self.stats = SimulationStats(self.engine) if collect_stats else None
     
     @abstractmethod
     def simulate(self, orig_x: int, orig_y: int, orig_direction: Direction) -> int:
@@ -39,11 +58,74 @@ class Simulator(ABC):
         """
         pass
 
+    @abstractmethod
+    def _trace(self, index: int, direction: int) -> tuple[int, int, int, int]:
+        """計測しながら、simulateと同じくビームの移動をシミュレートする。
+
+        Args:
+            index (int): 初期位置。compact_grid内の位置。
+            direction (int): 初期位置から照射するビームの方向。整数で表現した方向。
+
+        Returns:
+            tuple[int, int, int, int]: (ビームが進んだ回数, 通過済みで打ち切った回数, ビームが分かれた回数, 最大の深さ)
+        """
+        pass
+
+    def _make_step(self) -> Callable[[int, int], tuple[int, ...] | None]:
+        """ビーム1歩分の処理を行う関数を作る。シミュレーションと計測で共通の処理。
+        発射1回の間は同じマップと通過の記録を使うので、発射ごとに作り直す。
+
+        Returns:
+            Callable[[int, int], tuple[int, ...] | None]: step(ビームの位置, ビームの方向)
+                ビームをタイルへ進めて通過を記録し、次に進む方向の一覧を返す。
+                （タイルの種類に応じて、そのまま通過・反射・分割する）
+                マップの範囲外（番兵）ならNone。同じタイルを同じ向きから通過済みなら、ループと見なして空のタプル。
+        """
+        # 1歩ごとに属性を辿らないように、番兵付きのグリッドと通過の記録をクロージャで持つ。
+        cells = self.map_obj.compact_grid.cells
+        passed_directions = self.map_obj.passed_directions
+
+        def step(index: int, direction: int) -> tuple[int, ...] | None:
+            transitions = BEAM_TRANSITIONS[cells[index]]
+            if transitions is None:
+                return None
+
+            direction_bit = 1 << direction
+            if passed_directions[index] & direction_bit:
+                return ()
+
+            # 現在のタイルを通過
+            passed_directions[index] |= direction_bit
+            # （確認用）
+            # print(f"(x, y) = {self.map_obj.compact_grid.position(index)}, direction: {Direction.fromIndex(direction)}, passed_directions: {passed_directions[index]}")
+            return transitions[direction]
+
+        return step
+
+    def _simulate_with_stats(self, orig_x: int, orig_y: int, orig_direction: Direction) -> int:
+        """計測しながらビームを発射し、発射1回分の計測結果をstatsへ記録する。
+        引数と戻り値はsimulateと同じ。
+        """
+        start_time = time.perf_counter()
+        step_count, revisit_count, split_count, max_depth = self._trace(
+            self.map_obj.compact_grid.index(orig_x, orig_y), orig_direction.index
+        )
+        passed_tiles_count = self.map_obj.count_passed_tiles()
+        end_time = time.perf_counter()
+        self.stats.record_launch(LaunchRecord(
+            orig_x, orig_y, orig_direction, passed_tiles_count,
+            step_count, revisit_count, split_count, max_depth, end_time - start_time
+        ))
+        return passed_tiles_count
+
     def calculate_max_passed_tiles_count(self):
         """
         初期ビーム位置を変更して、最も多くのタイルを通過する際の枚数を計算する。
         """
-        self.map_obj.passed_tiles.clear()
+        # tqdmは読み込みに時間が掛かるので、実際に使う時だけ読み込む。
+        from tqdm import tqdm
+
+        self.map_obj.clear_passed_tiles()
         
         passed_tiles_results = {}
         with tqdm(self.map_obj.shotting_beam_patterns,
@@ -51,7 +133,7 @@ class Simulator(ABC):
             for (x, y, direction) in progress_bar:
                 passed_tiles_results[(x, y, direction)] = self.simulate(x, y, direction)
                 # 次のパターンのシミュレーションを行う前に、履歴をリセット
-                self.map_obj.passed_tiles.clear()
+                self.map_obj.clear_passed_tiles()
         
         return max(passed_tiles_results.values())
 
@@ -62,134 +144,179 @@ class RecursionSimulator(Simulator):
 
     Attributes:
         map_obj (Map): マップ情報のインスタンス。
+        stats (SimulationStats | None): 計測結果。計測しない場合はNone。
     """
 
-    def __init__(self, map_info_path_str: str) -> None:
+    engine = "recursion"
+
+    def __init__(self, map_info_path_str: str, input_cache: InputCache | None = None, collect_stats: bool = False) -> None:
         """
         Args:
             map_info_path_str (str): マップ情報のテキストファイルのパス。
+            input_cache (InputCache | None): マップのパース結果のキャッシュ。Noneならキャッシュを使わない。
+            collect_stats (bool): シミュレーションの計測を行うかどうか。
         """
-        super().__init__(map_info_path_str)
+        super().__init__(map_info_path_str, input_cache, collect_stats)
 
     def simulate(self, orig_x: int, orig_y: int, orig_direction: Direction) -> int:
-        # マップの範囲外に出たら再帰終了
-        if not self.map_obj.is_in_map(orig_x, orig_y):
-            return 0
-        
-        # 同じタイルを同じ向きから通過しようとする場合は、ループと見なして再帰終了
-        if self.map_obj.has_already_passed(orig_x, orig_y, orig_direction):
-            return 0
-        
-        # 現在のタイルを通過
-        self.map_obj.mark_passed_tiles(orig_x, orig_y, orig_direction)
-
-        # ビームを進める
-        current_tile = self.map_obj.get_tile(orig_x, orig_y)
-        # （確認用）
-        # print(f"current_title: 「{current_tile.value}」({current_tile}), (x, y) = ({orig_x}, {orig_y}), direction: {orig_direction}, passed_tiles: {self.map_obj.passed_tiles}")
-        match current_tile:
-            case MapElement.EMPTY:
-                # そのまま通過
-                dx, dy = orig_direction.value
-                self.simulate(orig_x + dx, orig_y + dy, orig_direction)
-            case MapElement.MIRROR1:
-                # 反射しながら通過
-                reflected_direction = Direction.reflect_beam(MapElement.MIRROR1, orig_direction)
-                dx, dy = reflected_direction.value
-                self.simulate(orig_x + dx, orig_y + dy, reflected_direction)
-            case MapElement.MIRROR2:
-                # 反射しながら通過
-                reflected_direction = Direction.reflect_beam(MapElement.MIRROR2, orig_direction)
-                dx, dy = reflected_direction.value
-                self.simulate(orig_x + dx, orig_y + dy, reflected_direction)
-            case MapElement.SPLITTER1:
-                if orig_direction in (Direction.DOWN, Direction.UP):
-                    # 左右に分割
-                    self.simulate(orig_x - 1, orig_y, Direction.LEFT)
-                    self.simulate(orig_x + 1, orig_y, Direction.RIGHT)
-                else:
-                    # そのまま通過
-                    dx, dy = orig_direction.value
-                    self.simulate(orig_x + dx, orig_y + dy, orig_direction)
-            case MapElement.SPLITTER2:
-                if orig_direction in (Direction.RIGHT, Direction.LEFT):
-                    # 上下に分割
-                    self.simulate(orig_x, orig_y - 1, Direction.UP)
-                    self.simulate(orig_x, orig_y + 1, Direction.DOWN)
-                else:
-                    # そのまま通過
-                    dx, dy = orig_direction.value
-                    self.simulate(orig_x + dx, orig_y + dy, orig_direction)
-            
+        if self.stats is not None:
+            return self._simulate_with_stats(orig_x, orig_y, orig_direction)
+        self._call_with_deep_recursion(
+            self._simulate_from, self.map_obj.compact_grid.index(orig_x, orig_y), orig_direction.index, self._make_step()
+        )
         return self.map_obj.count_passed_tiles()
 
+    def _call_with_deep_recursion(self, function: Callable[..., Any], *args: Any) -> Any:
+        """再帰の深さの上限を引き上げ、スタックを大きくしたワーカースレッドで関数を呼び出す。
+        再帰の深さは、マップの全タイル・全方向を1回ずつ通過する場合が最大になる。
+
+        Args:
+            function (Callable[..., Any]): 呼び出す関数。
+            *args (Any): 関数に渡す引数。
+
+        Returns:
+            Any: 関数の戻り値。関数で発生した例外は、呼び出し元のスレッドで送出し直す。
+        """
+        compact_grid = self.map_obj.compact_grid
+        max_depth = len(compact_grid.cells) * DIRECTION_COUNT + RECURSION_DEPTH_MARGIN
+        results = []
+        errors = []
+
+        def run() -> None:
+            try:
+                results.append(function(*args))
+            except BaseException as e:
+                errors.append(e)
+
+        previous_recursion_limit = sys.getrecursionlimit()
+        previous_stack_size = threading.stack_size(max_depth * RECURSION_STACK_BYTES_PER_DEPTH)
+        try:
+            sys.setrecursionlimit(max(previous_recursion_limit, max_depth))
+            worker = threading.Thread(target=run, name="RecursionSimulator")
+            worker.start()
+            worker.join()
+        finally:
+            threading.stack_size(previous_stack_size)
+            sys.setrecursionlimit(previous_recursion_limit)
+        if errors:
+            raise errors[0]
+        return results[0]
+
+    def _simulate_from(self, index: int, direction: int, step: Callable[[int, int], tuple[int, ...] | None]) -> None:
+        """compact_grid内の位置を使って、ビームの移動を再帰的にシミュレートする。
+
+        Args:
+            index (int): ビームの位置。compact_grid内の位置。
+            direction (int): ビームの方向。整数で表現した方向。
+            step (Callable[[int, int], tuple[int, ...] | None]): _make_stepで作ったビーム1歩分の処理。
+        """
+        # マップの範囲外（番兵）に出た場合と、ループと見なした場合は、次に進む方向が無いので再帰終了
+        neighbor_offsets = self.map_obj.compact_grid.neighbor_offsets
+        for next_direction in step(index, direction) or ():
+            self._simulate_from(index + neighbor_offsets[next_direction], next_direction, step)
+
+    def _trace(self, index: int, direction: int) -> tuple[int, int, int, int]:
+        # [ビームが進んだ回数, 通過済みで打ち切った回数, ビームが分かれた回数, 最大の深さ]
+        counters = [0, 0, 0, 0]
+        self._call_with_deep_recursion(self._trace_from, index, direction, 1, counters, self._make_step())
+        return tuple(counters)
+
+    def _trace_from(
+        self,
+        index: int,
+        direction: int,
+        depth: int,
+        counters: list[int],
+        step: Callable[[int, int], tuple[int, ...] | None]
+    ) -> None:
+        """計測しながら、_simulate_fromと同じくビームの移動を再帰的にシミュレートする。
+
+        Args:
+            index (int): ビームの位置。compact_grid内の位置。
+            direction (int): ビームの方向。整数で表現した方向。
+            depth (int): 再帰の深さ。
+            counters (list[int]): 計測中の値。_traceを参照。
+            step (Callable[[int, int], tuple[int, ...] | None]): _make_stepで作ったビーム1歩分の処理。
+        """
+        if counters[3] < depth:
+            counters[3] = depth
+
+        next_directions = step(index, direction)
+        if next_directions is None:
+            return
+        if not next_directions:
+            counters[1] += 1
+            return
+
+        counters[0] += 1
+        if len(next_directions) > 1:
+            counters[2] += 1
+        neighbor_offsets = self.map_obj.compact_grid.neighbor_offsets
+        for next_direction in next_directions:
+            self._trace_from(index + neighbor_offsets[next_direction], next_direction, depth + 1, counters, step)
+
 
 class StackSimulator(Simulator):
     """スタックを用いてシミュレートする。
 
     Attributes:
         map_obj (Map): マップ情報のインスタンス。
+        stats (SimulationStats | None): 計測結果。計測しない場合はNone。
     """
 
-    def __init__(self, map_info_path_str: str) -> None:
+    engine = "stack"
+
+    def __init__(self, map_info_path_str: str, input_cache: InputCache | None = None, collect_stats: bool = False) -> None:
         """
         Args:
             map_info_path_str (str): マップ情報のテキストファイルのパス。
+            input_cache (InputCache | None): マップのパース結果のキャッシュ。Noneならキャッシュを使わない。
+            collect_stats (bool): シミュレーションの計測を行うかどうか。
         """
-        super().__init__(map_info_path_str)
+        super().__init__(map_info_path_str, input_cache, collect_stats)
 
     def simulate(self, orig_x: int, orig_y: int, orig_direction: Direction) -> int:
-        stack = [(orig_x, orig_y, orig_direction)]
+        if self.stats is not None:
+            return self._simulate_with_stats(orig_x, orig_y, orig_direction)
+
+        # 範囲チェックを省くため、番兵付きのグリッド内の位置と整数で表現した方向でビームを進める。
+        neighbor_offsets = self.map_obj.compact_grid.neighbor_offsets
+        step = self._make_step()
+
+        stack = [(self.map_obj.compact_grid.index(orig_x, orig_y), orig_direction.index)]
+        while stack:
+            index, direction = stack.pop()
+            # マップの範囲外（番兵）に出た場合と、ループと見なした場合は、次に進む方向が無いのでスキップ
+            for next_direction in step(index, direction) or ():
+                stack.append((index + neighbor_offsets[next_direction], next_direction))
+        
+        return self.map_obj.count_passed_tiles()
+
+    def _trace(self, index: int, direction: int) -> tuple[int, int, int, int]:
+        neighbor_offsets = self.map_obj.compact_grid.neighbor_offsets
+        step = self._make_step()
+        step_count = 0
+        revisit_count = 0
+        split_count = 0
+        max_depth = 1
+
+        stack = [(index, direction)]
         while stack:
-            x, y, direction = stack.pop()
+            index, direction = stack.pop()
 
-            # マップの範囲外はスキップ
-            if not self.map_obj.is_in_map(x, y):
+            next_directions = step(index, direction)
+            if next_directions is None:
                 continue
-            
-            # 同じタイルを同じ向きから通過しようとする場合は、ループと見なしてスキップ
-            if self.map_obj.has_already_passed(x, y, direction):
+            if not next_directions:
+                revisit_count += 1
                 continue
 
-            # 現在のタイルを通過
-            self.map_obj.mark_passed_tiles(x, y, direction)
+            step_count += 1
+            if len(next_directions) > 1:
+                split_count += 1
+            for next_direction in next_directions:
+                stack.append((index + neighbor_offsets[next_direction], next_direction))
+            if max_depth < len(stack):
+                max_depth = len(stack)
 
-            # ビームを進める
-            current_tile = self.map_obj.get_tile(x, y)
-            # （確認用）
-            # print(f"current_title: 「{current_tile.value}」({current_tile}), (x, y) = ({x}, {y}), direction: {direction}, passed_tiles: {self.map_obj.passed_tiles}")
-            match current_tile:
-                case MapElement.EMPTY:
-                    # そのまま通過
-                    dx, dy = direction.value
-                    stack.append((x + dx, y + dy, direction))
-                case MapElement.MIRROR1:
-                    # 反射しながら通過
-                    reflected_direction = Direction.reflect_beam(MapElement.MIRROR1, direction)
-                    dx, dy = reflected_direction.value
-                    stack.append((x + dx, y + dy, reflected_direction))
-                case MapElement.MIRROR2:
-                    # 反射しながら通過
-                    reflected_direction = Direction.reflect_beam(MapElement.MIRROR2, direction)
-                    dx, dy = reflected_direction.value
-                    stack.append((x + dx, y + dy, reflected_direction))
-                case MapElement.SPLITTER1:
-                    if direction in (Direction.DOWN, Direction.UP):
-                        # 左右に分割
-                        stack.append((x - 1, y, Direction.LEFT))
-                        stack.append((x + 1, y, Direction.RIGHT))
-                    else:
-                        # そのまま通過
-                        dx, dy = direction.value
-                        stack.append((x + dx, y + dy, direction))
-                case MapElement.SPLITTER2:
-                    if direction in (Direction.RIGHT, Direction.LEFT):
-                        # 上下に分割
-                        stack.append((x, y - 1, Direction.UP))
-                        stack.append((x, y + 1, Direction.DOWN))
-                    else:
-                        # そのまま通過
-                        dx, dy = direction.value
-                        stack.append((x + dx, y + dy, direction))
-        
-        return self.map_obj.count_passed_tiles()
+        return step_count, revisit_count, split_count, max_depth
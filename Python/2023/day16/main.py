@@ -1,124 +1,157 @@
-import time
-
 from beam_simulator import RecursionSimulator, StackSimulator
 from map import Direction
+from common.input_cache import InputCache
+from common.output import getDefaultOutput
+from common.profiler import getDefaultProfiler
 from common.time_util import getFormattedElapsedTimeInfo
 
 
+def solve(
+    map_info_path_str: str,
+    question: int,
+    engine: str = "stack",
+    stats_json: str | None = None,
+    input_cache: InputCache | None = None
+) -> int:
+    """問題の答えを計算する。
+
+    Args:
+        map_info_path_str (str): マップ情報のテキストファイルのパス。
+        question (int): 問題の番号。
+        engine (str): シミュレーションの方式。"recursion"（再帰）か"stack"（スタック）。
+        stats_json (str | None): 指定した場合、シミュレーションを計測し、要約を出力して結果をこのパスへJSONとして書き出す。
+        input_cache (InputCache | None): 入力のパース結果のキャッシュ。Noneならキャッシュを使わない。
+
+    Returns:
+        int: 問題1なら左上から右へビームを発射した際に、問題2なら最も多くのタイルを通過する際に、通過するタイルの枚数。
+    """
+    collect_stats = stats_json is not None
+    if engine == "recursion":
+        simulator = RecursionSimulator(map_info_path_str, input_cache, collect_stats)
+    elif engine == "stack":
+        simulator = StackSimulator(map_info_path_str, input_cache, collect_stats)
+    else:
+        raise ValueError(f"Unsupported engine: {engine}")
+
+    if question == 1:
+        answer = simulator.simulate(0, 0, Direction.RIGHT)
+    elif question == 2:
+        answer = simulator.calculate_max_passed_tiles_count()
+    else:
+        raise ValueError(f"Unsupported question: {question}")
+
+    if collect_stats:
+        getDefaultOutput().summary(simulator.stats.format_summary())
+        simulator.stats.dump_json(stats_json)
+    return answer
+
+
 if __name__  == "__main__":
+    output = getDefaultOutput()
+    profiler = getDefaultProfiler()
     map_info1_path = "./map_info1.txt" # 例題
     map_info2_path = "./map_info2.txt" # 例題
     map_info3_path = "./map_info3.txt" # 問題
 
     
     # 問題1. 左上から右に向かってビームを発射する際に通過するタイルの枚数を計算する。
-    print("- Question 1")
-    print()
+    output.summary("- Question 1")
+    output.summary()
 
     # マップ1: 9が正解。（例題）
-    print("* Map 1 (Example)")
-    print()
+    output.summary("* Map 1 (Example)")
+    output.summary()
     # 再帰
-    print("Recursion")
-    start_time = time.perf_counter()
-    recursion_simulator1 = RecursionSimulator(map_info1_path)
-    recursion_result1 = recursion_simulator1.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"recursion_result1: {recursion_result1}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Recursion")
+    with profiler.span("day16 question 1 map 1 recursion") as span:
+        recursion_simulator1 = RecursionSimulator(map_info1_path)
+        recursion_result1 = recursion_simulator1.simulate(0, 0, Direction.RIGHT)
+    output.result("recursion_result1", recursion_result1)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     # スタック
-    print("Stack")
-    start_time = time.perf_counter()
-    stack_simulator1 = StackSimulator(map_info1_path)
-    stack_result1 = stack_simulator1.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"stack_result1: {stack_result1}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Stack")
+    with profiler.span("day16 question 1 map 1 stack") as span:
+        stack_simulator1 = StackSimulator(map_info1_path)
+        stack_result1 = stack_simulator1.simulate(0, 0, Direction.RIGHT)
+    output.result("stack_result1", stack_result1)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
 
     # マップ2: 46が正解。（例題）
-    print("* Map 2 (Example)")
-    print()
+    output.summary("* Map 2 (Example)")
+    output.summary()
     # 再帰
-    print("Recursion")
-    start_time = time.perf_counter()
-    recursion_simulator2 = RecursionSimulator(map_info2_path)
-    recursion_result2 = recursion_simulator2.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"recursion_result2: {recursion_result2}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Recursion")
+    with profiler.span("day16 question 1 map 2 recursion") as span:
+        recursion_simulator2 = RecursionSimulator(map_info2_path)
+        recursion_result2 = recursion_simulator2.simulate(0, 0, Direction.RIGHT)
+    output.result("recursion_result2", recursion_result2)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     # スタック
-    print("Stack")
-    start_time = time.perf_counter()
-    stack_simulator2 = StackSimulator(map_info2_path)
-    stack_result2 = stack_simulator2.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"stack_result2: {stack_result2}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Stack")
+    with profiler.span("day16 question 1 map 2 stack") as span:
+        stack_simulator2 = StackSimulator(map_info2_path)
+        stack_result2 = stack_simulator2.simulate(0, 0, Direction.RIGHT)
+    output.result("stack_result2", stack_result2)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
 
     # マップ3: 7562が正解。（メインの問題）
-    print("* Map 3 (Main)")
-    print()
+    output.summary("* Map 3 (Main)")
+    output.summary()
     # 再帰
-    print("Recursion")
-    start_time = time.perf_counter()
-    recursion_simulator3 = RecursionSimulator(map_info3_path)
-    recursion_result3 = recursion_simulator3.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"recursion_result3: {recursion_result3}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Recursion")
+    with profiler.span("day16 question 1 map 3 recursion") as span:
+        recursion_simulator3 = RecursionSimulator(map_info3_path)
+        recursion_result3 = recursion_simulator3.simulate(0, 0, Direction.RIGHT)
+    output.result("recursion_result3", recursion_result3)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     # スタック
-    print("Stack")
-    start_time = time.perf_counter()
-    stack_simulator3 = StackSimulator(map_info3_path)
-    stack_result3 = stack_simulator3.simulate(0, 0, Direction.RIGHT)
-    end_time = time.perf_counter()
-    print(f"stack_result3: {stack_result3}")
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Stack")
+    with profiler.span("day16 question 1 map 3 stack") as span:
+        stack_simulator3 = StackSimulator(map_info3_path)
+        stack_result3 = stack_simulator3.simulate(0, 0, Direction.RIGHT)
+    output.result("stack_result3", stack_result3)
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     
 
     # 問題2. 初期ビーム位置を変更して、最も多くのタイルを通過する際の枚数を計算する。
-    print()
-    print("- Question 2")
-    print()
+    output.summary()
+    output.summary("- Question 2")
+    output.summary()
 
     # マップ2: 51が正解。（例題）
-    print("* Map 2 (Example)")
-    print()
+    output.summary("* Map 2 (Example)")
+    output.summary()
     # 再帰
-    print("Recursion")
-    start_time = time.perf_counter()
-    print(f"max passed tiles count (recursion): {recursion_simulator2.calculate_max_passed_tiles_count()}")
-    end_time = time.perf_counter()
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Recursion")
+    with profiler.span("day16 question 2 map 2 recursion") as span:
+        output.result("max passed tiles count (recursion)", recursion_simulator2.calculate_max_passed_tiles_count())
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     # スタック
-    print("Stack")
-    start_time = time.perf_counter()
-    print(f"max passed tiles count (stack): {stack_simulator2.calculate_max_passed_tiles_count()}")
-    end_time = time.perf_counter()
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Stack")
+    with profiler.span("day16 question 2 map 2 stack") as span:
+        output.result("max passed tiles count (stack)", stack_simulator2.calculate_max_passed_tiles_count())
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
 
     # マップ3: 7793が正解。（メインの問題）
-    print("* Map 3 (Main)")
-    print()
+    output.summary("* Map 3 (Main)")
+    output.summary()
     # 再帰
-    print("Recursion")
-    start_time = time.perf_counter()
-    print(f"max passed tiles count (recursion): {recursion_simulator3.calculate_max_passed_tiles_count()}")
-    end_time = time.perf_counter()
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Recursion")
+    with profiler.span("day16 question 2 map 3 recursion") as span:
+        output.result("max passed tiles count (recursion)", recursion_simulator3.calculate_max_passed_tiles_count())
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
     # スタック
-    print("Stack")
-    start_time = time.perf_counter()
-    print(f"max passed tiles count (stack): {stack_simulator3.calculate_max_passed_tiles_count()}")
-    end_time = time.perf_counter()
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
-    print()
+    output.summary("Stack")
+    with profiler.span("day16 question 2 map 3 stack") as span:
+        output.result("max passed tiles count (stack)", stack_simulator3.calculate_max_passed_tiles_count())
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(span.start_time, span.end_time)}")
+    output.summary()
@@ -1,6 +1,18 @@
 from enum import Enum
 from pathlib import Path
 
+from common.constants import (
+    Direction,
+    DIRECTION_COUNT,
+    REFLECT_BACKSLASH,
+    REFLECT_SLASH,
+    SPLIT_HORIZONTAL,
+    SPLIT_VERTICAL,
+)
+from common.grid import CompactGrid
+from common.input_cache import InputCache, buildByteGrid
+from common.output import OutputLevel, getDefaultOutput
+
 
 class MapElement(Enum):
     """マップ情報の要素を表現する列挙型。
@@ -19,81 +31,76 @@ class MapElement(Enum):
         raise ValueError(f"invalid value: {target_value} in {cls.__name__}.")
 
 
-class Direction(Enum):
-    """ビームの方向を表現するクラス。
+# マップの周囲に置く番兵。マップ情報の文字と被らない値にする。
+MAP_SENTINEL = 0
+# マップ情報の文字のバイトから、要素を引くための辞書。
+MAP_ELEMENTS_BY_BYTE = {ord(e.value): e for e in MapElement}
+# マップ情報の文字として使えるバイト。
+MAP_ELEMENT_BYTES = bytes(MAP_ELEMENTS_BY_BYTE)
 
-    x軸: 右方向、y軸: 下方向をそれぞれ正とする。
-    """
-    RIGHT = (1, 0) # x+1, y
-    LEFT = (-1, 0) # x-1, y
-    UP = (0, -1) # x, y-1
-    DOWN = (0, 1) # x, y+1
 
-    @classmethod
-    def reflect_beam(cls, mirror_type: MapElement, current_direction: "Direction"):
-        """ビームが反射される際に方向転換させる。
-        反射後の向きは、ビーム視点ではなく、常にマップを正面から見た時の向きとして転換させるものとする。
-
-        Args:
-            mirror_type (MapElement): ミラーの種類。これによって反射の仕方が変わってくる。
-            current_direction (Direction): 現在のビームの方向。
-        """
-        match current_direction:
-            case Direction.RIGHT: # 右方向へ照射された時
-                match mirror_type:
-                    case MapElement.MIRROR1:
-                        return Direction.UP
-                    case MapElement.MIRROR2:
-                        return Direction.DOWN
-            case Direction.LEFT: # 左方向へ照射された時
-                match mirror_type:
-                    case MapElement.MIRROR1:
-                        return Direction.DOWN
-                    case MapElement.MIRROR2:
-                        return Direction.UP
-            case Direction.UP: # 上方向へ照射された時
-                match mirror_type:
-                    case MapElement.MIRROR1:
-                        return Direction.RIGHT
-                    case MapElement.MIRROR2:
-                        return Direction.LEFT
-            case Direction.DOWN: # 下方向へ照射された時
-                match mirror_type:
-                    case MapElement.MIRROR1:
-                        return Direction.LEFT
-                    case MapElement.MIRROR2:
-                        return Direction.RIGHT
+def _buildMap(map_bytes: bytes) -> tuple[dict, dict[str, bytes]]:
+    """マップ情報のテキストを、各マスの文字を1バイトずつ並べたバイト列に変換する。
+    不正な文字の確認はここで1回だけ行い、キャッシュから読み込む際には省く。
+    """
+    metadata, sections = buildByteGrid(map_bytes, MAP_SENTINEL)
+    # 使える文字と番兵を全て削除して残ったものが、不正な文字。
+    invalid_bytes = sections["cells"].translate(None, MAP_ELEMENT_BYTES + bytes([MAP_SENTINEL]))
+    if invalid_bytes:
+        raise ValueError(f"invalid value: {bytes(sorted(set(invalid_bytes)))} in {MapElement.__name__}.")
+    return metadata, sections
+
+# 各タイルへ入ってきたビームが、次に進む方向。
+# BEAM_TRANSITIONS[タイルの文字のバイト][整数で表現した入ってきた方向] -> 次に進む方向のタプル
+# マップ情報の文字以外（番兵など）はNoneなので、範囲外の判定にも使える。
+BEAM_TRANSITIONS = [None] * 256
+BEAM_TRANSITIONS[ord(MapElement.EMPTY.value)] = tuple((direction,) for direction in range(DIRECTION_COUNT))
+BEAM_TRANSITIONS[ord(MapElement.MIRROR1.value)] = tuple((direction,) for direction in REFLECT_SLASH)
+BEAM_TRANSITIONS[ord(MapElement.MIRROR2.value)] = tuple((direction,) for direction in REFLECT_BACKSLASH)
+BEAM_TRANSITIONS[ord(MapElement.SPLITTER1.value)] = SPLIT_HORIZONTAL
+BEAM_TRANSITIONS[ord(MapElement.SPLITTER2.value)] = SPLIT_VERTICAL
 
 
 class Map:
     """マップの情報保持や操作のロジックをまとめたクラス。
 
     Attributes:
-        grid (list[list[str]]): マップ情報を盤面としてリスト化したもの。
+        compact_grid (CompactGrid): マップ情報の各マスの文字を、周囲に番兵を置いた1個のバイト列で保持したもの。
+            シミュレーションのループでは、こちらを直接参照することで範囲チェックを省く。
+        grid (list[memoryview]): マップ情報の各行。compact_gridをコピーせずに参照している。
+            grid[y][x] で各マスの文字のバイトを取得できる。
         x_size (int): マップ情報のx方向のマス数。
         y_size (int): マップ情報のy方向のマス数。
         shotting_beam_patterns (list[tuple(int, int, Direction)]): マップ情報を基に、初期ビーム位置・方向のパターンを列挙するためのリスト。
-        passed_tiles (list[tuple(int, int, Direction)]): ビームが通過したタイル。(x座標, y座標, どの向きから入ってきたか)
+        passed_directions (bytearray): ビームが通過したタイル。compact_gridと同じ位置に、どの向きから入ってきたかを
+            1 << 整数で表現した方向 の論理和で記録する。
     """
-    def __init__(self, map_info_path_str: str):
+    def __init__(self, map_info_path_str: str, input_cache: InputCache | None = None):
         """
         Args:
             map_info_path_str (str): マップ情報のテキストファイルのパス。
+            input_cache (InputCache | None): マップのパース結果のキャッシュ。Noneならキャッシュを使わずにパースする。
         """
-        with Path(map_info_path_str).open(mode="r") as f:
-            map_info = f.read()
-        self.grid = map_info.split("\n")
-        print("map:")
-        print(map_info)
-
-        map_each_row_count = set(map(len, self.grid))
-        if len(map_each_row_count) > 1:
-            # マップの行ごとのマス数がズレていたら弾く
-            raise Exception(f"map rows is not equal. (map_each_row_count: {map_each_row_count})")
-        
-        self.x_size = len(self.grid[0])
-        self.y_size = len(self.grid)
-        print(f"map size = ({self.x_size}, {self.y_size})")
+        if input_cache is None:
+            metadata, sections = _buildMap(Path(map_info_path_str).read_bytes())
+            cells = sections["cells"]
+        else:
+            # キャッシュには番兵を置いた配置で保存してあるので、メモリマップしたものをコピーせずに使う。
+            cached_map = input_cache.load(map_info_path_str, "day16_map", _buildMap)
+            metadata, cells = cached_map.metadata, cached_map.sections["cells"]
+
+        # 番兵の値がマップ情報の文字に含まれないことは、_buildMapで確認済み。
+        self.compact_grid = CompactGrid(metadata["x_size"], metadata["y_size"], cells, MAP_SENTINEL)
+        self.grid = self.compact_grid.rows()
+        self.x_size = self.compact_grid.x_size
+        self.y_size = self.compact_grid.y_size
+
+        # マップの内容は、詳細に出力する時だけ整形する。
+        output = getDefaultOutput()
+        if output.is_enabled(OutputLevel.VERBOSE):
+            output.verbose("map:")
+            output.verbose("\n".join(row.tobytes().decode() for row in self.grid))
+            output.verbose(f"map size = ({self.x_size}, {self.y_size})")
 
         self.shotting_beam_patterns = []
         # ビームを発射できる全パターンを記録しておく。
@@ -109,7 +116,7 @@ class Map:
             # 最右列の辺
             self.shotting_beam_patterns.append((self.x_size - 1, y, Direction.LEFT))
 
-        self.passed_tiles = []
+        self.passed_directions = bytearray(len(self.compact_grid.cells))
     
     def is_in_map(self, x: int, y: int) -> bool:
         """マップ内の座標かどうかを判定する。
@@ -118,8 +125,7 @@ class Map:
             x (int): x座標。
             y (int): y座標。
         """
-        # 配列の添え字なので終端はイコール無し
-        return 0 <= x < self.x_size and 0 <= y < self.y_size
+        return self.compact_grid.is_inside(x, y)
     
     def get_tile(self, x: int, y: int) -> MapElement:
         """指定した座標のタイルの情報を取得する。
@@ -129,7 +135,7 @@ class Map:
             y (int): y座標。
         """
         if self.is_in_map(x, y):
-            return MapElement.value_of(self.grid[y][x])
+            return MAP_ELEMENTS_BY_BYTE[self.compact_grid.get(x, y)]
         return None # マップの範囲外
     
     def mark_passed_tiles(self, x: int, y: int, direction: Direction) -> None:
@@ -140,7 +146,7 @@ class Map:
             y (int): y座標。
             direction (Direction): 指定した位置のタイルへビームが入ってきた方向。
         """
-        self.passed_tiles.append((x, y, direction))
+        self.passed_directions[self.compact_grid.index(x, y)] |= 1 << direction.index
     
     def has_already_passed(self, x: int, y: int, direction: Direction) -> bool:
         """指定した座標のタイルに、指定した方向から既に通過済みかどうかをチェックする。
@@ -151,12 +157,17 @@ class Map:
             y (int): y座標。
             direction (Direction): 指定した位置のタイルへビームが入ってきた方向。
         """
-        return (x, y, direction) in self.passed_tiles
+        return bool(self.passed_directions[self.compact_grid.index(x, y)] & (1 << direction.index))
     
     def count_passed_tiles(self) -> int:
         """通過済みのタイル数をカウントする。
         同じタイルを違う方向から複数回通過するケースで
         重複してカウントされないように、ビームが通過した方向は無視する。
         """
-        # setにすることで、座標情報の重複を除去する。
-        return len({(tile[0], tile[1]) for tile in self.passed_tiles})
+        # どの方向からでも1回以上通過していれば、0以外になっている。
+        return len(self.passed_directions) - self.passed_directions.count(0)
+
+    def clear_passed_tiles(self) -> None:
+        """通過済みのタイルの記録をリセットする。
+        """
+        self.passed_directions = bytearray(len(self.compact_grid.cells))
@@ -0,0 +1,172 @@
+import json
+from pathlib import Path
+
+from map import Direction
+
+
+class LaunchRecord:
+    """ビーム1回の発射分の計測結果を保持するデータクラス。
+
+    Attributes:
+        x (int): 初期位置のx座標。
+        y (int): 初期位置のy座標。
+        direction (Direction): 初期位置から照射したビームの方向。
+        passed_tiles_count (int): 通過したタイルの枚数。
+        step_count (int): ビームが進んだ回数。（タイルを新たな向きで通過した回数）
+        revisit_count (int): 通過済みのタイルを同じ向きから通過しようとして打ち切った回数。
+        split_count (int): スプリッターでビームが2本に分かれた回数。
+        max_depth (int): スタックの最大の長さ、または再帰の最大の深さ。
+        wall_time (float): シミュレーションの経過時間。秒単位。
+    """
+
+    def __init__(
+        self,
+        x: int,
+        y: int,
+        direction: Direction,
+        passed_tiles_count: int,
+        step_count: int,
+        revisit_count: int,
+        split_count: int,
+        max_depth: int,
+        wall_time: float
+    ) -> None:
+        self.x = x
+        self.y = y
+        self.direction = direction
+        self.passed_tiles_count = passed_tiles_count
+        self.step_count = step_count
+        self.revisit_count = revisit_count
+        self.split_count = split_count
+        self.max_depth = max_depth
+        self.wall_time = wall_time
+
+    def to_dict(self) -> dict:
+        """JSONへ変換できる辞書に変換する。
+        """
+        return {
+            "x": self.x,
+            "y": self.y,
+            "direction": self.direction.name,
+            "passed_tiles_count": self.passed_tiles_count,
+            "step_count": self.step_count,
+            "revisit_count": self.revisit_count,
+            "split_count": self.split_count,
+            "max_depth": self.max_depth,
+            "wall_time": self.wall_time,
+        }
+
+
+class SimulationStats:
+    """ビームのシミュレーションの計測結果を、発射ごとに記録するクラス。
+    Simulatorにcollect_stats=Trueを指定した場合だけ作られ、指定しない場合は計測用の処理を一切通らない。
+
+    使用例:
+        simulator = StackSimulator(map_info_path_str, collect_stats=True)
+        simulator.calculate_max_passed_tiles_count()
+        print(simulator.stats.to_json())
+
+    Attributes:
+        engine (str): シミュレーションの方式。"recursion"（再帰）か"stack"（スタック）。
+        launches (list[LaunchRecord]): 発射ごとの計測結果。
+    """
+
+    def __init__(self, engine: str) -> None:
+        """
+        Args:
+            engine (str): シミュレーションの方式。
+        """
+        self.engine = engine
+        self.launches = []
+
+    def record_launch(self, launch_record: LaunchRecord) -> None:
+        """発射1回分の計測結果を記録する。
+        """
+        self.launches.append(launch_record)
+
+    @property
+    def step_count(self) -> int:
+        """全発射でビームが進んだ回数の合計。
+        """
+        return sum(launch.step_count for launch in self.launches)
+
+    @property
+    def revisit_count(self) -> int:
+        """全発射で通過済みのタイルを同じ向きから通過しようとした回数の合計。
+        """
+        return sum(launch.revisit_count for launch in self.launches)
+
+    @property
+    def split_count(self) -> int:
+        """全発射でスプリッターでビームが分かれた回数の合計。
+        """
+        return sum(launch.split_count for launch in self.launches)
+
+    @property
+    def max_depth(self) -> int:
+        """全発射の中で、スタックの長さ、または再帰の深さの最大値。
+        """
+        return max((launch.max_depth for launch in self.launches), default=0)
+
+    @property
+    def wall_time(self) -> float:
+        """全発射の経過時間の合計。秒単位。
+        """
+        return sum(launch.wall_time for launch in self.launches)
+
+    def slowest_launches(self, count: int = 5) -> list[LaunchRecord]:
+        """経過時間が長い順に、発射の計測結果を取得する。
+
+        Args:
+            count (int): 取得する件数。
+        """
+        return sorted(self.launches, key=lambda launch: launch.wall_time, reverse=True)[:count]
+
+    def format_summary(self, slowest_count: int = 5) -> str:
+        """計測結果の要約を、人が読む用の文字列に整形する。
+
+        Args:
+            slowest_count (int): 経過時間が長い発射を何件表示するか。
+        """
+        lines = [
+            f"engine: {self.engine}",
+            f"launches: {len(self.launches)}",
+            f"steps: {self.step_count}",
+            f"revisits: {self.revisit_count}",
+            f"splits: {self.split_count}",
+            f"max depth: {self.max_depth}",
+            f"wall time: {self.wall_time:.6f}s",
+        ]
+        for launch in self.slowest_launches(slowest_count):
+            lines.append(
+                f"slow launch: ({launch.x}, {launch.y}) {launch.direction.name} "
+                f"{launch.wall_time:.6f}s, steps={launch.step_count}, max depth={launch.max_depth}"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        """計測結果を、JSONへ変換できる辞書に変換する。
+        """
+        return {
+            "engine": self.engine,
+            "launch_count": len(self.launches),
+            "step_count": self.step_count,
+            "revisit_count": self.revisit_count,
+            "split_count": self.split_count,
+            "max_depth": self.max_depth,
+            "wall_time": self.wall_time,
+            "launches": [launch.to_dict() for launch in self.launches],
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """計測結果をJSON文字列に変換する。
+        """
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def dump_json(self, output_path_str: str) -> None:
+        """計測結果をJSONファイルとして書き出す。
+
+        Args:
+            output_path_str (str): 出力先のファイルのパス。
+        """
+        Path(output_path_str).write_text(self.to_json(), encoding="utf-8")
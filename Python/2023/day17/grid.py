@@ -1,34 +1,64 @@
 from pathlib import Path
 
+from common.grid import CompactGrid
+from common.input_cache import InputCache, buildByteGrid
+from common.output import OutputLevel, getDefaultOutput
+
+
+# 各マスの数字の文字を、その数値のバイトに変換するための変換表。
+DIGIT_TRANSLATION = bytes.maketrans(b"0123456789", bytes(range(10)))
+# グリッドの周囲に置く番兵。各マスのコストは0〜9なので、それと被らない値にする。
+GRID_SENTINEL = 0xFF
+
+
+def _buildCostGrid(grid_bytes: bytes) -> tuple[dict, dict[str, bytes]]:
+    """グリッドのテキストを、各マスのコストを1バイトずつ並べたバイト列に変換する。
+    """
+    metadata, sections = buildByteGrid(grid_bytes, GRID_SENTINEL, DIGIT_TRANSLATION)
+    # 番兵以外に、9を超える値があってはならない。
+    if sections["cells"].translate(None, bytes(range(10)) + bytes([GRID_SENTINEL])):
+        raise ValueError("grid contains non-digit characters.")
+    return metadata, sections
+
 
 class Grid:
     """グリッドを読み込むためのクラス。
 
     Attributes:
-        grid (list[list[int]]): グリッドのテキストデータをパースした結果。
+        compact_grid (CompactGrid): 各マスのコストを、周囲に番兵を置いた1個のバイト列で保持したもの。
+            探索のループでは、こちらを直接参照することで範囲チェックを省く。
+        grid (list[memoryview]): 各行のコスト。compact_gridをコピーせずに参照している。
+            grid[y][x] で各マスのコストをintとして取得できる。
         x_size (int): グリッド情報のx方向のマス数。
         y_size (int): グリッド情報のy方向のマス数。
     """
-    def __init__(self, grid_text_path_str: str):
+    def __init__(self, grid_text_path_str: str, input_cache: InputCache | None = None):
         """
         Args:
             grid_text_path_str (str): グリッドのテキストファイルのパス。
+            input_cache (InputCache | None): パース結果のキャッシュ。Noneならキャッシュを使わずにパースする。
         """
-        with Path(grid_text_path_str).open(mode="r") as f:
-            grid_texts = f.read()
-        self.grid = [[int(node) for node in row] for row in grid_texts.split("\n")]
-        print("grid:")
-        print(grid_texts)
-
-        grid_each_row_count = set(map(len, self.grid))
-        if len(grid_each_row_count) > 1:
-            # グリッドの行ごとのマス数がズレていたら弾く
-            raise Exception(f"grid rows is not equal. (grid_each_row_count: {grid_each_row_count})")
-        
-        self.x_size = len(self.grid[0])
-        self.y_size = len(self.grid)
-        print(f"grid size = ({self.x_size}, {self.y_size})")
-        print()
+        if input_cache is None:
+            metadata, sections = _buildCostGrid(Path(grid_text_path_str).read_bytes())
+            cells = sections["cells"]
+        else:
+            # キャッシュには番兵を置いた配置で保存してあるので、メモリマップしたものをコピーせずに使う。
+            cached_grid = input_cache.load(grid_text_path_str, "day17_cost_grid", _buildCostGrid)
+            metadata, cells = cached_grid.metadata, cached_grid.sections["cells"]
+
+        # 番兵の値が含まれていないことは、_buildCostGridで確認済み。
+        self.compact_grid = CompactGrid(metadata["x_size"], metadata["y_size"], cells, GRID_SENTINEL)
+        self.grid = self.compact_grid.rows()
+        self.x_size = self.compact_grid.x_size
+        self.y_size = self.compact_grid.y_size
+
+        # グリッドの内容は、詳細に出力する時だけ整形する。
+        output = getDefaultOutput()
+        if output.is_enabled(OutputLevel.VERBOSE):
+            output.verbose("grid:")
+            output.verbose("\n".join("".join(map(str, row)) for row in self.grid))
+            output.verbose(f"grid size = ({self.x_size}, {self.y_size})")
+            output.verbose()
 
 
     def is_in_grid(self, x: int, y: int) -> bool:
@@ -38,5 +68,4 @@ class Grid:
             x (int): x座標。
             y (int): y座標。
         """
-        # 配列の添え字なので終端はイコール無し
-        return 0 <= x < self.x_size and 0 <= y < self.y_size
\ No newline at end of file
+        return self.compact_grid.is_inside(x, y)
\ No newline at end of file
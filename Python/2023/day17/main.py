@@ -1,40 +1,128 @@
+import sys
 import time
 
-from shortest_route_searcher import DijkstraSearcher
+from shortest_route_searcher import AnytimeSearcher, DijkstraSearcher
+from common.input_cache import InputCache
+from common.output import getDefaultOutput
+from common.profiler import getDefaultProfiler
 from common.time_util import getFormattedElapsedTimeInfo
 
+# 問題ごとの (一度に必ず直進しなければならない最小マス数, 一度に最大で直進できるマス数)
+STRAIGHT_COUNT_LIMITS = {
+    1: (0, 3),
+    2: (4, 10),
+}
+
+
+def solve(
+    grid_info_path_str: str,
+    question: int,
+    min_straight_count: int | None = None,
+    max_straight_count: int | None = None,
+    engine: str = "dijkstra",
+    time_budget: float | str | None = None,
+    input_cache: InputCache | None = None
+) -> int:
+    """問題の答えを計算する。
+
+    Args:
+        grid_info_path_str (str): グリッド情報のテキストファイルのパス。
+        question (int): 問題の番号。
+        min_straight_count (int | None): 一度に必ず直進しなければならない最小マス数。Noneなら問題の既定値。
+        max_straight_count (int | None): 一度に最大で直進できるマス数。Noneなら問題の既定値。
+        engine (str): 探索の方式。"dijkstra"（ダイクストラ法）か"anytime"（anytime探索）。
+        time_budget (float | str | None): anytime探索に使える時間。秒単位。Noneなら無制限。
+            時間切れの場合は、その時点の暫定解のコストを返す。
+        input_cache (InputCache | None): 入力のパース結果のキャッシュ。Noneならキャッシュを使わない。
+
+    Returns:
+        int: 最短経路のコストの合計値。
+    """
+    if question not in STRAIGHT_COUNT_LIMITS:
+        raise ValueError(f"Unsupported question: {question}")
+    default_min_straight_count, default_max_straight_count = STRAIGHT_COUNT_LIMITS[question]
+    # デーモンのリクエストからは文字列で渡される。
+    min_straight_count = default_min_straight_count if min_straight_count is None else int(min_straight_count)
+    max_straight_count = default_max_straight_count if max_straight_count is None else int(max_straight_count)
+
+    if engine == "dijkstra":
+        return DijkstraSearcher(grid_info_path_str, min_straight_count, max_straight_count, input_cache).search()
+    elif engine == "anytime":
+        # コマンドラインのパラメータからは文字列で渡される。
+        if time_budget is not None:
+            time_budget = float(time_budget)
+        return AnytimeSearcher(
+            grid_info_path_str, min_straight_count, max_straight_count, time_budget=time_budget, input_cache=input_cache
+        ).search()
+    else:
+        raise ValueError(f"Unsupported engine: {engine}")
+
+
 def execute_dijkstra_search(grid_info_path_str: str, min_straight_count: int, max_straight_count: int):
-    start_time = time.perf_counter()
-    dijkstra_searcher = DijkstraSearcher(grid_info_path_str, min_straight_count, max_straight_count)
-    total_cost = dijkstra_searcher.search()
-    print(f"total_cost: {total_cost}")
-    end_time = time.perf_counter()
-    print()
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day17 dijkstra ({min_straight_count}, {max_straight_count})") as execute_span:
+        with profiler.span("parse"):
+            dijkstra_searcher = DijkstraSearcher(grid_info_path_str, min_straight_count, max_straight_count)
+        with profiler.span("search"):
+            total_cost = dijkstra_searcher.search()
+        output.result("total_cost", total_cost, input=grid_info_path_str, min_straight_count=min_straight_count, max_straight_count=max_straight_count)
+    output.summary()
+
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
+
+
+def execute_anytime_search(grid_info_path_str: str, min_straight_count: int, max_straight_count: int, time_budget: float | None = None):
+    profiler = getDefaultProfiler()
+    output = getDefaultOutput()
+    with profiler.span(f"day17 anytime ({min_straight_count}, {max_straight_count})") as execute_span:
+
+        def print_improved_cost(cost: int, route: list[tuple[int, int]]) -> None:
+            elapsed_time = time.perf_counter() - execute_span.start_time
+            output.summary(f"improved: total_cost = {cost} ({elapsed_time:.3f}s)")
+            output.flush()
+
+        with profiler.span("parse"):
+            anytime_searcher = AnytimeSearcher(
+                grid_info_path_str, min_straight_count, max_straight_count,
+                time_budget=time_budget, on_improved=print_improved_cost
+            )
+        with profiler.span("search"):
+            total_cost = anytime_searcher.search()
+        output.result(
+            "total_cost", total_cost, input=grid_info_path_str, min_straight_count=min_straight_count,
+            max_straight_count=max_straight_count, optimal=anytime_searcher.is_optimal
+        )
+        output.summary(f"optimal: {anytime_searcher.is_optimal}")
+    output.summary()
 
-    print(f"Process time: {getFormattedElapsedTimeInfo(start_time, end_time)}")
+    output.summary(f"Process time: {getFormattedElapsedTimeInfo(execute_span.start_time, execute_span.end_time)}")
 
 
 if __name__ == "__main__":
+    output = getDefaultOutput()
     GRID_EXAMPLE_TEXT_PATH = "./grid_example.txt"
     GRID_QUESTION_TEXT_PATH = "./grid_question.txt"
+    # 引数に"anytime"を指定すると、anytime探索で解く。（例: python main.py anytime）
+    execute_search = execute_anytime_search if sys.argv[1:2] == ["anytime"] else execute_dijkstra_search
 
     # 問題1の例題
-    execute_dijkstra_search(GRID_EXAMPLE_TEXT_PATH, 0, 3)
-    print()
-    print("====================================================================================================")
-    print()
+    execute_search(GRID_EXAMPLE_TEXT_PATH, 0, 3)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題1の問題
-    execute_dijkstra_search(GRID_QUESTION_TEXT_PATH, 0, 3)
-    print()
-    print("====================================================================================================")
-    print()
+    execute_search(GRID_QUESTION_TEXT_PATH, 0, 3)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題2の例題
-    execute_dijkstra_search(GRID_EXAMPLE_TEXT_PATH, 4, 10)
-    print()
-    print("====================================================================================================")
-    print()
+    execute_search(GRID_EXAMPLE_TEXT_PATH, 4, 10)
+    output.summary()
+    output.summary("====================================================================================================")
+    output.summary()
 
     # 問題2の問題
-    execute_dijkstra_search(GRID_QUESTION_TEXT_PATH, 4, 10)
\ No newline at end of file
+    execute_search(GRID_QUESTION_TEXT_PATH, 4, 10)
\ No newline at end of file
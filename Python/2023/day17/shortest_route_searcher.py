@@ -1,18 +1,41 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from collections.abc import Callable
 import heapq
+import time
 
-from common.constants import Direction
-from grid import Grid
+from common.constants import DIRECTION_COUNT, DIRECTION_DOWN, DIRECTION_RIGHT, DX, DY, TURN_LEFT, TURN_RIGHT
+from common.input_cache import InputCache
+from common.output import OutputLevel, getDefaultOutput
+from grid import Grid, GRID_SENTINEL
 
 
-# 真後ろのパターン
-BACK_PATTERNS = {
-    Direction.RIGHT: Direction.LEFT,
-    Direction.LEFT: Direction.RIGHT,
-    Direction.UP: Direction.DOWN,
-    Direction.DOWN: Direction.UP
-}
+def build_next_directions_table(min_straight_count: int, max_straight_count: int) -> list[tuple[tuple[int, ...], ...]]:
+    """直進回数・進行方向ごとに、次に進める方向を列挙した表を作る。
+    方向は common.constants の整数で表現した方向を使う。
+
+    Args:
+        min_straight_count (int): 一度に必ず直進しなければならない最小マス数。
+        max_straight_count (int): 一度に最大で直進できるマス数。
+
+    Returns:
+        list[tuple[tuple[int, ...], ...]]: [直進回数][進行方向] -> 次に進める方向のタプル
+    """
+    next_directions_table = []
+    for straight_count in range(max_straight_count + 1):
+        next_directions_by_direction = []
+        for direction in range(DIRECTION_COUNT):
+            # 真後ろには行けないので、直進・左折・右折の3通り。
+            next_directions = (direction, TURN_LEFT[direction], TURN_RIGHT[direction])
+            # 最大回数まで既に連続で直進している場合は、進行方向に対して左右に曲がらないといけない。
+            if straight_count == max_straight_count:
+                next_directions = tuple(d for d in next_directions if d != direction)
+            # 最小直進回数まで連続でまだ直進していない場合は、必ず直進しないといけない。
+            if straight_count < min_straight_count:
+                next_directions = tuple(d for d in next_directions if d == direction)
+            next_directions_by_direction.append(next_directions)
+        next_directions_table.append(tuple(next_directions_by_direction))
+    return next_directions_table
 
 
 class Searcher(ABC):
@@ -22,33 +45,46 @@ class Searcher(ABC):
         grid_obj (Grid): グリッド情報のインスタンス。
         min_straight_count (int): 一度に必ず直進しなければならない最小マス数。
         max_straight_count (int): 一度に最大で直進できるマス数。
-        shortest_distances_from_start_node (dict[tuple[int, int], dict[tuple[Direction, int], int]]):
+        next_directions_table (list[tuple[tuple[int, ...], ...]]): [直進回数][進行方向] -> 次に進める方向のタプル
+        shortest_distances_from_start_node (dict[tuple[int, int], dict[tuple[int, int], int]]):
             開始ノードから各ノードへの最短距離を逐次記録する。
             進行方向や直進回数も含めて記録することで、状態を細かく区別する。
             （どの方向から来たか・連続で何マス直進してきたかによって、次以降の選択肢も変わってくる）
+            方向は common.constants の整数で表現した方向を使う。
             探索処理後に最短経路を辿る時にも再利用する。
             { (x, y): { (direction, straight_count): cost } }
-        shortest_route_record (dict[tuple[tuple[int, int], Direction, int], tuple[tuple[int, int], Direction, int]]):
+        shortest_route_record (dict[tuple[tuple[int, int], int, int], tuple[tuple[int, int], int, int]]):
             最短経路の探索結果を逐次記録するための辞書。
             探索処理後に最短経路を辿る時に利用する。
             移動経路が一意に定まるように、「移動先のノード（子） -> 移動元のノード（親）」として記録する。
             ノードの形式: ((x, y), direction, straight_count)
     """
 
-    def __init__(self, grid_info_path_str: str, min_straight_count: int, max_straight_count: int) -> None:
+    def __init__(
+        self,
+        grid_info_path_str: str,
+        min_straight_count: int,
+        max_straight_count: int,
+        input_cache: InputCache | None = None,
+        grid_obj: Grid | None = None
+    ) -> None:
         """
         Args:
             grid_info_path_str (str): グリッド情報のテキストファイルのパス。
             min_straight_count (int): 一度に必ず直進しなければならない最小マス数。
             max_straight_count (int): 一度に最大で直進できるマス数。
+            input_cache (InputCache | None): グリッドのパース結果のキャッシュ。Noneならキャッシュを使わない。
+            grid_obj (Grid | None): 読み込み済みのグリッド。指定した場合はファイルを読み込まずにこれを使う。
+                グリッドは探索中に変更しないので、直進回数の制約を変えた複数の探索で共有できる。
         """
-        self.grid_obj = Grid(grid_info_path_str)
+        self.grid_obj = grid_obj if grid_obj is not None else Grid(grid_info_path_str, input_cache)
         self.min_straight_count = min_straight_count
         self.max_straight_count = max_straight_count
+        self.next_directions_table = build_next_directions_table(min_straight_count, max_straight_count)
 
         self.shortest_distances_from_start_node = defaultdict(lambda: defaultdict(lambda: float('inf')))
         # 開始ノードだけ、進行方向・直進回数の全パターン分を0で初期化
-        for direction in Direction:
+        for direction in range(DIRECTION_COUNT):
             for straight_count in range(max(self.min_straight_count, 1), self.max_straight_count+1):
                 self.shortest_distances_from_start_node[(0, 0)][(direction, straight_count)] = 0
         
@@ -75,14 +111,22 @@ class Searcher(ABC):
         ]
         if not goal_state_candidates:
             # どの状態でもゴールに辿り着けなかった。
-            print("No path to goal found.")
+            getDefaultOutput().summary("No path to goal found.")
             return None
         # 最終的なコスト損失が最小であるものを選ぶ。
         best_goal_cost, best_goal_state = min(goal_state_candidates, key=lambda x: x[0])
 
+        return self._trace_route_from(best_goal_state)
+
+    def _trace_route_from(self, goal_state: tuple[tuple[int, int], int, int]) -> list[tuple[int, int]]:
+        """指定したゴールの状態から、記録済みの最短経路を開始ノードまで辿る。
+
+        Args:
+            goal_state (tuple[tuple[int, int], int, int]): ゴールの状態。((x, y), direction, straight_count)
+        """
         shortest_route = []
 
-        current_node_state = best_goal_state
+        current_node_state = goal_state
         while current_node_state:
             shortest_route.append(current_node_state[0]) # 座標情報だけで十分
             if current_node_state not in self.shortest_route_record:
@@ -92,7 +136,7 @@ class Searcher(ABC):
         return shortest_route[::-1]
 
     def _print_path_with_grid(self, path: list[tuple[int, int]]) -> None:
-        """グリッド上に経路を出力する。
+        """グリッド上に経路を出力する。詳細に出力する時だけ使う。
         """
         path_set = set(path)
 
@@ -104,7 +148,7 @@ class Searcher(ABC):
                     line += f"[{self.grid_obj.grid[y][x]}]"
                 else:
                     line += f" {self.grid_obj.grid[y][x]} "
-            print(line)
+            getDefaultOutput().verbose(line)
 
 
 
@@ -112,8 +156,15 @@ class DijkstraSearcher(Searcher):
     """ダイクストラ法で探索する。
     """
 
-    def __init__(self, grid_info_path_str: str, min_straight_count: int, max_straight_count: int) -> None:
-        super().__init__(grid_info_path_str, min_straight_count, max_straight_count)
+    def __init__(
+        self,
+        grid_info_path_str: str,
+        min_straight_count: int,
+        max_straight_count: int,
+        input_cache: InputCache | None = None,
+        grid_obj: Grid | None = None
+    ) -> None:
+        super().__init__(grid_info_path_str, min_straight_count, max_straight_count, input_cache, grid_obj)
     
 
     def search(self):
@@ -122,50 +173,46 @@ class DijkstraSearcher(Searcher):
         goal_node = (self.grid_obj.x_size - 1, self.grid_obj.y_size - 1)
 
         # 開始ノードから各ノードまでの最短距離（最小コスト）を管理する。
-        # 優先度付きキューがDirection同士を比較できるように、Direction.nameを入れる。
-        # (cost, (x, y), Direction.name, straight_count)
+        # 方向は整数で表現しているので、優先度付きキューでそのまま比較できる。
+        # (cost, (x, y), direction, straight_count)
         priority_queue = []
         # 開始ノードから移動可能なパターン2種類
-        heapq.heappush(priority_queue, (0, start_node, Direction.RIGHT.name, 0))
-        heapq.heappush(priority_queue, (0, start_node, Direction.DOWN.name, 0))
+        heapq.heappush(priority_queue, (0, start_node, DIRECTION_RIGHT, 0))
+        heapq.heappush(priority_queue, (0, start_node, DIRECTION_DOWN, 0))
+
+        # 範囲チェックを省くため、番兵付きのグリッドを直接参照する。
+        cells = self.grid_obj.compact_grid.cells
+        neighbor_offsets = self.grid_obj.compact_grid.neighbor_offsets
+        to_index = self.grid_obj.compact_grid.index
+        next_directions_table = self.next_directions_table
 
         while priority_queue:
-            current_cost, current_node, current_direction_name, current_straight_count = heapq.heappop(priority_queue)
-            current_direction = Direction.fromName(current_direction_name)
+            current_cost, current_node, current_direction, current_straight_count = heapq.heappop(priority_queue)
 
             if current_node == goal_node and current_straight_count >= self.min_straight_count:
-                final_shortest_route = self._trace_shortest_route()
-                print(f"final_shortest_route:")
-                print(final_shortest_route)
-                print()
-                self._print_path_with_grid(final_shortest_route)
-                print()
+                # 最短経路は、詳細に出力する時だけ辿って整形する。
+                output = getDefaultOutput()
+                if output.is_enabled(OutputLevel.VERBOSE):
+                    final_shortest_route = self._trace_shortest_route()
+                    output.verbose(f"final_shortest_route:")
+                    output.verbose(final_shortest_route)
+                    output.verbose()
+                    self._print_path_with_grid(final_shortest_route)
+                    output.verbose()
                 return current_cost
             
             # 計算済みの結果のコストの方が安い場合、隣のノードへの移動コストを計算しても最短経路にはならないので、スキップ。
             if current_cost > self.shortest_distances_from_start_node[current_node][(current_direction, current_straight_count)]:
                 continue
 
-            for to_next_node_direction in Direction:
-                # 真後ろには行けない。
-                if to_next_node_direction == BACK_PATTERNS[current_direction]:
+            current_index = to_index(current_node[0], current_node[1])
+            # 真後ろ・直進回数の制約で進めない方向は、表から除外済み。
+            for to_next_node_direction in next_directions_table[current_straight_count][current_direction]:
+                next_node_cost = cells[current_index + neighbor_offsets[to_next_node_direction]]
+                if next_node_cost == GRID_SENTINEL:
+                    # グリッドの範囲外
                     continue
-
-                # 最大回数まで既に連続で直進している場合は、進行方向に対して左右に曲がらないといけない。
-                if current_straight_count == self.max_straight_count:
-                    if to_next_node_direction == current_direction:
-                        continue
-                # 最小直進回数まで連続でまだ直進していない場合は、必ず直進しないといけない。
-                if current_straight_count < self.min_straight_count:
-                    if to_next_node_direction != current_direction:
-                        continue
-                
-
-                dx, dy = to_next_node_direction.value
-                next_node = (current_node[0] + dx, current_node[1] + dy)
-                if not self.grid_obj.is_in_grid(next_node[0], next_node[1]):
-                    continue
-                next_node_cost = self.grid_obj.grid[next_node[1]][next_node[0]]
+                next_node = (current_node[0] + DX[to_next_node_direction], current_node[1] + DY[to_next_node_direction])
 
                 next_straight_count = current_straight_count + 1 # 直進
                 if to_next_node_direction != current_direction:
@@ -181,10 +228,265 @@ class DijkstraSearcher(Searcher):
                 self.shortest_route_record[(next_node, to_next_node_direction, next_straight_count)] = (current_node, current_direction, current_straight_count)
                 heapq.heappush(
                     priority_queue,
-                    (new_cost, next_node, to_next_node_direction.name, next_straight_count)
+                    (new_cost, next_node, to_next_node_direction, next_straight_count)
                 )
         
         
         # ゴールまでの経路が見つからなかった場合
-        print("No path to goal found.")
-        return float("inf")
\ No newline at end of file
+        getDefaultOutput().summary("No path to goal found.")
+        return float("inf")
+
+
+class AnytimeSearcher(Searcher):
+    """暫定解を先に求めてから、最適解へ改善していく探索。（anytime探索）
+
+    1. ビームサーチで、制約を満たす経路（暫定解）を素早く求める。
+    2. 各ノードからゴールまでのコストの下界を使って、ダイクストラ法と同じ要領で探索を続ける。
+       その際、コスト + 下界が暫定解のコストに達する状態は枝刈りする。
+    暫定解が改善される度にコールバックで通知し、時間制限を超えたらその時点の暫定解を返す。
+    時間制限は下界の計算と分枝限定法で確認する。下界の計算中に時間切れになった場合も、
+    打ち切った下界でビームサーチを行い、暫定解は必ず求める。
+
+    Attributes:
+        beam_width (int): ビームサーチで各ステップに残す状態数。
+        time_budget (float | None): 探索に使える時間。秒単位。Noneなら無制限。
+        on_improved (Callable[[int, list[tuple[int, int]]], None] | None):
+            暫定解が改善された時に (コスト, 経路) を受け取るコールバック。
+        incumbent_cost (float): 現時点での暫定解のコスト。見つかっていなければinf。
+        incumbent_route (list[tuple[int, int]] | None): 現時点での暫定解の経路。
+        is_optimal (bool): 返した結果が最適解であることが保証されているかどうか。
+    """
+
+    def __init__(
+        self,
+        grid_info_path_str: str,
+        min_straight_count: int,
+        max_straight_count: int,
+        beam_width: int = 64,
+        time_budget: float | None = None,
+        on_improved: Callable[[int, list[tuple[int, int]]], None] | None = None,
+        input_cache: InputCache | None = None,
+        grid_obj: Grid | None = None
+    ) -> None:
+        """
+        Args:
+            grid_info_path_str (str): グリッド情報のテキストファイルのパス。
+            min_straight_count (int): 一度に必ず直進しなければならない最小マス数。
+            max_straight_count (int): 一度に最大で直進できるマス数。
+            beam_width (int): ビームサーチで各ステップに残す状態数。
+            time_budget (float | None): 探索に使える時間。秒単位。Noneなら無制限。
+            on_improved (Callable[[int, list[tuple[int, int]]], None] | None):
+                暫定解が改善された時に (コスト, 経路) を受け取るコールバック。
+            input_cache (InputCache | None): グリッドのパース結果のキャッシュ。Noneならキャッシュを使わない。
+            grid_obj (Grid | None): 読み込み済みのグリッド。指定した場合はファイルを読み込まずにこれを使う。
+        """
+        super().__init__(grid_info_path_str, min_straight_count, max_straight_count, input_cache, grid_obj)
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.on_improved = on_improved
+
+        self.incumbent_cost = float("inf")
+        self.incumbent_route = None
+        self.is_optimal = False
+
+    def search(self) -> int:
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.perf_counter() + self.time_budget
+
+        lower_bounds = self._calculate_lower_bounds(deadline)
+        # 時間切れでも暫定解を返せるように、ビームサーチは必ず行う。
+        self._beam_search(lower_bounds)
+        if not self._is_time_up(deadline):
+            self._branch_and_bound(lower_bounds, deadline)
+
+        if self.incumbent_route is None:
+            if self._is_time_up(deadline):
+                getDefaultOutput().summary("No path to goal found within the time budget.")
+            else:
+                getDefaultOutput().summary("No path to goal found.")
+        return self.incumbent_cost
+
+    @staticmethod
+    def _is_time_up(deadline: float | None) -> bool:
+        """時間制限を超えたかどうかを判定する。
+        """
+        return deadline is not None and time.perf_counter() > deadline
+
+    def _update_incumbent(self, cost: int, route: list[tuple[int, int]]) -> None:
+        """暫定解を更新し、コールバックで通知する。
+        """
+        if cost >= self.incumbent_cost:
+            return
+        self.incumbent_cost = cost
+        self.incumbent_route = route
+        if self.on_improved is not None:
+            self.on_improved(cost, route)
+
+    def _iter_next_moves(self, node: tuple[int, int], direction: int, straight_count: int):
+        """制約を満たす移動先を列挙する。
+
+        Yields:
+            tuple[tuple[int, int], int, int, int]: (移動先の座標, 進行方向, 直進回数, 移動先のコスト)
+        """
+        compact_grid = self.grid_obj.compact_grid
+        current_index = compact_grid.index(node[0], node[1])
+        # 真後ろ・直進回数の制約で進めない方向は、表から除外済み。
+        for to_next_node_direction in self.next_directions_table[straight_count][direction]:
+            next_node_cost = compact_grid.cells[current_index + compact_grid.neighbor_offsets[to_next_node_direction]]
+            if next_node_cost == GRID_SENTINEL:
+                # グリッドの範囲外
+                continue
+            next_node = (node[0] + DX[to_next_node_direction], node[1] + DY[to_next_node_direction])
+
+            next_straight_count = straight_count + 1 if to_next_node_direction == direction else 1
+            yield next_node, to_next_node_direction, next_straight_count, next_node_cost
+
+    def _calculate_lower_bounds(self, deadline: float | None) -> list[list[float]]:
+        """直進の制約を無視した場合の、各ノードからゴールまでの最小コストを計算する。
+        制約付きの経路のコストを下回ることはないので、枝刈り用の下界として使える。
+        途中で時間切れになった場合、未確定のノードの下界は、その時点で取り出したコストで打ち切る。
+
+        Returns:
+            list[list[float]]: 各ノードからゴールまでのコストの下界。[y][x]でアクセスする。
+        """
+        x_size, y_size = self.grid_obj.x_size, self.grid_obj.y_size
+        grid = self.grid_obj.grid
+        lower_bounds = [[float("inf")] * x_size for _ in range(y_size)]
+        goal_x, goal_y = x_size - 1, y_size - 1
+        lower_bounds[goal_y][goal_x] = 0
+
+        # ゴールから逆向きにダイクストラ法を適用する。
+        # ノードvからゴールまでのコストには、vに入るコストは含めず、ゴールに入るコストは含める。
+        priority_queue = [(0, goal_x, goal_y)]
+        popped_count = 0
+        while priority_queue:
+            cost, x, y = heapq.heappop(priority_queue)
+            popped_count += 1
+            if popped_count % 1024 == 0 and self._is_time_up(deadline):
+                # 未確定のノードのゴールまでのコストは、取り出したコスト以上になる。
+                for row in lower_bounds:
+                    for column in range(x_size):
+                        if row[column] > cost:
+                            row[column] = cost
+                break
+            if cost > lower_bounds[y][x]:
+                continue
+            for direction in range(DIRECTION_COUNT):
+                prev_x, prev_y = x + DX[direction], y + DY[direction]
+                if not self.grid_obj.is_in_grid(prev_x, prev_y):
+                    continue
+                new_cost = cost + grid[y][x]
+                if new_cost < lower_bounds[prev_y][prev_x]:
+                    lower_bounds[prev_y][prev_x] = new_cost
+                    heapq.heappush(priority_queue, (new_cost, prev_x, prev_y))
+        
+        return lower_bounds
+
+    def _beam_search(self, lower_bounds: list[list[float]]) -> None:
+        """ビームサーチで暫定解を求める。
+        各ステップで、コスト + 下界が小さい状態をbeam_width個だけ残して展開する。
+        ゴールに着いた時点で終わるので、時間制限は確認しない。
+        """
+        start_node = (0, 0)
+        goal_node = (self.grid_obj.x_size - 1, self.grid_obj.y_size - 1)
+
+        # 経路は (状態, 親のリンク) の連結リストとして持つ。
+        # (cost, ((x, y), direction, straight_count), link)
+        beam = [
+            (0, (start_node, DIRECTION_RIGHT, 0), (start_node, None)),
+            (0, (start_node, DIRECTION_DOWN, 0), (start_node, None)),
+        ]
+        best_costs = {}
+
+        while beam:
+            candidates = {}
+            for cost, (node, direction, straight_count), link in beam:
+                for next_node, next_direction, next_straight_count, next_node_cost in self._iter_next_moves(node, direction, straight_count):
+                    new_cost = cost + next_node_cost
+                    if new_cost + lower_bounds[next_node[1]][next_node[0]] >= self.incumbent_cost:
+                        continue
+                    next_state = (next_node, next_direction, next_straight_count)
+                    if new_cost >= best_costs.get(next_state, float("inf")):
+                        continue
+                    best_costs[next_state] = new_cost
+                    candidates[next_state] = (new_cost, next_state, (next_node, link))
+
+            found_goal = False
+            for new_cost, (node, _, straight_count), link in candidates.values():
+                if node == goal_node and straight_count >= self.min_straight_count:
+                    found_goal = True
+                    self._update_incumbent(new_cost, self._unlink_route(link))
+            if found_goal:
+                # 貪欲に最初に見つけた暫定解を採用し、改善は分枝限定法に任せる。
+                return
+
+            beam = heapq.nsmallest(
+                self.beam_width,
+                candidates.values(),
+                key=lambda candidate: candidate[0] + lower_bounds[candidate[1][0][1]][candidate[1][0][0]]
+            )
+
+    @staticmethod
+    def _unlink_route(link: tuple) -> list[tuple[int, int]]:
+        """連結リストで持っている経路を、開始ノードからの座標のリストに変換する。
+        """
+        route = []
+        while link is not None:
+            node, link = link
+            route.append(node)
+        return route[::-1]
+
+    def _branch_and_bound(self, lower_bounds: list[list[float]], deadline: float | None) -> None:
+        """暫定解のコストを上界として、枝刈りしながら最適解を探索する。
+        下界をポテンシャルとして使うことで、最初に取り出したゴールの状態が最適解になる。
+        """
+        start_node = (0, 0)
+        goal_node = (self.grid_obj.x_size - 1, self.grid_obj.y_size - 1)
+        start_lower_bound = lower_bounds[start_node[1]][start_node[0]]
+
+        # (cost + 下界, cost, (x, y), direction, straight_count)
+        priority_queue = []
+        heapq.heappush(priority_queue, (start_lower_bound, 0, start_node, DIRECTION_RIGHT, 0))
+        heapq.heappush(priority_queue, (start_lower_bound, 0, start_node, DIRECTION_DOWN, 0))
+
+        popped_count = 0
+        while priority_queue:
+            popped_count += 1
+            if popped_count % 1024 == 0 and self._is_time_up(deadline):
+                # 時間切れ。暫定解をそのまま返す。
+                return
+
+            estimated_cost, current_cost, current_node, current_direction, current_straight_count = heapq.heappop(priority_queue)
+            if estimated_cost >= self.incumbent_cost:
+                # 残りの状態はどれも暫定解を改善できないので、暫定解が最適解。
+                self.is_optimal = True
+                return
+
+            current_state = (current_node, current_direction, current_straight_count)
+            if current_node == goal_node and current_straight_count >= self.min_straight_count:
+                self._update_incumbent(current_cost, self._trace_route_from(current_state))
+                self.is_optimal = True
+                return
+
+            if current_cost > self.shortest_distances_from_start_node[current_node][(current_direction, current_straight_count)]:
+                continue
+
+            for next_node, next_direction, next_straight_count, next_node_cost in self._iter_next_moves(current_node, current_direction, current_straight_count):
+                new_cost = current_cost + next_node_cost
+                new_estimated_cost = new_cost + lower_bounds[next_node[1]][next_node[0]]
+                # 暫定解に届いてしまう状態は枝刈り。
+                if new_estimated_cost >= self.incumbent_cost:
+                    continue
+                if new_cost >= self.shortest_distances_from_start_node[next_node][(next_direction, next_straight_count)]:
+                    continue
+
+                self.shortest_distances_from_start_node[next_node][(next_direction, next_straight_count)] = new_cost
+                self.shortest_route_record[(next_node, next_direction, next_straight_count)] = current_state
+                heapq.heappush(
+                    priority_queue,
+                    (new_estimated_cost, new_cost, next_node, next_direction, next_straight_count)
+                )
+
+        # 暫定解を改善できる状態が残っていない。
+        self.is_optimal = True
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from adventofcode.generate import generateCostGrid
+from adventofcode.registry import getSolverSpec, loadDayModule, loadSolveFunction
+
+
+# main.pyは日ごとに名前が重なるので、登録情報から読み込む。
+SOLVER_SPEC = getSolverSpec(2023, 17)
+shortest_route_searcher = loadDayModule(SOLVER_SPEC, "shortest_route_searcher")
+solve = loadSolveFunction(SOLVER_SPEC)
+
+# (一度に必ず直進しなければならない最小マス数, 一度に最大で直進できるマス数)
+STRAIGHT_COUNT_LIMITS = [(1, 3), (4, 10)]
+
+
+@pytest.fixture(params=[1, 2, 3])
+def generated_grid_path(request, tmp_path: Path) -> str:
+    """シードを変えて、小さいグリッドのファイルを作る。
+    """
+    grid_path = tmp_path / f"grid_{request.param}.txt"
+    generateCostGrid(str(grid_path), 23, 17, seed=request.param)
+    return str(grid_path)
+
+
+@pytest.mark.parametrize("min_straight_count, max_straight_count", STRAIGHT_COUNT_LIMITS)
+def test_anytime_searcher_matches_dijkstra(generated_grid_path: str, min_straight_count: int, max_straight_count: int) -> None:
+    anytime_searcher = shortest_route_searcher.AnytimeSearcher(generated_grid_path, min_straight_count, max_straight_count)
+    dijkstra_searcher = shortest_route_searcher.DijkstraSearcher(generated_grid_path, min_straight_count, max_straight_count)
+    assert anytime_searcher.search() == dijkstra_searcher.search()
+    assert anytime_searcher.is_optimal
+
+
+@pytest.mark.parametrize("min_straight_count, max_straight_count", STRAIGHT_COUNT_LIMITS)
+def test_anytime_searcher_returns_incumbent_when_time_is_up(generated_grid_path: str, min_straight_count: int, max_straight_count: int) -> None:
+    improved_costs = []
+    anytime_searcher = shortest_route_searcher.AnytimeSearcher(
+        generated_grid_path,
+        min_straight_count,
+        max_straight_count,
+        time_budget=0,
+        on_improved=lambda cost, route: improved_costs.append(cost)
+    )
+    total_cost = anytime_searcher.search()
+    # 時間切れでも、ビームサーチの暫定解は返す。最適解である保証はない。
+    assert improved_costs and total_cost == improved_costs[-1]
+    assert not anytime_searcher.is_optimal
+
+    dijkstra_searcher = shortest_route_searcher.DijkstraSearcher(generated_grid_path, min_straight_count, max_straight_count)
+    assert total_cost >= dijkstra_searcher.search()
+
+
+@pytest.mark.parametrize("question", [1, 2])
+def test_solve_with_anytime_engine(question: int) -> None:
+    grid_path = SOLVER_SPEC.resolve_input("example")
+    assert solve(str(grid_path), question, engine="anytime") == SOLVER_SPEC.expected_answers[(question, "example")]
+
+
+def test_time_budget_is_not_cached() -> None:
+    # 時間制限を指定すると結果が最適解とは限らないので、計算結果をキャッシュしない。
+    assert SOLVER_SPEC.is_cacheable({"engine": "anytime"})
+    assert not SOLVER_SPEC.is_cacheable({"engine": "anytime", "time_budget": "0.2"})
@@ -0,0 +1,5 @@
+"""全日の解答を共通のコマンドラインから実行するためのパッケージ。
+
+使用例:
+    python -m adventofcode run 2023 7 --part 1 --input ./hand_list.txt
+"""
@@ -0,0 +1,251 @@
+from collections import deque
+import contextlib
+import json
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+import os
+from pathlib import Path
+import sys
+import time
+import traceback
+
+from common.output import OutputLevel, getDefaultOutput
+from adventofcode.registry import SOLVERS, SolverSpec, getSolverSpec, loadSolveFunction
+
+try:
+    import resource
+except ImportError:
+    # Windowsではresourceが使えないので、ピークメモリは計測しない。
+    resource = None
+
+
+# 1ジョブあたりの制限時間の既定値。秒単位。
+DEFAULT_JOB_TIMEOUT = 600.0
+
+
+class BatchJob:
+    """一括実行する1ジョブ分の情報を保持するデータクラス。
+
+    Attributes:
+        year (int): 年。
+        day (int): 日。
+        part (int): 問題の番号。
+        input_name (str): 入力ファイルの名前。
+        params (dict): 解答に渡す追加のパラメータ。
+    """
+
+    def __init__(self, year: int, day: int, part: int, input_name: str, params: dict | None = None) -> None:
+        """
+        Args:
+            year (int): 年。
+            day (int): 日。
+            part (int): 問題の番号。
+            input_name (str): 入力ファイルの名前。
+            params (dict | None): 解答に渡す追加のパラメータ。
+        """
+        self.year = year
+        self.day = day
+        self.part = part
+        self.input_name = input_name
+        self.params = params or {}
+
+    @property
+    def name(self) -> str:
+        """ジョブの名前。
+        """
+        params_text = "".join(f" {key}={value}" for key, value in sorted(self.params.items()))
+        return f"{self.year}/day{self.day:02} part {self.part} ({self.input_name}){params_text}"
+
+
+def listJobs(solver_specs: list[SolverSpec] | None = None, all_engines: bool = False) -> list[BatchJob]:
+    """登録済みの解答から、(日, 問題, 入力) の全ての組み合わせのジョブを列挙する。
+
+    Args:
+        solver_specs (list[SolverSpec] | None): 対象の解答。Noneなら登録済みの全ての解答。
+        all_engines (bool): 既定の方式だけでなく、使える全ての方式のジョブを列挙するかどうか。
+    """
+    if solver_specs is None:
+        solver_specs = list(SOLVERS.values())
+    jobs = []
+    for solver_spec in solver_specs:
+        engines = solver_spec.available_engines() if all_engines else ()
+        params_list = [{"engine": engine} for engine in engines] or [{}]
+        for part in solver_spec.parts:
+            for input_name in solver_spec.inputs:
+                for params in params_list:
+                    jobs.append(BatchJob(solver_spec.year, solver_spec.day, part, input_name, params))
+    return jobs
+
+
+def getPeakMemory() -> int | None:
+    """このプロセスのピークメモリ（最大常駐セットサイズ）を取得する。バイト単位。
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはバイト単位、Linuxはキロバイト単位
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _runJobInChild(job: BatchJob, connection: Connection) -> None:
+    """子プロセスでジョブを実行し、結果を親プロセスへ送る。
+    解答が出力する内容は、レポートに混ざらないように捨てる。
+    """
+    result = {"status": "error", "answer": None, "wall_time": None, "peak_memory": None, "error": None}
+    # 出力は捨てるので、整形自体を省く。
+    getDefaultOutput().level = OutputLevel.QUIET
+    try:
+        solver_spec = getSolverSpec(job.year, job.day)
+        input_path = solver_spec.resolve_input(job.input_name)
+        with open(os.devnull, mode="w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            start_time = time.perf_counter()
+            solve = loadSolveFunction(solver_spec)
+            answer = solve(str(input_path), job.part, **job.params)
+            end_time = time.perf_counter()
+        result.update(status="ok", answer=answer, wall_time=end_time - start_time)
+    except BaseException:
+        result["error"] = traceback.format_exc()
+    result["peak_memory"] = getPeakMemory()
+    connection.send(result)
+    connection.close()
+
+
+class BatchRunner:
+    """登録済みの解答のジョブを、プロセスプールで並列に一括実行するクラス。
+    ジョブは1個ずつ新しいプロセスで実行するので、ジョブ同士でモジュールや状態が干渉せず、
+    制限時間を超えたジョブはプロセスごと強制終了できる。
+
+    Attributes:
+        max_workers (int): 同時に実行するジョブの数。
+        job_timeout (float): 1ジョブあたりの制限時間。秒単位。
+    """
+
+    def __init__(self, max_workers: int | None = None, job_timeout: float = DEFAULT_JOB_TIMEOUT) -> None:
+        """
+        Args:
+            max_workers (int | None): 同時に実行するジョブの数。NoneならCPUのコア数。
+            job_timeout (float): 1ジョブあたりの制限時間。秒単位。
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.job_timeout = job_timeout
+
+    def run(self, jobs: list[BatchJob]) -> dict:
+        """ジョブを一括実行して、結果をまとめる。
+
+        Args:
+            jobs (list[BatchJob]): 実行するジョブ。
+
+        Returns:
+            dict: 全ジョブの結果と、全体の経過時間などをまとめたレポート。
+        """
+        # 親プロセスで読み込んだモジュールを引き継がないように、spawnで子プロセスを作る。
+        context = multiprocessing.get_context("spawn")
+        pending_jobs = deque(enumerate(jobs))
+        running = {} # { 親側の接続: (ジョブの番号, プロセス, 開始時刻) }
+        results = [None] * len(jobs)
+
+        start_time = time.perf_counter()
+        while pending_jobs or running:
+            while pending_jobs and len(running) < self.max_workers:
+                job_index, job = pending_jobs.popleft()
+                parent_connection, child_connection = context.Pipe(duplex=False)
+                # day07のparallelのように、解答自体が子プロセスを作れるようにデーモンにはしない。
+                # 制限時間を超えたプロセスは強制終了し、全てのプロセスを待ってから戻る。
+                process = context.Process(target=_runJobInChild, args=(job, child_connection))
+                process.start()
+                child_connection.close()
+                running[parent_connection] = (job_index, process, time.perf_counter())
+            
+            wait(list(running), timeout=0.05)
+            now = time.perf_counter()
+            for parent_connection, (job_index, process, job_start_time) in list(running.items()):
+                result = None
+                if parent_connection.poll():
+                    try:
+                        result = parent_connection.recv()
+                    except EOFError:
+                        result = {"status": "crashed", "error": f"process exited with code {process.exitcode}"}
+                elif not process.is_alive():
+                    process.join()
+                    result = {"status": "crashed", "error": f"process exited with code {process.exitcode}"}
+                elif now - job_start_time > self.job_timeout:
+                    process.terminate()
+                    result = {"status": "timeout", "error": f"exceeded {self.job_timeout}s"}
+                if result is None:
+                    continue
+
+                process.join()
+                parent_connection.close()
+                del running[parent_connection]
+                results[job_index] = self._build_job_result(jobs[job_index], result, now - job_start_time)
+        end_time = time.perf_counter()
+
+        return {
+            "total_wall_time": end_time - start_time,
+            "max_workers": self.max_workers,
+            "job_timeout": self.job_timeout,
+            "jobs": results,
+        }
+
+    @staticmethod
+    def _build_job_result(job: BatchJob, result: dict, elapsed_time: float) -> dict:
+        """子プロセスの結果に、ジョブの情報と正解との照合結果を加える。
+        """
+        solver_spec = getSolverSpec(job.year, job.day)
+        expected_answer = solver_spec.expected_answers.get((job.part, job.input_name))
+        answer = result.get("answer")
+        status = result.get("status")
+        if status == "ok" and expected_answer is not None and answer != expected_answer:
+            status = "mismatch"
+        return {
+            "name": job.name,
+            "year": job.year,
+            "day": job.day,
+            "part": job.part,
+            "input": job.input_name,
+            "params": job.params,
+            "status": status,
+            "answer": answer,
+            "expected_answer": expected_answer,
+            "wall_time": result.get("wall_time") or elapsed_time,
+            "peak_memory": result.get("peak_memory"),
+            "error": result.get("error"),
+        }
+
+
+def formatReportAsMarkdown(report: dict) -> str:
+    """レポートをMarkdownの表に整形する。
+
+    Args:
+        report (dict): BatchRunner.runの戻り値。
+    """
+    lines = [
+        f"Total wall time: {report['total_wall_time']:.3f}s (workers: {report['max_workers']}, timeout: {report['job_timeout']}s)",
+        "",
+        "| job | status | answer | expected | wall time (s) | peak memory (MiB) |",
+        "| --- | --- | ---: | ---: | ---: | ---: |",
+    ]
+    for job_result in report["jobs"]:
+        peak_memory = job_result["peak_memory"]
+        peak_memory_text = f"{peak_memory / (1024 * 1024):.1f}" if peak_memory is not None else "-"
+        answer_text = "-" if job_result["answer"] is None else str(job_result["answer"])
+        expected_text = "-" if job_result["expected_answer"] is None else str(job_result["expected_answer"])
+        lines.append(
+            f"| {job_result['name']} | {job_result['status']} | {answer_text} | {expected_text} "
+            f"| {job_result['wall_time']:.3f} | {peak_memory_text} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def writeReport(report: dict, json_path_str: str | None = None, markdown_path_str: str | None = None) -> None:
+    """レポートをJSON・Markdownのファイルとして書き出す。
+
+    Args:
+        report (dict): BatchRunner.runの戻り値。
+        json_path_str (str | None): JSONの出力先のパス。Noneなら出力しない。
+        markdown_path_str (str | None): Markdownの出力先のパス。Noneなら出力しない。
+    """
+    if json_path_str is not None:
+        Path(json_path_str).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if markdown_path_str is not None:
+        Path(markdown_path_str).write_text(formatReportAsMarkdown(report), encoding="utf-8")
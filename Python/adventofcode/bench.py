@@ -0,0 +1,346 @@
+import contextlib
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import statistics
+import time
+import traceback
+
+from common.output import OutputLevel, getDefaultOutput
+from common.profiler import Profiler
+from common.result_cache import DEFAULT_CACHE_DIR
+from adventofcode.generate import GENERATOR_VERSION, generateCostGrid, generateHandList, generateMirrorMap
+from adventofcode.registry import getSolverSpec, loadSolveFunction
+
+
+# 計測の繰り返し回数の既定値。
+DEFAULT_REPEAT = 5
+# 計測前に捨てる実行回数の既定値。読み込みや役の対応表の作成などの初回だけの処理を除くため。
+DEFAULT_WARMUP = 1
+# ベースラインの中央値からこの割合を超えて遅くなったら、性能劣化と見なす。
+DEFAULT_SLOWDOWN_THRESHOLD = 0.2
+# ベースラインの既定の保存先。計測結果は環境ごとに異なるので、リポジトリではなくキャッシュのディレクトリに置く。
+DEFAULT_BASELINE_PATH = DEFAULT_CACHE_DIR / "bench" / "baseline.json"
+# 生成した入力の既定の保存先。
+DEFAULT_BENCH_INPUT_DIR = DEFAULT_CACHE_DIR / "bench" / "inputs"
+
+# 登録済みの入力より大きいサイズを計測するために、シード付きで生成する入力。
+# { (年, 日): { 入力の名前: (生成関数, 生成関数の引数) } }
+GENERATED_INPUTS = {
+    (2023, 7): {
+        "generated-100k": (generateHandList, {"hand_count": 100_000, "seed": 0}),
+    },
+    (2023, 16): {
+        "generated-300x300": (generateMirrorMap, {"x_size": 300, "y_size": 300, "seed": 1}),
+    },
+    (2023, 17): {
+        "generated-60x60": (generateCostGrid, {"x_size": 60, "y_size": 60, "seed": 0}),
+    },
+}
+
+
+class BenchCase:
+    """ベンチマークの1ケース分の情報を保持するデータクラス。
+
+    Attributes:
+        year (int): 年。
+        day (int): 日。
+        part (int): 問題の番号。
+        input_name (str): 入力の名前。登録済みの入力か、GENERATED_INPUTSの入力。
+        params (dict): 解答に渡す追加のパラメータ。
+    """
+
+    def __init__(self, year: int, day: int, part: int, input_name: str, params: dict | None = None) -> None:
+        """
+        Args:
+            year (int): 年。
+            day (int): 日。
+            part (int): 問題の番号。
+            input_name (str): 入力の名前。登録済みの入力か、GENERATED_INPUTSの入力。
+            params (dict | None): 解答に渡す追加のパラメータ。
+        """
+        self.year = year
+        self.day = day
+        self.part = part
+        self.input_name = input_name
+        self.params = params or {}
+
+    @property
+    def name(self) -> str:
+        """ケースの名前。ベースラインとの照合にも使う。
+        """
+        params_text = "".join(f" {key}={value}" for key, value in sorted(self.params.items()))
+        return f"{self.year}/day{self.day:02} part {self.part} ({self.input_name}){params_text}"
+
+
+def listBenchCases() -> list[BenchCase]:
+    """計測対象の全ケースを列挙する。
+
+    - day07: HandRankerImpl（問題1）・HandRankerImpl2（問題2）と、登録済みの他の方式
+    - day16: RecursionSimulator・StackSimulator
+    - day17: DijkstraSearcher・AnytimeSearcher（問題1・問題2の直進回数の制約）
+    既定の方式のケースは、ベースラインと照合できるようにパラメータ無しのまま計測する。
+    """
+    cases = []
+    for part in (1, 2):
+        for input_name in ("example", "question", "generated-100k"):
+            cases.append(BenchCase(2023, 7, part, input_name))
+    # 既定以外の方式。numpyが無い環境では、vectorizedは計測しない。
+    for engine in getSolverSpec(2023, 7).available_engines()[1:]:
+        for part in (1, 2):
+            for input_name in ("question", "generated-100k"):
+                cases.append(BenchCase(2023, 7, part, input_name, {"engine": engine}))
+
+    for engine in ("recursion", "stack"):
+        for input_name in ("example1", "example", "question"):
+            cases.append(BenchCase(2023, 16, 1, input_name, {"engine": engine}))
+        cases.append(BenchCase(2023, 16, 2, "example", {"engine": engine}))
+    # 再帰は大きなマップだと再帰の上限に達するので、スタックだけで計測する。
+    # （シードは、左上から発射したビームがマップの大部分を通過するものを選んでいる）
+    cases.append(BenchCase(2023, 16, 1, "generated-300x300", {"engine": "stack"}))
+    cases.append(BenchCase(2023, 16, 2, "question", {"engine": "stack"}))
+
+    for part in (1, 2):
+        for input_name in ("example", "generated-60x60", "question"):
+            cases.append(BenchCase(2023, 17, part, input_name))
+        # anytime探索は、問題の入力だと最適解の証明に時間が掛かるので、小さい入力だけで計測する。
+        for input_name in ("example", "generated-60x60"):
+            cases.append(BenchCase(2023, 17, part, input_name, {"engine": "anytime"}))
+    return cases
+
+
+def calculatePercentile(values: list[float], ratio: float) -> float:
+    """最近順位法でパーセンタイルを求める。
+
+    Args:
+        values (list[float]): 値の一覧。
+        ratio (float): 0〜1の割合。0.95なら95パーセンタイル。
+    """
+    sorted_values = sorted(values)
+    return sorted_values[max(0, math.ceil(ratio * len(sorted_values)) - 1)]
+
+
+class BenchRunner:
+    """ベンチマークのケースを順番に計測するクラス。
+    他のプロセスと計測が干渉しないように、並列にはせず同じプロセスで1ケースずつ実行する。
+
+    Attributes:
+        repeat (int): 計測の繰り返し回数。
+        warmup (int): 計測前に捨てる実行回数。
+        input_dir (Path): 生成した入力の保存先。
+    """
+
+    def __init__(self, repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP, input_dir_str: str | None = None) -> None:
+        """
+        Args:
+            repeat (int): 計測の繰り返し回数。
+            warmup (int): 計測前に捨てる実行回数。
+            input_dir_str (str | None): 生成した入力の保存先。Noneなら既定のディレクトリ。
+        """
+        if repeat < 1:
+            raise ValueError(f"repeat should be positive: {repeat}")
+        self.repeat = repeat
+        self.warmup = warmup
+        self.input_dir = Path(input_dir_str) if input_dir_str is not None else DEFAULT_BENCH_INPUT_DIR
+
+    def resolve_input(self, case: BenchCase) -> Path:
+        """ケースの入力ファイルのパスを求める。生成する入力がまだ無ければ生成する。
+        """
+        generated_inputs = GENERATED_INPUTS.get((case.year, case.day), {})
+        if case.input_name not in generated_inputs:
+            return getSolverSpec(case.year, case.day).resolve_input(case.input_name)
+
+        generate, generate_kwargs = generated_inputs[case.input_name]
+        # 生成関数の引数を変えた時に古いファイルを使わないように、引数のハッシュをファイル名に含める。
+        # 生成のロジックを変えた時のために、生成のバージョンも含める。
+        kwargs_hash = hashlib.sha256(
+            json.dumps({"version": GENERATOR_VERSION, **generate_kwargs}, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        input_path = self.input_dir / f"{case.year}-day{case.day:02}-{case.input_name}-{kwargs_hash}.txt"
+        if not input_path.exists():
+            self.input_dir.mkdir(parents=True, exist_ok=True)
+            # 途中で中断しても不完全なファイルが残らないように、一時ファイルに書いてから置き換える。
+            temp_path = input_path.with_suffix(f".{os.getpid()}.tmp")
+            generate(str(temp_path), **generate_kwargs)
+            os.replace(temp_path, input_path)
+        return input_path
+
+    def run(self, cases: list[BenchCase]) -> dict:
+        """全ケースを計測する。
+
+        Args:
+            cases (list[BenchCase]): 計測するケース。
+
+        Returns:
+            dict: 全ケースの計測結果をまとめたレポート。
+        """
+        return {
+            "repeat": self.repeat,
+            "warmup": self.warmup,
+            "cases": [self._run_case(case) for case in cases],
+        }
+
+    def _run_case(self, case: BenchCase) -> dict:
+        """1ケースを計測する。
+        経過時間は計測の邪魔にならないようにtracemallocを止めた状態で繰り返し計測し、
+        ピークメモリはその後にもう1回だけtracemallocを有効にして実行して計測する。
+        """
+        solver_spec = getSolverSpec(case.year, case.day)
+        result = {
+            "name": case.name,
+            "year": case.year,
+            "day": case.day,
+            "part": case.part,
+            "input": case.input_name,
+            "params": case.params,
+            "status": "error",
+            "answer": None,
+            "expected_answer": solver_spec.expected_answers.get((case.part, case.input_name)),
+            "wall_times": [],
+            "median": None,
+            "p95": None,
+            "peak_memory": None,
+            "error": None,
+        }
+        output = getDefaultOutput()
+        output_level = output.level
+        try:
+            input_path_str = str(self.resolve_input(case))
+            solve = loadSolveFunction(solver_spec)
+            # 解答が出力する内容は、レポートに混ざらないように捨てる。整形の時間も計測に含めないように、出力自体を止める。
+            output.level = OutputLevel.QUIET
+            with open(os.devnull, mode="w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                for _ in range(self.warmup):
+                    solve(input_path_str, case.part, **case.params)
+                for _ in range(self.repeat):
+                    start_time = time.perf_counter()
+                    answer = solve(input_path_str, case.part, **case.params)
+                    end_time = time.perf_counter()
+                    result["wall_times"].append(end_time - start_time)
+
+                profiler = Profiler(trace_memory=True)
+                with profiler.span(case.name) as record:
+                    solve(input_path_str, case.part, **case.params)
+            result.update(
+                status="ok",
+                answer=answer,
+                median=statistics.median(result["wall_times"]),
+                p95=calculatePercentile(result["wall_times"], 0.95),
+                peak_memory=record.peak_memory,
+            )
+        except Exception:
+            result["error"] = traceback.format_exc()
+        finally:
+            output.level = output_level
+        return result
+
+
+def loadBaseline(baseline_path_str: str | None = None) -> dict | None:
+    """保存済みのベースラインを読み込む。
+
+    Args:
+        baseline_path_str (str | None): ベースラインのパス。Noneなら既定のパス。
+
+    Returns:
+        dict | None: { ケースの名前: そのケースの計測結果 }。保存されていなければNone。
+    """
+    baseline_path = Path(baseline_path_str) if baseline_path_str is not None else DEFAULT_BASELINE_PATH
+    if not baseline_path.exists():
+        return None
+    return json.loads(baseline_path.read_text(encoding="utf-8"))["cases"]
+
+
+def saveBaseline(report: dict, baseline_path_str: str | None = None) -> None:
+    """計測結果をベースラインとして保存する。正常に計測できたケースだけを保存する。
+    一部のケースだけを計測した場合も、それ以外のケースの保存済みのベースラインは残す。
+
+    Args:
+        report (dict): BenchRunner.runの戻り値。
+        baseline_path_str (str | None): ベースラインのパス。Noneなら既定のパス。
+    """
+    baseline_path = Path(baseline_path_str) if baseline_path_str is not None else DEFAULT_BASELINE_PATH
+    baseline_cases = loadBaseline(str(baseline_path)) or {}
+    for case_result in report["cases"]:
+        if case_result["status"] not in ("ok", "slower"):
+            continue
+        baseline_cases[case_result["name"]] = {
+            "answer": case_result["answer"],
+            "median": case_result["median"],
+            "p95": case_result["p95"],
+            "peak_memory": case_result["peak_memory"],
+        }
+
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {"repeat": report["repeat"], "warmup": report["warmup"], "cases": baseline_cases}
+    baseline_path.write_text(json.dumps(baseline, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def compareWithBaseline(report: dict, baseline: dict | None, slowdown_threshold: float = DEFAULT_SLOWDOWN_THRESHOLD) -> dict:
+    """計測結果を既知の正解・ベースラインと照合し、各ケースの状態を更新する。
+
+    - 既知の正解（各日のoutput_result.txtの結果）と答えが違えば "mismatch"。
+      既知の正解が無い生成した入力は、ベースラインの答えと照合する。
+    - ベースラインの中央値よりslowdown_thresholdの割合を超えて遅ければ "slower"。
+
+    Args:
+        report (dict): BenchRunner.runの戻り値。
+        baseline (dict | None): loadBaselineの戻り値。Noneならベースラインとの比較は行わない。
+        slowdown_threshold (float): 性能劣化と見なす、中央値の増加の割合。
+
+    Returns:
+        dict: 照合結果を加えたレポート。
+    """
+    report["slowdown_threshold"] = slowdown_threshold
+    for case_result in report["cases"]:
+        baseline_result = (baseline or {}).get(case_result["name"])
+        case_result["baseline_median"] = None
+        case_result["slowdown"] = None
+        if case_result["status"] != "ok":
+            continue
+
+        expected_answer = case_result["expected_answer"]
+        if expected_answer is None and baseline_result is not None:
+            expected_answer = baseline_result["answer"]
+        if expected_answer is not None and case_result["answer"] != expected_answer:
+            case_result["status"] = "mismatch"
+            continue
+
+        if baseline_result is not None and baseline_result["median"]:
+            case_result["baseline_median"] = baseline_result["median"]
+            case_result["slowdown"] = case_result["median"] / baseline_result["median"] - 1
+            if case_result["slowdown"] > slowdown_threshold:
+                case_result["status"] = "slower"
+    return report
+
+
+def _formatSeconds(seconds: float | None) -> str:
+    """秒数を表の1マス分の文字列に整形する。
+    """
+    return "-" if seconds is None else f"{seconds:.4f}"
+
+
+def formatBenchReportAsMarkdown(report: dict) -> str:
+    """レポートをMarkdownの表に整形する。
+
+    Args:
+        report (dict): compareWithBaselineの戻り値。
+    """
+    lines = [
+        f"Repeat: {report['repeat']} (warmup: {report['warmup']}), slowdown threshold: {report['slowdown_threshold']:.0%}",
+        "",
+        "| case | status | answer | median (s) | p95 (s) | baseline (s) | change | peak memory (MiB) |",
+        "| --- | --- | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for case_result in report["cases"]:
+        peak_memory = case_result["peak_memory"]
+        peak_memory_text = "-" if peak_memory is None else f"{peak_memory / (1024 * 1024):.1f}"
+        answer_text = "-" if case_result["answer"] is None else str(case_result["answer"])
+        slowdown_text = "-" if case_result["slowdown"] is None else f"{case_result['slowdown']:+.1%}"
+        lines.append(
+            f"| {case_result['name']} | {case_result['status']} | {answer_text} "
+            f"| {_formatSeconds(case_result['median'])} | {_formatSeconds(case_result['p95'])} "
+            f"| {_formatSeconds(case_result['baseline_median'])} | {slowdown_text} | {peak_memory_text} |"
+        )
+    return "\n".join(lines) + "\n"
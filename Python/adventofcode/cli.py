@@ -0,0 +1,350 @@
+import argparse
+import json
+from pathlib import Path
+import time
+
+from common.input_cache import InputCache
+from common.output import OutputLevel, getDefaultOutput
+from common.result_cache import ResultCache
+# bench・batch・daemon・generateとプロファイラは、起動を速くするため各サブコマンドの処理の中で読み込む。
+from adventofcode.registry import SOLVERS, getSolverSpec, loadSolveFunction
+
+
+def parseParams(param_texts: list[str], convert_int: bool = True) -> dict[str, int | str]:
+    """key=value形式のパラメータを辞書に変換する。
+
+    Args:
+        param_texts (list[str]): key=value形式のパラメータの一覧。
+        convert_int (bool): 整数として解釈できる値を整数にするかどうか。Falseなら値は全て文字列のまま。
+    """
+    params = {}
+    for param_text in param_texts:
+        key, separator, value = param_text.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"param should be key=value: {param_text}")
+        if not convert_int:
+            params[key] = value
+            continue
+        try:
+            params[key] = int(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+def parseSize(size_text: str) -> tuple[int, int]:
+    """WIDTHxHEIGHT形式のサイズを (x方向のマス数, y方向のマス数) に変換する。
+
+    Args:
+        size_text (str): WIDTHxHEIGHT形式のサイズ。
+    """
+    x_size_text, separator, y_size_text = size_text.lower().partition("x")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"size should be WIDTHxHEIGHT: {size_text}")
+    return int(x_size_text), int(y_size_text)
+
+
+def parseWeights(weights_text: str) -> list[float]:
+    """カンマ区切りの重みをリストに変換する。コスト1〜9の9個の重みで、負の値が無く、合計が正であること。
+
+    Args:
+        weights_text (str): カンマ区切りの重み。
+    """
+    try:
+        weights = [float(weight_text) for weight_text in weights_text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"weights should be comma separated numbers: {weights_text}") from None
+    if len(weights) != 9:
+        raise argparse.ArgumentTypeError(f"weights should have 9 values for costs 1..9, got {len(weights)}: {weights_text}")
+    if any(weight < 0 for weight in weights) or sum(weights) <= 0:
+        raise argparse.ArgumentTypeError(f"weights should be non-negative and have a positive sum: {weights_text}")
+    return weights
+
+
+def buildParser() -> argparse.ArgumentParser:
+    """コマンドライン引数のパーサーを作る。
+    """
+    parser = argparse.ArgumentParser(prog="python -m adventofcode", description="Advent of Code solver runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run a solver")
+    run_parser.add_argument("year", type=int)
+    run_parser.add_argument("day", type=int)
+    run_parser.add_argument("--part", type=int, required=True, help="question number")
+    run_parser.add_argument(
+        "--input", default="question",
+        help="input file path, or a registered input name such as example/question (default: question)"
+    )
+    run_parser.add_argument("--engine", default=None, help="solver engine (see 'list'; same as --param engine=NAME)")
+    run_parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="extra solver parameter")
+    run_parser.add_argument("--no-cache", action="store_true", help="bypass the result and parsed-input caches")
+    run_parser.add_argument("--cache-dir", default=None, help="cache directory")
+    run_parser.add_argument(
+        "--output-level", type=OutputLevel.fromName, default=None, metavar="{quiet,summary,verbose}",
+        help="detail of the solver output (default: $ADVENTOFCODE_OUTPUT_LEVEL or summary)"
+    )
+    run_parser.add_argument(
+        "--profile", default=None, metavar="JSON",
+        help="profile the solver (bypasses the result cache) and write the spans to this JSON file"
+    )
+    run_parser.add_argument("--profile-memory", action="store_true", help="also trace peak memory with tracemalloc")
+    run_parser.add_argument("--profile-cprofile", action="store_true", help="also collect per-function stats with cProfile")
+
+    batch_parser = subparsers.add_parser("batch", help="run every registered (day, part, input) job in parallel")
+    batch_parser.add_argument("--jobs", type=int, default=None, help="number of parallel jobs (default: CPU count)")
+    batch_parser.add_argument("--timeout", type=float, default=None, help="per-job timeout in seconds (default: 600)")
+    batch_parser.add_argument("--day", type=int, action="append", default=[], help="only run this day (repeatable)")
+    batch_parser.add_argument("--all-engines", action="store_true", help="run every available engine, not just the default")
+    batch_parser.add_argument("--json", default=None, metavar="PATH", help="write the report as JSON")
+    batch_parser.add_argument("--markdown", default=None, metavar="PATH", help="write the report as Markdown")
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark the engines and compare against a stored baseline")
+    bench_parser.add_argument("--repeat", type=int, default=None, help="timed iterations per case (default: 5)")
+    bench_parser.add_argument("--warmup", type=int, default=None, help="untimed iterations per case (default: 1)")
+    bench_parser.add_argument(
+        "--threshold", type=float, default=None,
+        help="flag cases whose median is slower than the baseline by more than this ratio (default: 0.2)"
+    )
+    bench_parser.add_argument("--baseline", default=None, metavar="PATH", help="baseline file (default: in the cache directory)")
+    bench_parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    bench_parser.add_argument("--day", type=int, action="append", default=[], help="only run this day (repeatable)")
+    bench_parser.add_argument("--filter", default=None, help="only run cases whose name contains this text")
+    bench_parser.add_argument("--input-dir", default=None, help="directory for generated inputs")
+    bench_parser.add_argument("--json", default=None, metavar="PATH", help="write the report as JSON")
+    bench_parser.add_argument("--markdown", default=None, metavar="PATH", help="write the report as Markdown")
+
+    generate_parser = subparsers.add_parser("generate", help="write a seeded synthetic input file")
+    generate_subparsers = generate_parser.add_subparsers(dest="kind", required=True)
+
+    map_parser = generate_subparsers.add_parser("map", help="day16 mirror map")
+    map_parser.add_argument("output")
+    map_parser.add_argument("--size", type=parseSize, default=(110, 110), help="WIDTHxHEIGHT (default: 110x110)")
+    map_parser.add_argument("--mirror-density", type=float, default=0.1, help="ratio of / and \\ tiles")
+    map_parser.add_argument("--splitter-density", type=float, default=0.1, help="ratio of - and | tiles")
+    map_parser.add_argument("--seed", type=int, default=0)
+
+    grid_parser = generate_subparsers.add_parser("grid", help="day17 cost grid")
+    grid_parser.add_argument("output")
+    grid_parser.add_argument("--size", type=parseSize, default=(141, 141), help="WIDTHxHEIGHT (default: 141x141)")
+    grid_parser.add_argument(
+        "--weights", type=parseWeights, default=None,
+        help="comma separated weights of costs 1..9 (default: uniform)"
+    )
+    grid_parser.add_argument("--seed", type=int, default=0)
+
+    hands_parser = generate_subparsers.add_parser("hands", help="day07 hand list")
+    hands_parser.add_argument("output")
+    hands_parser.add_argument("--count", type=int, default=1000, help="number of hands (default: 1000)")
+    hands_parser.add_argument("--max-bid", type=int, default=1000, help="largest bid (default: 1000)")
+    hands_parser.add_argument("--seed", type=int, default=0)
+
+    serve_parser = subparsers.add_parser("serve", help="start a warm solver daemon on a Unix socket")
+    serve_parser.add_argument("--socket", default=None, help="socket path")
+
+    query_parser = subparsers.add_parser("query", help="send a request to the solver daemon")
+    query_parser.add_argument("query_command", metavar="COMMAND", help="ping, beam, route, rank, solve, stats, clear or shutdown")
+    query_parser.add_argument("args", nargs="*", metavar="KEY=VALUE", help="command argument")
+    query_parser.add_argument("--socket", default=None, help="socket path")
+    query_parser.add_argument("--timeout", type=float, default=None, help="seconds to wait for the response")
+
+    subparsers.add_parser("list", help="list registered solvers")
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    """runサブコマンドの処理。
+    """
+    solver_spec = getSolverSpec(args.year, args.day)
+    if args.part not in solver_spec.parts:
+        raise SystemExit(f"Unsupported part: {args.part} (supported: {solver_spec.parts})")
+    input_path = solver_spec.resolve_input(args.input)
+    params = parseParams(args.param)
+    if args.engine is not None:
+        if args.engine not in solver_spec.engines:
+            raise SystemExit(f"Unsupported engine: {args.engine} (supported: {solver_spec.engines})")
+        params["engine"] = args.engine
+    output = getDefaultOutput()
+    if args.output_level is not None:
+        output.level = args.output_level
+
+    from common.profiler import getDefaultProfiler
+    profiler = getDefaultProfiler()
+    if args.profile is not None:
+        profiler.trace_memory = profiler.trace_memory or args.profile_memory
+        profiler.use_cprofile = profiler.use_cprofile or args.profile_cprofile
+
+    start_time = time.perf_counter()
+    result_cache = None
+    is_cached = False
+    # 計測する場合や、統計の書き出しなど副作用のあるパラメータ・時間制限など結果が変わり得るパラメータを指定した場合は、
+    # 計算結果のキャッシュを使わずに毎回解く。
+    if not args.no_cache and args.profile is None and solver_spec.is_cacheable(params):
+        result_cache = ResultCache(args.cache_dir)
+        cache_key = ResultCache.make_key(
+            str(input_path), solver_spec.solver_id, {"part": args.part, **params}, solver_spec.version
+        )
+        is_cached, answer = result_cache.get(cache_key)
+    if not is_cached:
+        solve = loadSolveFunction(solver_spec)
+        input_cache = None if args.no_cache else InputCache(args.cache_dir)
+        with profiler.span(f"{solver_spec.solver_id} part {args.part}"):
+            answer = solve(str(input_path), args.part, input_cache=input_cache, **params)
+        if result_cache is not None:
+            result_cache.put(cache_key, answer, {"solver_id": solver_spec.solver_id, "part": args.part, "params": params})
+    end_time = time.perf_counter()
+
+    # 解答の出力の後に答えが表示されるように、先に書き込んでおく。
+    output.flush()
+    print(f"answer: {answer}{' (cached)' if is_cached else ''}")
+    print(f"elapsed: {end_time - start_time:.3f}s")
+    if args.profile is not None:
+        profiler.dump_json(args.profile)
+    return 0
+
+
+def runBatch(args: argparse.Namespace) -> int:
+    """batchサブコマンドの処理。全ジョブが正常に終わり、既知の正解と一致した場合に0を返す。
+    """
+    from adventofcode.batch import DEFAULT_JOB_TIMEOUT, BatchRunner, formatReportAsMarkdown, listJobs, writeReport
+
+    solver_specs = [
+        solver_spec for solver_spec in SOLVERS.values()
+        if not args.day or solver_spec.day in args.day
+    ]
+    timeout = DEFAULT_JOB_TIMEOUT if args.timeout is None else args.timeout
+    report = BatchRunner(args.jobs, timeout).run(listJobs(solver_specs, args.all_engines))
+    writeReport(report, args.json, args.markdown)
+    print(formatReportAsMarkdown(report), end="")
+    return 0 if all(job_result["status"] == "ok" for job_result in report["jobs"]) else 1
+
+
+def runBench(args: argparse.Namespace) -> int:
+    """benchサブコマンドの処理。全ケースが正常に終わり、答えが一致し、性能劣化も無い場合に0を返す。
+    """
+    from adventofcode.batch import writeReport
+    from adventofcode.bench import (
+        DEFAULT_REPEAT,
+        DEFAULT_SLOWDOWN_THRESHOLD,
+        DEFAULT_WARMUP,
+        BenchRunner,
+        compareWithBaseline,
+        formatBenchReportAsMarkdown,
+        listBenchCases,
+        loadBaseline,
+        saveBaseline,
+    )
+
+    repeat = DEFAULT_REPEAT if args.repeat is None else args.repeat
+    warmup = DEFAULT_WARMUP if args.warmup is None else args.warmup
+    threshold = DEFAULT_SLOWDOWN_THRESHOLD if args.threshold is None else args.threshold
+    cases = [
+        case for case in listBenchCases()
+        if (not args.day or case.day in args.day) and (args.filter is None or args.filter in case.name)
+    ]
+    report = BenchRunner(repeat, warmup, args.input_dir).run(cases)
+    report = compareWithBaseline(report, loadBaseline(args.baseline), threshold)
+    if args.save_baseline:
+        saveBaseline(report, args.baseline)
+    writeReport(report, args.json, None)
+    markdown = formatBenchReportAsMarkdown(report)
+    if args.markdown is not None:
+        Path(args.markdown).write_text(markdown, encoding="utf-8")
+    print(markdown, end="")
+    return 0 if all(case_result["status"] == "ok" for case_result in report["cases"]) else 1
+
+
+def generate(args: argparse.Namespace) -> int:
+    """generateサブコマンドの処理。
+    """
+    from adventofcode.generate import generateCostGrid, generateHandList, generateMirrorMap
+
+    start_time = time.perf_counter()
+    if args.kind == "map":
+        x_size, y_size = args.size
+        generateMirrorMap(args.output, x_size, y_size, args.mirror_density, args.splitter_density, args.seed)
+    elif args.kind == "grid":
+        x_size, y_size = args.size
+        generateCostGrid(args.output, x_size, y_size, args.weights, args.seed)
+    elif args.kind == "hands":
+        generateHandList(args.output, args.count, args.max_bid, args.seed)
+    end_time = time.perf_counter()
+
+    print(f"wrote: {args.output} ({Path(args.output).stat().st_size} bytes)")
+    print(f"elapsed: {end_time - start_time:.3f}s")
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """serveサブコマンドの処理。shutdownのリクエストを受け取るまで戻らない。
+    """
+    from adventofcode.daemon import SolverDaemon
+
+    daemon = SolverDaemon(args.socket)
+    print(f"listening: {daemon.socket_path}", flush=True)
+    try:
+        daemon.run()
+    except RuntimeError as e:
+        print(f"error: {e}")
+        return 1
+    return 0
+
+
+def query(args: argparse.Namespace) -> int:
+    """queryサブコマンドの処理。
+    """
+    from adventofcode.daemon import DaemonClient
+
+    client = DaemonClient(args.socket, args.timeout)
+    try:
+        # "22222"のような手札も文字列のまま送り、型の変換は各コマンドで行う。
+        response = client.request(args.query_command, **parseParams(args.args, convert_int=False))
+    except RuntimeError as e:
+        print(f"error: {e}")
+        return 1
+    except TimeoutError:
+        print(f"error: daemon at {client.socket_path} did not respond within {args.timeout}s")
+        return 1
+    except OSError:
+        # ソケットファイルがない場合や、待ち受けているデーモンがいない場合。
+        print(f"error: daemon not running at {client.socket_path}")
+        return 1
+    print(f"result: {json.dumps(response['result'], ensure_ascii=False)}")
+    print(f"elapsed: {response['elapsed']:.6f}s")
+    return 0
+
+
+def listSolvers() -> int:
+    """listサブコマンドの処理。
+    """
+    for solver_spec in SOLVERS.values():
+        print(
+            f"{solver_spec.year} {solver_spec.day:2}: parts={list(solver_spec.parts)} inputs={list(solver_spec.inputs)}"
+            f" engines={list(solver_spec.engines)}"
+        )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """コマンドラインのエントリポイント。
+    """
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    elif args.command == "batch":
+        return runBatch(args)
+    elif args.command == "bench":
+        return runBench(args)
+    elif args.command == "generate":
+        # サイズや密度などの設定の誤りは、トレースバックではなく使い方と一緒に表示する。
+        try:
+            return generate(args)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "serve":
+        return serve(args)
+    elif args.command == "query":
+        return query(args)
+    elif args.command == "list":
+        return listSolvers()
+    return 1
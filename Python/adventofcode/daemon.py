@@ -0,0 +1,379 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+import socket
+import time
+from typing import Any
+
+from common.constants import Direction
+from common.output import OutputLevel, getDefaultOutput
+from common.result_cache import DEFAULT_CACHE_DIR
+from adventofcode.registry import getSolverSpec, loadDayModule, loadMainModule, loadSolveFunction
+
+
+# デーモンが待ち受けるUnixソケットの既定のパス。
+DEFAULT_SOCKET_PATH = Path(os.environ.get("ADVENTOFCODE_SOCKET", DEFAULT_CACHE_DIR / "daemon.sock"))
+# 1リクエスト（1行のJSON）の最大バイト数。
+MAX_REQUEST_SIZE = 1 << 20
+
+
+class WarmState:
+    """デーモンが保持し続ける、読み込み済みの入力や計算結果。
+    入力ファイルは (パス, 更新時刻, サイズ) で識別し、ファイルが変更されたら読み込み直す。
+    queryサブコマンドからは引数が全て文字列で渡されるので、数値の引数は各コマンドで変換する。
+
+    Attributes:
+        simulators (dict[tuple, Simulator]): day16のマップを読み込み済みのシミュレーター。
+        grids (dict[tuple, Grid]): day17の読み込み済みのグリッド。直進回数の制約を変えた探索で共有する。
+        leaderboards (dict[tuple, HandLeaderboard]): day07の問題ごとの順位表。
+        results (dict[tuple, Any]): 計算結果のメモ。
+        hit_count (int): 計算結果のメモを使った回数。
+        miss_count (int): 計算した回数。
+    """
+
+    def __init__(self) -> None:
+        self.simulators = {}
+        self.grids = {}
+        self.leaderboards = {}
+        self.results = {}
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @staticmethod
+    def _input_key(year: int, day: int, input_name_or_path: str) -> tuple[str, int, int]:
+        """入力ファイルを識別するためのキーを作る。
+
+        Args:
+            year (int): 年。
+            day (int): 日。
+            input_name_or_path (str): 登録済みの入力の名前か、入力ファイルのパス。
+        """
+        input_path = getSolverSpec(year, day).resolve_input(input_name_or_path)
+        input_stat = input_path.stat()
+        return str(input_path), input_stat.st_mtime_ns, input_stat.st_size
+
+    def _memoize(self, key: tuple, calculate) -> Any:
+        """計算結果をメモしておき、同じキーなら再利用する。
+        """
+        if key in self.results:
+            self.hit_count += 1
+            return self.results[key]
+        self.miss_count += 1
+        result = calculate()
+        self.results[key] = result
+        return result
+
+    def beam(
+        self,
+        input: str = "question",
+        x: int | str | None = None,
+        y: int | str | None = None,
+        direction: str = "RIGHT",
+        engine: str = "stack"
+    ) -> int:
+        """day16: 指定した位置・方向からビームを発射した際に、通過するタイルの枚数を求める。
+        位置を指定しなければ、全ての発射位置の中での最大値を求める。
+
+        Args:
+            input (str): 登録済みの入力の名前か、入力ファイルのパス。
+            x (int | str | None): 初期位置のx座標。yと一緒に指定する。
+            y (int | str | None): 初期位置のy座標。xと一緒に指定する。
+            direction (str): 初期位置から照射するビームの方向。RIGHT / LEFT / UP / DOWN
+            engine (str): シミュレーションの方式。"recursion"（再帰）か"stack"（スタック）。
+        """
+        if (x is None) != (y is None):
+            raise ValueError("x and y should be given together.")
+        input_key = self._input_key(2023, 16, input)
+        simulator_key = (input_key, engine)
+        if simulator_key not in self.simulators:
+            beam_simulator = loadDayModule(getSolverSpec(2023, 16), "beam_simulator")
+            simulator_classes = {"recursion": beam_simulator.RecursionSimulator, "stack": beam_simulator.StackSimulator}
+            if engine not in simulator_classes:
+                raise ValueError(f"Unsupported engine: {engine}")
+            self.simulators[simulator_key] = simulator_classes[engine](input_key[0])
+        simulator = self.simulators[simulator_key]
+
+        if x is None and y is None:
+            return self._memoize(("beam", simulator_key, "max"), simulator.calculate_max_passed_tiles_count)
+
+        x, y = int(x), int(y)
+        launch_direction = Direction.fromName(direction.upper())
+        if not simulator.map_obj.is_in_map(x, y):
+            raise ValueError(f"launch point is out of the map: ({x}, {y})")
+
+        def simulate() -> int:
+            # 前回のシミュレーションの通過記録を消してから発射する。
+            simulator.map_obj.clear_passed_tiles()
+            return simulator.simulate(x, y, launch_direction)
+        return self._memoize(("beam", simulator_key, x, y, launch_direction.name), simulate)
+
+    def route(
+        self,
+        input: str = "question",
+        part: int | str | None = None,
+        min: int | str | None = None,
+        max: int | str | None = None
+    ) -> int:
+        """day17: 直進回数の制約を指定して、最短経路のコストを求める。
+
+        Args:
+            input (str): 登録済みの入力の名前か、入力ファイルのパス。
+            part (int | str | None): 問題の番号。直進回数の制約を指定しなかった場合に、この問題の制約を使う。
+            min (int | str | None): 一度に必ず直進しなければならない最小マス数。
+            max (int | str | None): 一度に最大で直進できるマス数。
+        """
+        solver_spec = getSolverSpec(2023, 17)
+        input_key = self._input_key(2023, 17, input)
+        min = None if min is None else int(min)
+        max = None if max is None else int(max)
+        if min is None or max is None:
+            straight_count_limits = loadMainModule(solver_spec).STRAIGHT_COUNT_LIMITS
+            part = 1 if part is None else int(part)
+            if part not in straight_count_limits:
+                raise ValueError(f"Unsupported part: {part}")
+            default_min, default_max = straight_count_limits[part]
+            min = default_min if min is None else min
+            max = default_max if max is None else max
+
+        if input_key not in self.grids:
+            self.grids[input_key] = loadDayModule(solver_spec, "grid").Grid(input_key[0])
+        grid_obj = self.grids[input_key]
+
+        def search() -> int:
+            searcher_module = loadDayModule(solver_spec, "shortest_route_searcher")
+            return searcher_module.DijkstraSearcher(input_key[0], min, max, grid_obj=grid_obj).search()
+        return self._memoize(("route", input_key, min, max), search)
+
+    def rank(self, input: str = "question", part: int | str = 1, hand: str | None = None, bid: int | str | None = None) -> dict:
+        """day07: 手札一覧の賞金の合計を求める。手札と入札額を指定した場合は、その手札の順位も求める。
+
+        Args:
+            input (str): 登録済みの入力の名前か、入力ファイルのパス。
+            part (int | str): 問題の番号。
+            hand (str | None): 順位を調べる手札。"32T3K"のような文字列。
+            bid (int | str | None): 順位を調べる手札の入札額。
+
+        Returns:
+            dict: {"total_bounty": 賞金の合計, "hand_count": 手札の数, "rank": 指定した手札の順位（弱い方から1始まり）}
+        """
+        part = int(part)
+        input_key = self._input_key(2023, 7, input)
+        leaderboard_key = (input_key, part)
+        if leaderboard_key not in self.leaderboards:
+            solver_spec = getSolverSpec(2023, 7)
+            leaderboard = loadDayModule(solver_spec, "hand_leaderboard").HandLeaderboard(part)
+            for hand_view in loadDayModule(solver_spec, "hand_batch").HandBatch.fromFile(input_key[0]):
+                leaderboard.insert(bytes(hand_view.card_codes), hand_view.bid_price)
+            self.leaderboards[leaderboard_key] = leaderboard
+        leaderboard = self.leaderboards[leaderboard_key]
+
+        result = {"total_bounty": leaderboard.total_bounty, "hand_count": len(leaderboard)}
+        if hand is not None:
+            if bid is None:
+                raise ValueError("bid is required to look up the rank of a hand.")
+            result["rank"] = leaderboard.rank_of(str(hand), int(bid))
+        return result
+
+    def solve(self, year: int | str, day: int | str, part: int | str, input: str = "question", **params: Any) -> Any:
+        """登録済みの解答のsolveで、問題の答えを求める。
+
+        Args:
+            year (int | str): 年。
+            day (int | str): 日。
+            part (int | str): 問題の番号。
+            input (str): 登録済みの入力の名前か、入力ファイルのパス。
+            **params (Any): 解答に渡す追加のパラメータ。数値のパラメータは、各解答のsolveで変換する。
+        """
+        year, day, part = int(year), int(day), int(part)
+        solver_spec = getSolverSpec(year, day)
+        input_key = self._input_key(year, day, input)
+        solve = loadSolveFunction(solver_spec)
+        if not solver_spec.is_cacheable(params):
+            # 統計の書き出しなどの副作用があるか、時間制限などで結果が変わり得るので、メモを使わずに毎回解く。
+            self.miss_count += 1
+            return solve(input_key[0], part, **params)
+        return self._memoize(
+            ("solve", solver_spec.solver_id, input_key, part, tuple(sorted(params.items()))),
+            lambda: solve(input_key[0], part, **params)
+        )
+
+    def stats(self) -> dict:
+        """保持している状態の件数を取得する。
+        """
+        return {
+            "simulators": len(self.simulators),
+            "grids": len(self.grids),
+            "leaderboards": len(self.leaderboards),
+            "results": len(self.results),
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+        }
+
+    def clear(self) -> None:
+        """保持している状態を全て破棄する。
+        """
+        self.__init__()
+
+
+class SolverDaemon:
+    """読み込み済みの入力や計算結果を保持したまま、Unixソケットで解答のリクエストを受け付けるデーモン。
+    インタプリタの起動・モジュールの読み込み・入力のパースを毎回行わずに済むので、
+    2回目以降の同じ入力へのリクエストは数ミリ秒で応答できる。
+
+    プロトコルは1行1件のJSON。
+        リクエスト: {"command": "beam", "args": {"input": "question", "x": 0, "y": 0, "direction": "RIGHT"}}
+        レスポンス: {"ok": true, "result": 7562, "elapsed": 0.0001}
+                    {"ok": false, "error": "ValueError: ..."}
+
+    コマンド: ping / beam / route / rank / solve / stats / clear / shutdown
+
+    Attributes:
+        socket_path (Path): 待ち受けるUnixソケットのパス。
+        state (WarmState): 保持している状態。
+        request_count (int): 処理したリクエストの数。
+    """
+
+    def __init__(self, socket_path_str: str | None = None) -> None:
+        """
+        Args:
+            socket_path_str (str | None): 待ち受けるUnixソケットのパス。NoneならDEFAULT_SOCKET_PATH。
+        """
+        self.socket_path = Path(socket_path_str) if socket_path_str is not None else DEFAULT_SOCKET_PATH
+        self.state = WarmState()
+        self.request_count = 0
+        self._handlers = {
+            "ping": lambda: "pong",
+            "beam": self.state.beam,
+            "route": self.state.route,
+            "rank": self.state.rank,
+            "solve": self.state.solve,
+            "stats": lambda: {**self.state.stats(), "request_count": self.request_count},
+            "clear": self.state.clear,
+        }
+
+    def run(self) -> None:
+        """デーモンを起動し、shutdownコマンドを受け取るまで待ち受ける。
+        """
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """Unixソケットで待ち受ける。
+        """
+        # 応答はJSONで返すので、解答の出力は捨てる。
+        getDefaultOutput().level = OutputLevel.QUIET
+        # 解答の処理は同時に1件ずつ、イベントループを止めないように別スレッドで行う。
+        self._lock = asyncio.Lock()
+        self._stop_event = asyncio.Event()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_socket()
+        server = await asyncio.start_unix_server(self._handle_connection, path=str(self.socket_path), limit=MAX_REQUEST_SIZE)
+        try:
+            async with server:
+                await self._stop_event.wait()
+        finally:
+            self.socket_path.unlink(missing_ok=True)
+
+    def _remove_stale_socket(self) -> None:
+        """前回異常終了した際に残ったソケットファイルを削除する。
+
+        Raises:
+            RuntimeError: 別のデーモンが同じソケットで待ち受けている場合。
+        """
+        if not self.socket_path.exists():
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe_socket:
+            try:
+                probe_socket.connect(str(self.socket_path))
+            except ConnectionRefusedError:
+                # 待ち受けているデーモンがいないので、残ったファイルを消してよい。
+                self.socket_path.unlink()
+                return
+        raise RuntimeError(f"daemon is already running at {self.socket_path}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """1接続分のリクエストを順番に処理する。1接続で複数のリクエストを送ってもよい。
+        """
+        try:
+            while not self._stop_event.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def _respond(self, line: bytes) -> dict:
+        """1件のリクエストを処理して、レスポンスを作る。
+        """
+        start_time = time.perf_counter()
+        try:
+            request = json.loads(line)
+            command = request.get("command")
+            args = request.get("args", {})
+            if command == "shutdown":
+                self._stop_event.set()
+                result = None
+            elif command in self._handlers:
+                async with self._lock:
+                    result = await asyncio.get_running_loop().run_in_executor(None, lambda: self._handlers[command](**args))
+            else:
+                raise ValueError(f"Unsupported command: {command}")
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.request_count += 1
+        return {"ok": True, "result": result, "elapsed": time.perf_counter() - start_time}
+
+
+class DaemonClient:
+    """SolverDaemonへリクエストを送るクライアント。
+
+    使用例:
+        client = DaemonClient()
+        client.request("route", input="question", min=4, max=10)["result"]
+
+    Attributes:
+        socket_path (Path): デーモンのUnixソケットのパス。
+        timeout (float | None): 応答を待つ時間。秒単位。Noneなら無制限。
+    """
+
+    def __init__(self, socket_path_str: str | None = None, timeout: float | None = None) -> None:
+        """
+        Args:
+            socket_path_str (str | None): デーモンのUnixソケットのパス。NoneならDEFAULT_SOCKET_PATH。
+            timeout (float | None): 応答を待つ時間。秒単位。Noneなら無制限。
+        """
+        self.socket_path = Path(socket_path_str) if socket_path_str is not None else DEFAULT_SOCKET_PATH
+        self.timeout = timeout
+
+    def request(self, command: str, **args: Any) -> dict:
+        """リクエストを送り、レスポンスを受け取る。
+
+        Args:
+            command (str): コマンド名。
+            **args (Any): コマンドの引数。
+
+        Returns:
+            dict: {"ok": True, "result": 結果, "elapsed": デーモン側の処理時間}
+
+        Raises:
+            RuntimeError: デーモン側でエラーになった場合。
+            OSError: デーモンが起動していない場合や、応答を待つ時間を超えた場合。
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+            client_socket.settimeout(self.timeout)
+            client_socket.connect(str(self.socket_path))
+            client_socket.sendall((json.dumps({"command": command, "args": args}) + "\n").encode())
+            with client_socket.makefile(mode="rb") as response_stream:
+                response_line = response_stream.readline()
+        if not response_line:
+            raise RuntimeError("daemon closed the connection without a response.")
+        response = json.loads(response_line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
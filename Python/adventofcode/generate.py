@@ -0,0 +1,160 @@
+import random
+from pathlib import Path
+
+from adventofcode.registry import getSolverSpec, loadDayModule
+
+
+# 1回にまとめて生成・書き込みするバイト数の目安。入力の大きさに関わらず、使うメモリはこの程度に収まる。
+GENERATE_CHUNK_SIZE = 1 << 20
+# 生成のロジックのバージョン。同じシードでも生成される内容が変わる場合に更新する。
+GENERATOR_VERSION = 2
+
+# day16のマップ情報の各要素の文字。空きスペース、ミラー2種類、スプリッター2種類。
+MAP_EMPTY_SYMBOL = b"."
+MAP_MIRROR_SYMBOLS = b"/\\"
+MAP_SPLITTER_SYMBOLS = b"-|"
+
+
+def buildWeightedTranslation(symbols: bytes, weights: list[float]) -> bytes:
+    """一様乱数のバイトを、重みに従った文字に変換するためのbytes.translate用の変換表を作る。
+    256通りのバイトの値を重みの比で各文字に割り当てるので、確率は1/256単位に丸められる。
+    正の重みが丸めで0になる（その文字が全く出力されなくなる）場合はエラーにする。
+
+    Args:
+        symbols (bytes): 出力する文字の一覧。
+        weights (list[float]): 各文字の重み。symbolsと同じ長さにする。
+
+    Returns:
+        bytes: 256バイトの変換表。
+    """
+    if len(symbols) != len(weights):
+        raise ValueError(f"symbols and weights should have the same length. ({len(symbols)} != {len(weights)})")
+    if any(weight < 0 for weight in weights) or sum(weights) <= 0:
+        raise ValueError(f"weights should be non-negative and have a positive sum: {weights}")
+
+    # 最大剰余方式で、256個の枠を重みの比に近くなるように配分する。
+    total_weight = sum(weights)
+    quotas = [weight / total_weight * 256 for weight in weights]
+    counts = [int(quota) for quota in quotas]
+    remainder_order = sorted(range(len(quotas)), key=lambda i: quotas[i] - counts[i], reverse=True)
+    for i in remainder_order[:256 - sum(counts)]:
+        counts[i] += 1
+    for symbol, weight, count in zip(symbols, weights, counts):
+        if weight > 0 and count == 0:
+            raise ValueError(
+                f"weight of {chr(symbol)!r} is too small: {weight / total_weight:g} rounds to 0 in steps of 1/256"
+            )
+    return b"".join(bytes([symbol]) * count for symbol, count in zip(symbols, counts))
+
+
+def _writeRandomGrid(output_path_str: str, x_size: int, y_size: int, translation: bytes, seed: int) -> None:
+    """変換表に従った文字を並べたグリッドを、行ごとに改行で区切ってファイルへ書き込む。
+    既存の入力ファイルと同じく、最終行の後ろには改行を付けない。
+    """
+    if x_size <= 0 or y_size <= 0:
+        raise ValueError(f"grid size should be positive: ({x_size}, {y_size})")
+    rng = random.Random(seed)
+    rows_per_chunk = max(1, GENERATE_CHUNK_SIZE // (x_size + 1))
+
+    with Path(output_path_str).open(mode="wb") as f:
+        for first_row in range(0, y_size, rows_per_chunk):
+            row_count = min(rows_per_chunk, y_size - first_row)
+            cells = rng.randbytes(x_size * row_count).translate(translation)
+            if first_row > 0:
+                f.write(b"\n")
+            f.write(b"\n".join(cells[y * x_size:(y + 1) * x_size] for y in range(row_count)))
+
+
+def generateMirrorMap(
+    output_path_str: str,
+    x_size: int,
+    y_size: int,
+    mirror_density: float = 0.1,
+    splitter_density: float = 0.1,
+    seed: int = 0
+) -> None:
+    """day16のマップ情報を生成する。
+
+    Args:
+        output_path_str (str): 出力先のファイルのパス。
+        x_size (int): x方向のマス数。
+        y_size (int): y方向のマス数。
+        mirror_density (float): ミラー（「/」「\\」）のマスの割合。2種類を半分ずつ置く。
+        splitter_density (float): スプリッター（「-」「|」）のマスの割合。2種類を半分ずつ置く。
+        seed (int): 乱数のシード。同じシードなら同じ内容になる。
+    """
+    empty_density = 1 - mirror_density - splitter_density
+    if mirror_density < 0 or splitter_density < 0 or empty_density < 0:
+        raise ValueError(f"invalid densities: mirror={mirror_density}, splitter={splitter_density}")
+    translation = buildWeightedTranslation(
+        MAP_EMPTY_SYMBOL + MAP_MIRROR_SYMBOLS + MAP_SPLITTER_SYMBOLS,
+        [empty_density] + [mirror_density / 2] * 2 + [splitter_density / 2] * 2
+    )
+    _writeRandomGrid(output_path_str, x_size, y_size, translation, seed)
+
+
+def generateCostGrid(
+    output_path_str: str,
+    x_size: int,
+    y_size: int,
+    cost_weights: list[float] | None = None,
+    seed: int = 0
+) -> None:
+    """day17のグリッド情報を生成する。
+
+    Args:
+        output_path_str (str): 出力先のファイルのパス。
+        x_size (int): x方向のマス数。
+        y_size (int): y方向のマス数。
+        cost_weights (list[float] | None): コスト1〜9の各値の重み。Noneなら一様。
+        seed (int): 乱数のシード。同じシードなら同じ内容になる。
+    """
+    if cost_weights is None:
+        cost_weights = [1] * 9
+    translation = buildWeightedTranslation(b"123456789", cost_weights)
+    _writeRandomGrid(output_path_str, x_size, y_size, translation, seed)
+
+
+def generateHandList(output_path_str: str, hand_count: int, max_bid_price: int = 1000, seed: int = 0) -> None:
+    """day07の手札一覧を生成する。
+
+    Args:
+        output_path_str (str): 出力先のファイルのパス。
+        hand_count (int): 手札の数。
+        max_bid_price (int): 入札額の最大値。入札額は1〜max_bid_priceの一様乱数にする。
+        seed (int): 乱数のシード。同じシードなら同じ内容になる。
+    """
+    if hand_count < 0 or max_bid_price < 1:
+        raise ValueError(f"invalid hand list settings: hand_count={hand_count}, max_bid_price={max_bid_price}")
+    # カードの文字と手札の枚数は、day07の定義から取る。
+    hand_module = loadDayModule(getSolverSpec(2023, 7), "hand")
+    hand_size = hand_module.HAND_SIZE
+    card_labels = "".join(card.category for card in hand_module.CARDS_BY_CODE).encode()
+    card_kind_count = len(card_labels)
+    # 一様乱数のバイトを、カードの番号の剰余で13種類の文字に変換する。
+    # 256は13で割り切れないので、13の倍数未満のバイトだけを使い、残りは捨てて偏りを無くす。
+    usable_byte_count = 256 // card_kind_count * card_kind_count
+    card_translation = bytes(card_labels[value % card_kind_count] for value in range(usable_byte_count))
+    card_translation += bytes(256 - usable_byte_count)
+    discarded_bytes = bytes(range(usable_byte_count, 256))
+
+    rng = random.Random(seed)
+    bid_price_texts = [str(bid_price) for bid_price in range(1, max_bid_price + 1)]
+    # 1行は「手札 + 空白 + 入札額」なので、入札額の桁数から1行の最大長を見積もる。
+    hands_per_chunk = max(1, GENERATE_CHUNK_SIZE // (hand_size + len(str(max_bid_price)) + 2))
+
+    with Path(output_path_str).open(mode="w") as f:
+        for first_hand in range(0, hand_count, hands_per_chunk):
+            chunk_hand_count = min(hands_per_chunk, hand_count - first_hand)
+            # チャンク分のカードを、まとめて乱数のバイトから変換する。
+            card_count = chunk_hand_count * hand_size
+            cards = b""
+            while len(cards) < card_count:
+                cards += rng.randbytes(card_count - len(cards) + 16).translate(card_translation, discarded_bytes)
+            cards_text = cards[:card_count].decode()
+            bid_prices = rng.choices(bid_price_texts, k=chunk_hand_count)
+            if first_hand > 0:
+                f.write("\n")
+            f.write("\n".join(
+                f"{cards_text[i * hand_size:(i + 1) * hand_size]} {bid_price}" for i, bid_price in enumerate(bid_prices)
+            ))
@@ -0,0 +1,222 @@
+from collections.abc import Callable
+import importlib
+import importlib.util
+from pathlib import Path
+import sys
+from types import ModuleType
+
+
+# 各日の解答（main.py など）が置かれているディレクトリ。(Python/)
+SOLUTIONS_ROOT = Path(__file__).resolve().parent.parent
+
+
+class SolverSpec:
+    """1日分の解答の登録情報を保持するデータクラス。
+
+    Attributes:
+        year (int): 年。
+        day (int): 日。
+        parts (tuple[int, ...]): 解答できる問題の番号。
+        inputs (dict[str, str]): 入力ファイルの名前と、日のディレクトリからの相対パス。
+        expected_answers (dict[tuple[int, str], int]): 既知の正解。{ (問題の番号, 入力ファイルの名前): 正解 }
+            各日のoutput_result.txtに記録されている結果。
+        version (str): 解答のバージョン。解答のロジックを変更して結果が変わる場合に更新する。
+        engines (tuple[str, ...]): solveのengineパラメータで選べる方式。先頭が既定の方式。空なら方式は選べない。
+        engine_requirements (dict[str, str]): 任意の依存が必要な方式と、必要なモジュールの名前。
+        side_effect_params (tuple[str, ...]): 指定するとファイルの書き出しなどの副作用があるパラメータ。
+            これらを指定した場合は、計算結果のキャッシュを使わずに毎回solveを呼ぶ。
+        uncached_params (tuple[str, ...]): 指定すると、実行ごとに結果が変わり得るパラメータ。（時間制限など）
+            これらを指定した場合も、計算結果をキャッシュしない。
+    """
+
+    def __init__(
+        self,
+        year: int,
+        day: int,
+        parts: tuple[int, ...],
+        inputs: dict[str, str],
+        expected_answers: dict[tuple[int, str], int],
+        version: str = "1",
+        engines: tuple[str, ...] = (),
+        engine_requirements: dict[str, str] | None = None,
+        side_effect_params: tuple[str, ...] = (),
+        uncached_params: tuple[str, ...] = ()
+    ) -> None:
+        """
+        Args:
+            year (int): 年。
+            day (int): 日。
+            parts (tuple[int, ...]): 解答できる問題の番号。
+            inputs (dict[str, str]): 入力ファイルの名前と、日のディレクトリからの相対パス。
+            expected_answers (dict[tuple[int, str], int]): 既知の正解。{ (問題の番号, 入力ファイルの名前): 正解 }
+            version (str): 解答のバージョン。
+            engines (tuple[str, ...]): solveのengineパラメータで選べる方式。先頭が既定の方式。
+            engine_requirements (dict[str, str] | None): 任意の依存が必要な方式と、必要なモジュールの名前。
+            side_effect_params (tuple[str, ...]): 指定するとファイルの書き出しなどの副作用があるパラメータ。
+            uncached_params (tuple[str, ...]): 指定すると、実行ごとに結果が変わり得るパラメータ。
+        """
+        self.year = year
+        self.day = day
+        self.parts = parts
+        self.inputs = inputs
+        self.expected_answers = expected_answers
+        self.version = version
+        self.engines = engines
+        self.engine_requirements = engine_requirements or {}
+        self.side_effect_params = side_effect_params
+        self.uncached_params = uncached_params
+
+    @property
+    def solver_id(self) -> str:
+        """解答を一意に識別する文字列。
+        """
+        return f"{self.year}/day{self.day:02}"
+
+    @property
+    def directory(self) -> Path:
+        """解答が置かれているディレクトリ。
+        """
+        return SOLUTIONS_ROOT / str(self.year) / f"day{self.day:02}"
+
+    def resolve_input(self, input_name_or_path: str) -> Path:
+        """入力ファイルの名前か任意のパスから、入力ファイルの絶対パスを求める。
+        登録済みの名前（example, question など）なら、日のディレクトリのファイルを指す。
+        それ以外は、カレントディレクトリからのパスとして扱う。
+
+        Args:
+            input_name_or_path (str): 入力ファイルの名前か、パス。
+        """
+        if input_name_or_path in self.inputs:
+            return self.directory / self.inputs[input_name_or_path]
+        return Path(input_name_or_path).resolve()
+
+    def has_side_effects(self, params: dict) -> bool:
+        """パラメータに副作用のあるものが含まれていて、計算結果のキャッシュを使えないかどうか。
+
+        Args:
+            params (dict): solveに渡す追加のパラメータ。
+        """
+        return any(params.get(name) is not None for name in self.side_effect_params)
+
+    def is_cacheable(self, params: dict) -> bool:
+        """このパラメータで解いた結果を、計算結果のキャッシュやメモに保存して再利用できるかどうか。
+
+        Args:
+            params (dict): solveに渡す追加のパラメータ。
+        """
+        if self.has_side_effects(params):
+            return False
+        return all(params.get(name) is None for name in self.uncached_params)
+
+    def available_engines(self) -> tuple[str, ...]:
+        """選べる方式のうち、任意の依存がインストールされていて実際に使えるものを列挙する。
+        """
+        return tuple(
+            engine for engine in self.engines
+            if engine not in self.engine_requirements
+            or importlib.util.find_spec(self.engine_requirements[engine]) is not None
+        )
+
+
+# 登録済みの解答の一覧。{ (年, 日): 登録情報 }
+SOLVERS = {
+    (2023, 7): SolverSpec(2023, 7, (1, 2), {
+        "example": "hand_list_example.txt",
+        "question": "hand_list_question.txt",
+    }, {
+        (1, "example"): 6440,
+        (1, "question"): 250347426,
+        (2, "example"): 5905,
+        (2, "question"): 251224870,
+    }, engines=("batch", "vectorized", "external", "parallel", "fused"), engine_requirements={"vectorized": "numpy"}),
+    (2023, 16): SolverSpec(2023, 16, (1, 2), {
+        "example1": "map_info1.txt",
+        "example": "map_info2.txt",
+        "question": "map_info3.txt",
+    }, {
+        (1, "example1"): 9,
+        (1, "example"): 46,
+        (1, "question"): 7562,
+        (2, "example"): 51,
+        (2, "question"): 7793,
+    }, engines=("stack", "recursion"), side_effect_params=("stats_json",)),
+    (2023, 17): SolverSpec(2023, 17, (1, 2), {
+        "example": "grid_example.txt",
+        "question": "grid_question.txt",
+    }, {
+        (1, "example"): 102,
+        (1, "question"): 1099,
+        (2, "example"): 94,
+        (2, "question"): 1266,
+    }, engines=("dijkstra", "anytime"), uncached_params=("time_budget",)),
+}
+
+
+def getSolverSpec(year: int, day: int) -> SolverSpec:
+    """登録済みの解答の情報を取得する。
+
+    Args:
+        year (int): 年。
+        day (int): 日。
+    """
+    if (year, day) not in SOLVERS:
+        raise KeyError(f"solver is not registered: {year} day {day}")
+    return SOLVERS[(year, day)]
+
+
+def loadMainModule(solver_spec: SolverSpec) -> ModuleType:
+    """解答のmain.pyをモジュールとして読み込む。
+    選ばれた日のモジュールだけをその場で読み込むので、他の日の依存モジュールは読み込まれない。
+
+    各日のモジュールは同じディレクトリ内のモジュールを名前だけでimportしているので、
+    日のディレクトリをsys.pathに追加してから読み込む。
+    main.pyは日ごとに別名のモジュールとして登録し、複数の日を同じプロセスで読み込めるようにする。
+
+    Args:
+        solver_spec (SolverSpec): 解答の登録情報。
+    """
+    module_name = f"adventofcode_{solver_spec.year}_day{solver_spec.day:02}_main"
+    if module_name not in sys.modules:
+        _addDirectoryToPath(solver_spec)
+        module_spec = importlib.util.spec_from_file_location(module_name, solver_spec.directory / "main.py")
+        module = importlib.util.module_from_spec(module_spec)
+        sys.modules[module_name] = module
+        try:
+            module_spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+    return sys.modules[module_name]
+
+
+def loadSolveFunction(solver_spec: SolverSpec) -> Callable[..., int]:
+    """解答のmain.pyを読み込み、solve関数を取得する。
+
+    Args:
+        solver_spec (SolverSpec): 解答の登録情報。
+
+    Returns:
+        Callable[..., int]: solve(入力ファイルのパス, 問題の番号, **パラメータ)
+    """
+    return loadMainModule(solver_spec).solve
+
+
+def loadDayModule(solver_spec: SolverSpec, module_name: str) -> ModuleType:
+    """解答のディレクトリにある、main.py以外のモジュールを読み込む。
+    各日のモジュールと同じく、日のディレクトリをsys.pathに追加してから名前だけでimportする。
+    main.pyは日ごとに名前が重なるので、loadMainModuleで読み込むこと。
+
+    Args:
+        solver_spec (SolverSpec): 解答の登録情報。
+        module_name (str): モジュール名。（例: "beam_simulator"）
+    """
+    _addDirectoryToPath(solver_spec)
+    return importlib.import_module(module_name)
+
+
+def _addDirectoryToPath(solver_spec: SolverSpec) -> None:
+    """日のディレクトリをsys.pathに追加する。
+    """
+    directory_str = str(solver_spec.directory)
+    if directory_str not in sys.path:
+        sys.path.insert(0, directory_str)
@@ -5,6 +5,8 @@ class Direction(Enum):
     """方向を表現するクラス。
 
     x軸: 右方向、y軸: 下方向をそれぞれ正とする。
+    探索などのループの中では、下記の整数で表現した方向と変換表を使い、
+    この列挙型は関数の引数・戻り値などの外側とのやり取りだけで使う。
     """
     RIGHT = (1, 0) # x+1, y
     LEFT = (-1, 0) # x-1, y
@@ -15,7 +17,61 @@ class Direction(Enum):
     def fromName(cls, target_name: str) -> "Direction":
         """列挙子の名前から列挙子を逆引きする。
         """
-        for e in Direction:
-            if e.name == target_name:
-                return e
-        raise ValueError(f"invalid enum name: {target_name} in {cls.__name__}.")
\ No newline at end of file
+        try:
+            return cls[target_name]
+        except KeyError:
+            raise ValueError(f"invalid enum name: {target_name} in {cls.__name__}.") from None
+
+    @classmethod
+    def fromIndex(cls, index: int) -> "Direction":
+        """整数で表現した方向から列挙子に変換する。
+        """
+        return DIRECTIONS_BY_INDEX[index]
+
+    @property
+    def index(self) -> int:
+        """整数で表現した方向。
+        """
+        return DIRECTION_INDICES[self]
+
+
+# 方向を整数で表現した値。下記の変換表はこの値を添え字として引く。
+DIRECTION_RIGHT = 0
+DIRECTION_LEFT = 1
+DIRECTION_UP = 2
+DIRECTION_DOWN = 3
+DIRECTION_COUNT = 4
+
+DIRECTIONS_BY_INDEX = (Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN)
+DIRECTION_INDICES = {direction: index for index, direction in enumerate(DIRECTIONS_BY_INDEX)}
+
+# 各方向へ1マス進む際の、x座標・y座標の差分。
+DX = tuple(direction.value[0] for direction in DIRECTIONS_BY_INDEX)
+DY = tuple(direction.value[1] for direction in DIRECTIONS_BY_INDEX)
+
+# 真後ろの方向。
+OPPOSITE = (DIRECTION_LEFT, DIRECTION_RIGHT, DIRECTION_DOWN, DIRECTION_UP)
+# 進行方向に対して左に曲がった方向。（マップを正面から見て、y軸は下方向が正）
+TURN_LEFT = (DIRECTION_UP, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_RIGHT)
+# 進行方向に対して右に曲がった方向。
+TURN_RIGHT = (DIRECTION_DOWN, DIRECTION_UP, DIRECTION_RIGHT, DIRECTION_LEFT)
+
+# 「/」のミラーで反射された後の方向。
+REFLECT_SLASH = (DIRECTION_UP, DIRECTION_DOWN, DIRECTION_RIGHT, DIRECTION_LEFT)
+# 「\」のミラーで反射された後の方向。
+REFLECT_BACKSLASH = (DIRECTION_DOWN, DIRECTION_UP, DIRECTION_LEFT, DIRECTION_RIGHT)
+
+# 「-」のスプリッターを通過した後の方向。上下から入ると左右に分割され、左右から入るとそのまま通過する。
+SPLIT_HORIZONTAL = (
+    (DIRECTION_RIGHT,),
+    (DIRECTION_LEFT,),
+    (DIRECTION_LEFT, DIRECTION_RIGHT),
+    (DIRECTION_LEFT, DIRECTION_RIGHT),
+)
+# 「|」のスプリッターを通過した後の方向。左右から入ると上下に分割され、上下から入るとそのまま通過する。
+SPLIT_VERTICAL = (
+    (DIRECTION_UP, DIRECTION_DOWN),
+    (DIRECTION_UP, DIRECTION_DOWN),
+    (DIRECTION_UP,),
+    (DIRECTION_DOWN,),
+)
\ No newline at end of file
@@ -0,0 +1,133 @@
+from common.constants import DIRECTION_COUNT, DX, DY
+
+
+def buildPaddedCells(x_size: int, y_size: int, grid_data: bytes, sentinel: int) -> bytes:
+    """番兵を含まない全マスの値から、周囲1マス分に番兵を置いたCompactGridのcellsの配置を作る。
+
+    Args:
+        x_size (int): x方向のマス数。
+        y_size (int): y方向のマス数。
+        grid_data (bytes): 番兵を含まない全マスの値。行を上から順に連結したもの。
+        sentinel (int): 番兵の値。
+
+    Returns:
+        bytes: 番兵を含む全マスの値。
+    """
+    grid_bytes = bytes(grid_data)
+    rows = [grid_bytes[y * x_size:(y + 1) * x_size] for y in range(y_size)]
+    # 先頭の番兵の行と1行目の左端、各行の右端と次の行の左端、最終行の右端と末尾の番兵の行を、それぞれまとめて置く。
+    edge = bytes([sentinel]) * (x_size + 3)
+    return edge + bytes([sentinel, sentinel]).join(rows) + edge
+
+
+class CompactGrid:
+    """グリッドを1個の連続したバイト列で保持するクラス。
+
+    各マスは (y + 1) * stride + (x + 1) の位置に1バイトずつ格納し、
+    グリッドの周囲1マス分には番兵（sentinel）を置く。
+    隣のマスへの移動は位置にneighbor_offsetsの値を足すだけで済み、
+    移動先が番兵かどうかを見れば範囲外の判定もできるので、座標の範囲チェックが要らなくなる。
+    ※番兵を置くのは周囲1マス分だけなので、1回の移動ごとに番兵かどうかを確認すること。
+
+    Attributes:
+        x_size (int): x方向のマス数。
+        y_size (int): y方向のマス数。
+        stride (int): 1行分のバイト数。番兵の分を含む。
+        sentinel (int): 番兵の値。グリッドの値として使われない値にする。
+        cells (bytes | memoryview): 番兵を含む全マスの値。読み取り専用。
+            キャッシュから読み込んだ場合は、メモリマップしたファイルをコピーせずに参照する。
+        neighbor_offsets (tuple[int, ...]): 各方向の隣のマスへ移動する際の、位置の差分。整数で表現した方向を添え字として引く。
+    """
+
+    def __init__(self, x_size: int, y_size: int, cells: bytes | memoryview, sentinel: int) -> None:
+        """番兵を置いた配置のcellsを、コピーせずにそのまま使う。
+        番兵を含まない値から作る場合は、fromGridDataを使う。
+
+        Args:
+            x_size (int): x方向のマス数。
+            y_size (int): y方向のマス数。
+            cells (bytes | memoryview): 番兵を含む全マスの値。buildPaddedCellsで作った配置にする。
+            sentinel (int): 番兵の値。グリッドの値として使われない値にする。
+        """
+        self.x_size = x_size
+        self.y_size = y_size
+        self.stride = x_size + 2
+        self.sentinel = sentinel
+        if len(cells) != self.stride * (y_size + 2):
+            raise ValueError(f"cells size is not equal to {self.stride} * {y_size + 2}. ({len(cells)})")
+        self.cells = cells
+
+        self.neighbor_offsets = tuple(self.offset(DX[direction], DY[direction]) for direction in range(DIRECTION_COUNT))
+
+    @classmethod
+    def fromGridData(cls, x_size: int, y_size: int, grid_data: bytes, sentinel: int) -> "CompactGrid":
+        """番兵を含まない全マスの値から、CompactGridを生成する。
+
+        Args:
+            x_size (int): x方向のマス数。
+            y_size (int): y方向のマス数。
+            grid_data (bytes): 番兵を含まない全マスの値。行を上から順に連結したもの。
+            sentinel (int): 番兵の値。グリッドの値として使われない値にする。
+        """
+        if len(grid_data) != x_size * y_size:
+            raise ValueError(f"grid data size is not equal to {x_size} * {y_size}. ({len(grid_data)})")
+        # memoryviewへのinは1要素ずつ比較するので、bytesに変換してからまとめて探す。
+        if bytes(grid_data).find(bytes([sentinel])) != -1:
+            raise ValueError(f"grid data contains the sentinel value: {sentinel}")
+        return cls(x_size, y_size, buildPaddedCells(x_size, y_size, grid_data, sentinel), sentinel)
+
+    def offset(self, dx: int, dy: int) -> int:
+        """座標の差分から、cells内の位置の差分を求める。
+
+        Args:
+            dx (int): x座標の差分。
+            dy (int): y座標の差分。
+        """
+        return dy * self.stride + dx
+
+    def index(self, x: int, y: int) -> int:
+        """座標から、cells内の位置を求める。
+
+        Args:
+            x (int): x座標。
+            y (int): y座標。
+        """
+        return (y + 1) * self.stride + (x + 1)
+
+    def position(self, index: int) -> tuple[int, int]:
+        """cells内の位置から、座標を求める。
+
+        Args:
+            index (int): cells内の位置。
+
+        Returns:
+            tuple[int, int]: (x座標, y座標)
+        """
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def is_inside(self, x: int, y: int) -> bool:
+        """グリッド内の座標かどうかを判定する。
+
+        Args:
+            x (int): x座標。
+            y (int): y座標。
+        """
+        # 配列の添え字なので終端はイコール無し
+        return 0 <= x < self.x_size and 0 <= y < self.y_size
+
+    def get(self, x: int, y: int) -> int:
+        """指定した座標のマスの値を取得する。
+
+        Args:
+            x (int): x座標。
+            y (int): y座標。
+        """
+        return self.cells[self.index(x, y)]
+
+    def rows(self) -> list[memoryview]:
+        """各行の値を、cellsをコピーせずに参照するmemoryviewのリストとして取得する。
+        rows()[y][x] で各マスの値を取得できる。
+        """
+        cells_view = memoryview(self.cells)
+        return [cells_view[self.index(0, y):self.index(0, y) + self.x_size] for y in range(self.y_size)]
\ No newline at end of file
@@ -0,0 +1,149 @@
+from collections.abc import Callable
+import json
+import mmap
+import os
+from pathlib import Path
+
+from common.grid import buildPaddedCells
+from common.result_cache import DEFAULT_CACHE_DIR, calculateFileHash
+
+
+# キャッシュの形式のバージョン。形式を変更した場合は更新して、古いキャッシュを使わないようにする。
+INPUT_CACHE_FORMAT_VERSION = 3
+
+
+class CachedInput:
+    """バイナリ形式に変換済みの入力を保持するデータクラス。
+
+    Attributes:
+        metadata (dict): 変換時に記録した付加情報。（グリッドのサイズなど）
+        sections (dict[str, memoryview]): 名前ごとのバイナリデータ。キャッシュファイルをメモリマップしたもの。
+    """
+
+    def __init__(self, metadata: dict, sections: dict[str, memoryview]) -> None:
+        """
+        Args:
+            metadata (dict): 変換時に記録した付加情報。
+            sections (dict[str, memoryview]): 名前ごとのバイナリデータ。
+        """
+        self.metadata = metadata
+        self.sections = sections
+
+
+class InputCache:
+    """入力ファイルを一度だけパースしてバイナリ形式で保存し、以降の実行ではそれをメモリマップして使うクラス。
+
+    キャッシュは入力ファイルの内容のハッシュと、変換の種類ごとに保存する。
+    1個のキャッシュは、付加情報とセクションの位置を書いたJSONのヘッダーと、
+    各セクションを連結したバイナリファイルの組で構成される。
+
+    Attributes:
+        base_dir (Path): キャッシュ全体のディレクトリ。入力から作る他のキャッシュ（day07の役の表など）もこの下に置く。
+        cache_dir (Path): 入力のキャッシュを置くディレクトリ。
+    """
+
+    def __init__(self, cache_dir_str: str | None = None) -> None:
+        """
+        Args:
+            cache_dir_str (str | None): キャッシュを置くディレクトリのパス。NoneならDEFAULT_CACHE_DIR。
+        """
+        self.base_dir = Path(cache_dir_str) if cache_dir_str is not None else DEFAULT_CACHE_DIR
+        self.cache_dir = self.base_dir / "inputs"
+
+    def load(
+        self,
+        input_path_str: str,
+        kind: str,
+        build: Callable[[bytes], tuple[dict, dict[str, bytes]]]
+    ) -> CachedInput:
+        """変換済みの入力を読み込む。キャッシュが無ければ変換して保存する。
+
+        Args:
+            input_path_str (str): 入力ファイルのパス。
+            kind (str): 変換の種類。変換の方法ごとに異なる名前を付ける。
+            build (Callable[[bytes], tuple[dict, dict[str, bytes]]]):
+                入力ファイルの内容から (付加情報, 名前ごとのバイナリデータ) を作る関数。
+
+        Returns:
+            CachedInput: 変換済みの入力。
+        """
+        input_hash = calculateFileHash(input_path_str)
+        cache_name = f"{kind}-v{INPUT_CACHE_FORMAT_VERSION}-{input_hash}"
+        header_path = self.cache_dir / f"{cache_name}.json"
+        data_path = self.cache_dir / f"{cache_name}.bin"
+
+        if not (header_path.is_file() and data_path.is_file()):
+            metadata, sections = build(Path(input_path_str).read_bytes())
+            self._save(header_path, data_path, metadata, sections)
+        
+        return self._load(header_path, data_path)
+
+    @staticmethod
+    def _save(header_path: Path, data_path: Path, metadata: dict, sections: dict[str, bytes]) -> None:
+        """変換済みの入力をキャッシュファイルとして書き出す。
+        """
+        header_path.parent.mkdir(parents=True, exist_ok=True)
+        section_ranges = {}
+        offset = 0
+        # 書き込み途中のファイルを読まれないように、一時ファイルに書いてから置き換える。
+        temp_data_path = data_path.with_suffix(f".{os.getpid()}.tmp")
+        with temp_data_path.open(mode="wb") as f:
+            for name, data in sections.items():
+                f.write(data)
+                section_ranges[name] = [offset, len(data)]
+                offset += len(data)
+        temp_data_path.replace(data_path)
+
+        temp_header_path = header_path.with_suffix(f".{os.getpid()}.tmp")
+        temp_header_path.write_text(json.dumps({"metadata": metadata, "sections": section_ranges}), encoding="utf-8")
+        temp_header_path.replace(header_path)
+
+    @staticmethod
+    def _load(header_path: Path, data_path: Path) -> CachedInput:
+        """キャッシュファイルをメモリマップして読み込む。
+        """
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        with data_path.open(mode="rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                data = memoryview(b"")
+            else:
+                # mmapはファイルを閉じても有効なまま残る。
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        
+        sections = {
+            name: data[offset:offset + length]
+            for name, (offset, length) in header["sections"].items()
+        }
+        return CachedInput(header["metadata"], sections)
+
+
+def buildByteGrid(
+    input_bytes: bytes,
+    sentinel: int,
+    translation: bytes | None = None
+) -> tuple[dict, dict[str, bytes]]:
+    """グリッド状のテキストを、周囲に番兵を置いたCompactGridのcellsの配置に変換する。InputCache.loadのbuildとして使う。
+    キャッシュにはこの配置のまま保存するので、読み込む際はメモリマップしたものをコピーせずにCompactGridに渡せる。
+
+    Args:
+        input_bytes (bytes): 入力ファイルの内容。
+        sentinel (int): CompactGridの番兵の値。変換結果に含まれていないことはここで確認する。
+        translation (bytes | None): 各マスの文字を変換するbytes.translate用の変換表。Noneなら文字のまま。
+
+    Returns:
+        tuple[dict, dict[str, bytes]]: ({"x_size": x方向のマス数, "y_size": y方向のマス数}, {"cells": 番兵を含む全マスの値})
+    """
+    rows = input_bytes.rstrip(b"\r\n").splitlines()
+    row_sizes = set(map(len, rows))
+    if len(row_sizes) > 1:
+        # 行ごとのマス数がズレていたら弾く
+        raise Exception(f"grid rows is not equal. (row_sizes: {row_sizes})")
+
+    grid = b"".join(rows)
+    if translation is not None:
+        grid = grid.translate(translation)
+    if grid.find(bytes([sentinel])) != -1:
+        raise ValueError(f"grid data contains the sentinel value: {sentinel}")
+    x_size = len(rows[0]) if rows else 0
+    y_size = len(rows)
+    return {"x_size": x_size, "y_size": y_size}, {"cells": buildPaddedCells(x_size, y_size, grid, sentinel)}
\ No newline at end of file
@@ -0,0 +1,157 @@
+import atexit
+from enum import IntEnum
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, TextIO
+
+
+# 出力をまとめて書き込む際の、バッファの大きさの既定値。文字数単位。
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class OutputLevel(IntEnum):
+    """出力の詳細さを表現する列挙型。値が大きいほど詳細に出力する。
+    """
+    QUIET = 0 # 何も出力しない。（JSON用の結果だけ記録する）
+    SUMMARY = 1 # 答えや処理時間などの要約だけを出力する。
+    VERBOSE = 2 # 入力の内容や手札1枚ずつの順位など、要素ごとの情報も出力する。
+
+    @classmethod
+    def fromName(cls, target_name: str) -> "OutputLevel":
+        """列挙子の名前から、大文字・小文字を区別せずに列挙子を逆引きする。
+        """
+        try:
+            return cls[target_name.upper()]
+        except KeyError:
+            raise ValueError(f"invalid enum name: {target_name} in {cls.__name__}.") from None
+
+
+class Output:
+    """出力の詳細さに応じて、テキストをバッファにまとめてから書き込むクラス。
+    答えなどの結果は、JSONとしても取り出せるように記録しておく。
+
+    要素ごとの出力は、is_enabled(OutputLevel.VERBOSE)を確認してから文字列を組み立てることで、
+    詳細に出力しない時には文字列の整形自体を省くこと。
+
+    使用例:
+        output = getDefaultOutput()
+        if output.is_enabled(OutputLevel.VERBOSE):
+            for hand in hand_list:
+                output.verbose(f"hand: {hand}")
+        output.result("total_bounty", total_bounty)
+
+    Attributes:
+        level (OutputLevel): 出力の詳細さ。これより詳細な出力は捨てる。
+        stream (TextIO | None): 書き込み先。Noneなら書き込む時点のsys.stdout。
+        buffer_size (int): バッファに溜める文字数の上限。超えたら書き込む。
+        results (list[dict]): 記録した結果。
+    """
+
+    def __init__(self, level: OutputLevel = OutputLevel.SUMMARY, stream: TextIO | None = None, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        Args:
+            level (OutputLevel): 出力の詳細さ。
+            stream (TextIO | None): 書き込み先。Noneなら書き込む時点のsys.stdout。
+            buffer_size (int): バッファに溜める文字数の上限。
+        """
+        self.level = level
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.results = []
+        self._buffer = []
+        self._buffered_size = 0
+
+    def is_enabled(self, level: OutputLevel) -> bool:
+        """指定した詳細さの出力が有効かどうかを判定する。
+        """
+        return self.level >= level
+
+    def write(self, level: OutputLevel, *values: Any, sep: str = " ", end: str = "\n") -> None:
+        """指定した詳細さのテキストをバッファに追加する。引数はprintと同じ。
+        """
+        if self.level < level:
+            return
+        text = sep.join(map(str, values)) + end
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+        if self._buffered_size >= self.buffer_size:
+            self.flush()
+
+    def summary(self, *values: Any, sep: str = " ", end: str = "\n") -> None:
+        """要約のテキストを出力する。引数はprintと同じ。
+        """
+        self.write(OutputLevel.SUMMARY, *values, sep=sep, end=end)
+
+    def verbose(self, *values: Any, sep: str = " ", end: str = "\n") -> None:
+        """要素ごとの詳細なテキストを出力する。引数はprintと同じ。
+        """
+        self.write(OutputLevel.VERBOSE, *values, sep=sep, end=end)
+
+    def result(self, name: str, value: Any, **fields: Any) -> None:
+        """結果を記録し、要約として「name: value」を出力する。
+        結果は処理の区切りなので、その時点までの出力をまとめて書き込む。
+
+        Args:
+            name (str): 結果の名前。
+            value (Any): 結果の値。JSONに変換できる値にする。
+            **fields (Any): JSONにだけ含める追加の情報。
+        """
+        self.results.append({"name": name, "value": value, **fields})
+        self.summary(f"{name}: {value}")
+        self.flush()
+
+    def flush(self) -> None:
+        """バッファに溜めたテキストを書き込む。
+        """
+        if not self._buffer:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("".join(self._buffer))
+        stream.flush()
+        self._buffer.clear()
+        self._buffered_size = 0
+
+    def to_dict(self) -> dict:
+        """記録した結果を、JSONへ変換できる辞書に変換する。
+        """
+        return {"results": self.results}
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """記録した結果をJSON文字列に変換する。
+        """
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def dump_json(self, output_path_str: str) -> None:
+        """記録した結果をJSONファイルとして書き出す。
+
+        Args:
+            output_path_str (str): 出力先のファイルのパス。
+        """
+        Path(output_path_str).write_text(self.to_json(), encoding="utf-8")
+
+
+def _createDefaultOutput() -> Output:
+    """環境変数の設定を基に、既定の出力を作る。
+
+    - ADVENTOFCODE_OUTPUT_LEVEL: 出力の詳細さ。quiet / summary / verbose（既定値: summary）
+    - ADVENTOFCODE_OUTPUT_JSON: 指定した場合、終了時に記録した結果をこのパスへJSONとして書き出す。
+    """
+    output = Output(OutputLevel.fromName(os.environ.get("ADVENTOFCODE_OUTPUT_LEVEL", "summary")))
+    json_path_str = os.environ.get("ADVENTOFCODE_OUTPUT_JSON")
+    if json_path_str:
+        atexit.register(output.dump_json, json_path_str)
+    # 終了時にバッファに残っているテキストを書き込む。
+    atexit.register(output.flush)
+    return output
+
+
+# 各main.pyから共通で使う、既定の出力。
+_default_output = _createDefaultOutput()
+
+
+def getDefaultOutput() -> Output:
+    """既定の出力を取得する。
+    """
+    return _default_output
\ No newline at end of file
@@ -0,0 +1,222 @@
+import atexit
+import cProfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import functools
+import io
+import json
+import os
+from pathlib import Path
+import pstats
+import time
+import tracemalloc
+
+from common.time_util import getElapsedTime
+
+
+class SpanRecord:
+    """1区間分の計測結果を保持するデータクラス。
+
+    Attributes:
+        name (str): 区間の名前。(parse, evaluate, search, render など)
+        start_time (float): 開始時のperf_counterの値。
+        end_time (float | None): 終了時のperf_counterの値。計測中はNone。
+        cpu_time (float | None): 区間内で消費したCPU時間。秒単位。
+        peak_memory (int | None): 区間内でのtracemallocのピークメモリ。バイト単位。計測しない場合はNone。
+        cprofile_stats (str | None): cProfileの計測結果。計測しない場合はNone。
+        children (list[SpanRecord]): 区間内で計測した子の区間。
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Args:
+            name (str): 区間の名前。
+        """
+        self.name = name
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._start_cpu_time = time.process_time()
+        self.cpu_time = None
+        self.peak_memory = None
+        self.cprofile_stats = None
+        self.children = []
+
+    @property
+    def wall_time(self) -> float | None:
+        """区間の経過時間。秒単位。計測中はNone。
+        """
+        if self.end_time is None:
+            return None
+        return getElapsedTime(self.start_time, self.end_time)
+
+    def to_dict(self) -> dict:
+        """JSONへ変換できる辞書に変換する。
+        """
+        result = {
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+        }
+        if self.peak_memory is not None:
+            result["peak_memory"] = self.peak_memory
+        if self.cprofile_stats is not None:
+            result["cprofile_stats"] = self.cprofile_stats
+        if self.children:
+            result["children"] = [child.to_dict() for child in self.children]
+        return result
+
+
+class Profiler:
+    """入れ子にできる区間ごとに、経過時間・CPU時間・ピークメモリを計測するクラス。
+
+    使用例:
+        profiler = Profiler(trace_memory=True)
+        with profiler.span("parse"):
+            ...
+        print(profiler.to_json())
+
+    Attributes:
+        trace_memory (bool): tracemallocでピークメモリを計測するかどうか。
+        use_cprofile (bool): 最上位の区間ごとにcProfileで関数単位の計測を行うかどうか。
+        cprofile_limit (int): cProfileの計測結果として残す関数の数。
+        records (list[SpanRecord]): 最上位の区間の計測結果。
+    """
+
+    def __init__(self, trace_memory: bool = False, use_cprofile: bool = False, cprofile_limit: int = 20) -> None:
+        """
+        Args:
+            trace_memory (bool): tracemallocでピークメモリを計測するかどうか。
+            use_cprofile (bool): 最上位の区間ごとにcProfileで関数単位の計測を行うかどうか。
+            cprofile_limit (int): cProfileの計測結果として残す関数の数。
+        """
+        self.trace_memory = trace_memory
+        self.use_cprofile = use_cprofile
+        self.cprofile_limit = cprofile_limit
+        self.records = []
+        self._active_records = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[SpanRecord]:
+        """区間を計測するコンテキストマネージャ。入れ子にすると、子の区間として記録される。
+
+        Args:
+            name (str): 区間の名前。
+
+        Yields:
+            SpanRecord: 計測結果。区間を抜けた後に値が確定する。
+        """
+        is_top_level = not self._active_records
+        started_tracemalloc = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            self._update_peak_memory()
+
+        cprofile_profile = None
+        if self.use_cprofile and is_top_level:
+            cprofile_profile = cProfile.Profile()
+
+        record = SpanRecord(name)
+        if is_top_level:
+            self.records.append(record)
+        else:
+            self._active_records[-1].children.append(record)
+        self._active_records.append(record)
+
+        if cprofile_profile is not None:
+            cprofile_profile.enable()
+        try:
+            yield record
+        finally:
+            if cprofile_profile is not None:
+                cprofile_profile.disable()
+            record.end_time = time.perf_counter()
+            record.cpu_time = time.process_time() - record._start_cpu_time
+            if self.trace_memory:
+                self._update_peak_memory()
+            self._active_records.pop()
+
+            if cprofile_profile is not None:
+                stats_stream = io.StringIO()
+                stats = pstats.Stats(cprofile_profile, stream=stats_stream)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.cprofile_limit)
+                record.cprofile_stats = stats_stream.getvalue()
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+    def profile(self, name: str | None = None) -> Callable:
+        """関数の呼び出しを区間として計測するデコレータ。
+
+        Args:
+            name (str | None): 区間の名前。Noneなら関数の修飾名を使う。
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _update_peak_memory(self) -> None:
+        """計測中の全区間のピークメモリを、前回リセットしてからのピークで更新する。
+        子の区間の開始・終了のタイミングでリセットするので、各区間のピークは区間内の値だけから求まる。
+        """
+        _, peak_memory = tracemalloc.get_traced_memory()
+        for record in self._active_records:
+            if record.peak_memory is None or record.peak_memory < peak_memory:
+                record.peak_memory = peak_memory
+        tracemalloc.reset_peak()
+
+    def clear(self) -> None:
+        """計測結果を破棄する。
+        """
+        self.records.clear()
+
+    def to_dict(self) -> dict:
+        """計測結果を、JSONへ変換できる辞書に変換する。
+        """
+        return {"spans": [record.to_dict() for record in self.records]}
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """計測結果をJSON文字列に変換する。
+        """
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def dump_json(self, output_path_str: str) -> None:
+        """計測結果をJSONファイルとして書き出す。
+
+        Args:
+            output_path_str (str): 出力先のファイルのパス。
+        """
+        Path(output_path_str).write_text(self.to_json(), encoding="utf-8")
+
+
+def _createDefaultProfiler() -> Profiler:
+    """環境変数の設定を基に、既定のプロファイラを作る。
+
+    - ADVENTOFCODE_PROFILE_JSON: 指定した場合、終了時に計測結果をこのパスへJSONとして書き出す。
+    - ADVENTOFCODE_PROFILE_MEMORY: 1ならtracemallocでピークメモリも計測する。
+    - ADVENTOFCODE_PROFILE_CPROFILE: 1なら最上位の区間ごとにcProfileでも計測する。
+    """
+    profiler = Profiler(
+        trace_memory=os.environ.get("ADVENTOFCODE_PROFILE_MEMORY") == "1",
+        use_cprofile=os.environ.get("ADVENTOFCODE_PROFILE_CPROFILE") == "1"
+    )
+    json_path_str = os.environ.get("ADVENTOFCODE_PROFILE_JSON")
+    if json_path_str:
+        atexit.register(profiler.dump_json, json_path_str)
+    return profiler
+
+
+# 各main.pyから共通で使う、既定のプロファイラ。
+_default_profiler = _createDefaultProfiler()
+
+
+def getDefaultProfiler() -> Profiler:
+    """既定のプロファイラを取得する。
+    """
+    return _default_profiler
\ No newline at end of file
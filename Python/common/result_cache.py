@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import time
+
+
+# キャッシュを置くディレクトリの既定値。環境変数ADVENTOFCODE_CACHE_DIRで変更できる。
+DEFAULT_CACHE_DIR = Path(os.environ.get("ADVENTOFCODE_CACHE_DIR", Path.home() / ".cache" / "adventofcode"))
+# 結果のキャッシュの合計サイズの上限の既定値。バイト単位。
+DEFAULT_MAX_CACHE_SIZE = 64 * 1024 * 1024
+# 入力ファイルのハッシュを計算する際に、一度に読み込むバイト数。
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def calculateFileHash(file_path_str: str) -> str:
+    """ファイルの内容のハッシュ値を計算する。
+
+    Args:
+        file_path_str (str): ファイルのパス。
+
+    Returns:
+        str: SHA-256のハッシュ値の16進数表現。
+    """
+    file_hash = hashlib.sha256()
+    with Path(file_path_str).open(mode="rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class ResultCache:
+    """解答の実行結果を、入力ファイルの内容のハッシュをキーとしてディスクにキャッシュするクラス。
+
+    キーは、入力ファイルの内容・解答の識別子・パラメータ・解答のバージョンから求めるので、
+    ファイルの場所が変わっても同じ内容なら同じ結果を返し、どれか1つでも変われば別の結果として扱う。
+    合計サイズが上限を超えたら、最後に使われた時刻が古いものから削除する。
+
+    Attributes:
+        cache_dir (Path): 結果のキャッシュを置くディレクトリ。
+        max_cache_size (int): キャッシュの合計サイズの上限。バイト単位。
+    """
+
+    def __init__(self, cache_dir_str: str | None = None, max_cache_size: int = DEFAULT_MAX_CACHE_SIZE) -> None:
+        """
+        Args:
+            cache_dir_str (str | None): キャッシュを置くディレクトリのパス。NoneならDEFAULT_CACHE_DIR。
+            max_cache_size (int): キャッシュの合計サイズの上限。バイト単位。
+        """
+        base_dir = Path(cache_dir_str) if cache_dir_str is not None else DEFAULT_CACHE_DIR
+        self.cache_dir = base_dir / "results"
+        self.max_cache_size = max_cache_size
+
+    @staticmethod
+    def make_key(input_path_str: str, solver_id: str, params: dict, version: str) -> str:
+        """キャッシュのキーを計算する。
+
+        Args:
+            input_path_str (str): 入力ファイルのパス。
+            solver_id (str): 解答の識別子。
+            params (dict): 解答に渡すパラメータ。（問題の番号や、直進回数の制約など）
+            version (str): 解答のバージョン。
+
+        Returns:
+            str: キャッシュのキー。
+        """
+        key_source = json.dumps(
+            {
+                "input_hash": calculateFileHash(input_path_str),
+                "solver_id": solver_id,
+                "params": params,
+                "version": version,
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(key_source.encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, object]:
+        """キャッシュから結果を取得する。
+
+        Args:
+            key (str): キャッシュのキー。
+
+        Returns:
+            tuple[bool, object]: (キャッシュにあったかどうか, 結果)
+        """
+        cache_path = self._get_cache_path(key)
+        try:
+            cache_entry = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False, None
+        # 最後に使われた時刻を更新して、削除の対象になりにくくする。
+        os.utime(cache_path)
+        return True, cache_entry["result"]
+
+    def put(self, key: str, result: object, metadata: dict | None = None) -> None:
+        """結果をキャッシュに保存する。
+
+        Args:
+            key (str): キャッシュのキー。
+            result (object): 結果。JSONに変換できる値。
+            metadata (dict | None): 結果と一緒に保存する、確認用の付加情報。
+        """
+        cache_path = self._get_cache_path(key)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_entry = {"result": result, "created_at": time.time(), "metadata": metadata or {}}
+        # 書き込み途中のファイルを読まれないように、一時ファイルに書いてから置き換える。
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(cache_entry, ensure_ascii=False), encoding="utf-8")
+        temp_path.replace(cache_path)
+        self._evict()
+
+    def clear(self) -> None:
+        """キャッシュを全て削除する。
+        """
+        for cache_path in self.cache_dir.glob("*/*.json"):
+            cache_path.unlink(missing_ok=True)
+
+    def _get_cache_path(self, key: str) -> Path:
+        """キーに対応するキャッシュファイルのパスを求める。
+        1個のディレクトリにファイルが集中しないように、キーの先頭2文字でディレクトリを分ける。
+        """
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _evict(self) -> None:
+        """合計サイズが上限を超えていたら、最後に使われた時刻が古いものから削除する。
+        """
+        cache_files = []
+        for cache_path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = cache_path.stat()
+            except OSError:
+                continue
+            cache_files.append((stat.st_mtime, stat.st_size, cache_path))
+        
+        total_size = sum(size for _, size, _ in cache_files)
+        for _, size, cache_path in sorted(cache_files):
+            if total_size <= self.max_cache_size:
+                break
+            cache_path.unlink(missing_ok=True)
+            total_size -= size
\ No newline at end of file
@@ -6,6 +6,9 @@ setup(
     install_requires=[
         "tqdm"
     ],
+    extras_require={
+        "numpy": ["numpy"],  # 配列演算でまとめて処理する実装で利用
+    },
     packages=find_packages(where="Python"),  # Pythonディレクトリ内のパッケージを検出
     package_dir={"": "Python"},  # パッケージのルートディレクトリを指定
 )
\ No newline at end of file